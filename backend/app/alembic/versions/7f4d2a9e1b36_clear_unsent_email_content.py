@@ -0,0 +1,27 @@
+"""Clear the content of emails that will never be sent
+
+Revision ID: 7f4d2a9e1b36
+Revises: 2e7c9b4d8a15
+Create Date: 2026-10-19 17:12:48.203517
+
+"""
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision = '7f4d2a9e1b36'
+down_revision = '2e7c9b4d8a15'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # New account emails include the password
+    op.execute(
+        "UPDATE email_outbox SET html_content = '' "
+        "WHERE status IN ('failed', 'throttled')"
+    )
+
+
+def downgrade():
+    pass
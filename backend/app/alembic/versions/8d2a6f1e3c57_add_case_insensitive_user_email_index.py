@@ -0,0 +1,33 @@
+"""Add case-insensitive unique index on user email
+
+Revision ID: 8d2a6f1e3c57
+Revises: 5b7e0c2f4a91
+Create Date: 2026-10-19 10:03:17.284511
+
+"""
+from alembic import op
+import sqlalchemy as sa
+import sqlmodel.sql.sqltypes
+
+
+# revision identifiers, used by Alembic.
+revision = '8d2a6f1e3c57'
+down_revision = '5b7e0c2f4a91'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # Emails are normalized on write from now on, normalize the existing ones.
+    # This fails on the unique index below if two accounts only differ by case,
+    # those have to be merged by hand before upgrading.
+    op.execute('UPDATE "user" SET email = lower(email) WHERE email <> lower(email)')
+    op.create_index(
+        'ix_user_email_lower', 'user', [sa.text('lower(email)')], unique=True
+    )
+    op.drop_index('ix_user_email', table_name='user')
+
+
+def downgrade():
+    op.create_index('ix_user_email', 'user', ['email'], unique=True)
+    op.drop_index('ix_user_email_lower', table_name='user')
@@ -0,0 +1,155 @@
+"""
+Read-through cache of the serialized responses of the GET by id routes of
+the CV documents, see app/core/cache.py for how it's invalidated.
+"""
+
+import logging
+import time
+import uuid
+from collections.abc import Callable
+from dataclasses import dataclass
+from typing import Annotated
+
+import orjson
+from fastapi import Depends, Response
+from sqlalchemy.exc import DBAPIError
+from sqlmodel import Session, SQLModel, col, select
+from starlette.background import BackgroundTask
+
+from app.api.coalescing import Flight, FlightDep
+from app.core import cache
+from app.core.config import settings
+from app.models import CV, Contact, Job, School, Skill, Task
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class Entry:
+    document: uuid.UUID
+    version: str
+    stored_at: float
+    body: bytes
+
+    def dump(self) -> bytes:
+        header = {
+            "document": self.document,
+            "version": self.version,
+            "stored_at": self.stored_at,
+        }
+        return orjson.dumps(header) + b"\n" + self.body
+
+    @classmethod
+    def load(cls, data: bytes) -> "Entry":
+        header, _, body = data.partition(b"\n")
+        fields = orjson.loads(header)
+        return cls(
+            document=uuid.UUID(fields["document"]),
+            version=fields["version"],
+            stored_at=fields["stored_at"],
+            body=body,
+        )
+
+
+def document_of(
+    session: Session, model: type[SQLModel], id: uuid.UUID
+) -> uuid.UUID | None:
+    """
+    The id of the CV a row is part of, None if there's no such row.
+    """
+    if model is CV:
+        return id
+    if issubclass(model, (School, Contact)):
+        statement = select(model.cv_id).where(col(model.id) == id)
+        return session.exec(statement).first()
+    parents = {Job: "jobs", Task: "tasks", Skill: "skills"}
+    documents = cache.documents_of(session, **{parents[model]: [id]})
+    return next(iter(documents), None)
+
+
+@dataclass
+class Cached:
+    flight: Flight
+
+    @property
+    def key(self) -> str:
+        return f"response:{self.flight.key!r}"
+
+    def response(
+        self, fetch: Callable[[], Response], model: type[SQLModel], id: uuid.UUID
+    ) -> Response:
+        """
+        The cached response for the row id of model, or the one of fetch,
+        which is cached if it's a 200. When the database fails, a cached
+        response is used instead, even if outdated.
+        """
+        if cache.backend is None:
+            return self.flight.response(fetch)
+        [data] = cache.backend.get_many([self.key])
+        entry = Entry.load(data) if data else None
+        age = time.time() - entry.stored_at if entry else 0.0
+        if entry and entry.version == cache.document_version(entry.document):
+            if age < settings.RESPONSE_CACHE_TTL_SECONDS:
+                return self.cached(entry, "HIT")
+            if age < (
+                settings.RESPONSE_CACHE_TTL_SECONDS
+                + settings.RESPONSE_CACHE_STALE_SECONDS
+            ):
+                response = self.cached(entry, "STALE")
+                response.background = BackgroundTask(self.refresh, fetch, model, id)
+                return response
+        try:
+            return self.store(fetch, model, id)
+        except DBAPIError:
+            if entry and age < settings.RESPONSE_CACHE_STALE_IF_ERROR_SECONDS:
+                logger.warning("Database error, serving %s from cache", self.key)
+                return self.cached(entry, "STALE")
+            raise
+
+    def cached(self, entry: Entry, state: str) -> Response:
+        return Response(
+            content=entry.body,
+            media_type="application/json",
+            headers={"X-Cache": state},
+        )
+
+    def store(
+        self, fetch: Callable[[], Response], model: type[SQLModel], id: uuid.UUID
+    ) -> Response:
+        assert cache.backend is not None
+        # The version before the fetch, so that a write in between makes the
+        # entry outdated rather than cached as current
+        document = document_of(self.flight.session, model, id)
+        version = cache.document_version(document) if document else None
+        response = self.flight.response(fetch)
+        if document and version and response.status_code == 200:
+            entry = Entry(document, version, time.time(), bytes(response.body))
+            cache.backend.set_many(
+                {self.key: entry.dump()},
+                ttl=settings.RESPONSE_CACHE_TTL_SECONDS
+                + max(
+                    settings.RESPONSE_CACHE_STALE_SECONDS,
+                    settings.RESPONSE_CACHE_STALE_IF_ERROR_SECONDS,
+                ),
+            )
+        response.headers["X-Cache"] = "MISS"
+        return response
+
+    def refresh(
+        self, fetch: Callable[[], Response], model: type[SQLModel], id: uuid.UUID
+    ) -> None:
+        # After the response was sent, the session of the request was closed
+        # and is used again for this
+        try:
+            self.store(fetch, model, id)
+        except Exception:
+            logger.exception("Failed to refresh %s", self.key)
+        finally:
+            self.flight.session.close()
+
+
+def get_cached(flight: FlightDep) -> Cached:
+    return Cached(flight)
+
+
+CachedDep = Annotated[Cached, Depends(get_cached)]
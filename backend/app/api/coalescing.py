@@ -0,0 +1,127 @@
+"""
+Single-flight for idempotent GETs: concurrent identical requests share the
+fetch and serialization of the first one instead of each querying the
+database, like when a CV shared in a meeting is opened by everyone at once.
+"""
+
+import threading
+from collections.abc import Callable, Hashable
+from dataclasses import dataclass
+from typing import Annotated, Any, Generic, TypeVar
+
+from fastapi import Depends, Request, Response
+from sqlmodel import Session
+
+from app.api.deps import CurrentUser, SessionDep
+from app.core.metrics import coalesced_requests
+
+T = TypeVar("T")
+
+
+class Call(Generic[T]):
+    def __init__(self) -> None:
+        self.done = threading.Event()
+        self.result: T | None = None
+        self.error: BaseException | None = None
+
+
+class SingleFlight:
+    """
+    Run one call at a time per key, the callers that come while it runs get
+    its result, or its exception, instead of running their own.
+    """
+
+    def __init__(self) -> None:
+        self.lock = threading.Lock()
+        self.calls: dict[Hashable, Call[Any]] = {}
+
+    def do(
+        self,
+        key: Hashable,
+        fn: Callable[[], T],
+        *,
+        before_wait: Callable[[], None] | None = None,
+    ) -> tuple[T, bool]:
+        """
+        The result of fn, or of the call of fn running for key, and whether
+        it was shared. before_wait is called before waiting for that call.
+        """
+        with self.lock:
+            call = self.calls.get(key)
+            leader = call is None
+            if call is None:
+                call = self.calls[key] = Call()
+        if not leader:
+            if before_wait:
+                before_wait()
+            call.done.wait()
+            if call.error is not None:
+                raise call.error
+            return call.result, True  # type: ignore[return-value]
+        try:
+            call.result = fn()
+        except BaseException as e:
+            call.error = e
+            raise
+        finally:
+            with self.lock:
+                del self.calls[key]
+            call.done.set()
+        return call.result, False
+
+
+flights = SingleFlight()
+
+# What the requests share, a new Response is built for each one, since the
+# middlewares change the headers of the one they send
+Shared = tuple[bytes, int, str | None]
+
+
+def share(response: Response) -> Shared:
+    return bytes(response.body), response.status_code, response.media_type
+
+
+def unshare(shared: Shared) -> Response:
+    body, status_code, media_type = shared
+    return Response(content=body, status_code=status_code, media_type=media_type)
+
+
+@dataclass
+class Flight:
+    key: Hashable
+    route: str
+    session: Session
+
+    def response(self, fetch: Callable[[], Response]) -> Response:
+        """
+        The response of fetch, shared with the identical requests running.
+        """
+        # A request that waits doesn't need the connection it authenticated
+        # with, give it back to the pool
+        shared, coalesced = flights.do(
+            self.key, lambda: share(fetch()), before_wait=self.session.close
+        )
+        coalesced_requests.labels(self.route, str(coalesced).lower()).inc()
+        return unshare(shared)
+
+
+def get_flight(
+    request: Request, session: SessionDep, current_user: CurrentUser
+) -> Flight:
+    """
+    Key the request by route, path and query parameters, and authorization
+    scope. The routes it's used on let every user read every row, so the
+    scope is the role, not the user.
+    """
+    # The id of the OpenAPI operation, with the app's generate_unique_id_function
+    route = request.app.router.generate_unique_id_function(request.scope["route"])
+    key = (
+        route,
+        tuple(sorted(request.path_params.items())),
+        tuple(sorted(request.query_params.multi_items())),
+        current_user.is_superuser,
+    )
+    return Flight(key=key, route=route, session=session)
+
+
+FlightDep = Annotated[Flight, Depends(get_flight)]
@@ -0,0 +1,43 @@
+from collections.abc import Callable
+from typing import Annotated, Any
+
+from fastapi import HTTPException, Query
+from sqlalchemy import Select, select
+from sqlmodel import SQLModel
+
+
+def fieldset(model: type[SQLModel]) -> Callable[..., tuple[str, ...]]:
+    """
+    Dependency for the optional ?fields= sparse fieldset of a public model.
+
+    Returns the requested fields, plus id which is always included, in the
+    order of the model, or all the model fields when none are requested.
+    """
+    public_fields = tuple(model.model_fields)
+
+    def get_fields(
+        fields: Annotated[
+            str | None,
+            Query(description="Comma separated fields to return, all by default"),
+        ] = None,
+    ) -> tuple[str, ...]:
+        if not fields:
+            return public_fields
+        requested = {name.strip() for name in fields.split(",") if name.strip()}
+        unknown = requested.difference(public_fields)
+        if unknown:
+            raise HTTPException(
+                status_code=422,
+                detail=f"Unknown fields: {', '.join(sorted(unknown))}",
+            )
+        requested.add("id")
+        return tuple(name for name in public_fields if name in requested)
+
+    return get_fields
+
+
+def select_fields(model: type[SQLModel], fields: tuple[str, ...]) -> Select[Any]:
+    """
+    Select only the columns for fields, in the same order.
+    """
+    return select(*(getattr(model, name) for name in fields))
@@ -0,0 +1,148 @@
+import logging
+from collections.abc import Callable
+from dataclasses import dataclass, field
+from typing import Annotated, Any
+
+from fastapi import HTTPException, Query
+from pydantic import TypeAdapter, ValidationError
+from sqlalchemy import Column, ColumnElement, UniqueConstraint
+from sqlalchemy.sql.elements import UnaryExpression
+from sqlmodel import SQLModel, col
+
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+# Operators of ?filter=field:op:value, in takes comma separated values
+operators: dict[str, Callable[[Any, Any], ColumnElement[bool]]] = {
+    "eq": lambda column, value: column == value,
+    "ne": lambda column, value: column != value,
+    "lt": lambda column, value: column < value,
+    "le": lambda column, value: column <= value,
+    "gt": lambda column, value: column > value,
+    "ge": lambda column, value: column >= value,
+    "in": lambda column, values: column.in_(values),
+}
+
+
+@dataclass
+class Filters:
+    where: list[ColumnElement[bool]] = field(default_factory=list)
+    order_by: list[UnaryExpression[Any]] = field(default_factory=list)
+
+
+def indexed_columns(model: type[SQLModel]) -> set[str]:
+    """
+    Columns that lead a b-tree index, so that Postgres can filter and sort by
+    them without reading the whole table.
+    """
+    table = model.__table__  # type: ignore[attr-defined]
+    indexed = {column.name for column in table.primary_key.columns}
+    for index in table.indexes:
+        # Expression indexes, like lower(email), don't help plain filters
+        first = index.expressions[0]
+        if isinstance(first, Column):
+            indexed.add(first.name)
+    for constraint in table.constraints:
+        if isinstance(constraint, UniqueConstraint):
+            indexed.add(next(iter(constraint.columns)).name)
+    return indexed
+
+
+def check_indexed(model: type[SQLModel], name: str, indexed: set[str]) -> None:
+    if name in indexed:
+        return
+    message = f"Field is not indexed: {name}"
+    if settings.ENVIRONMENT == "production":
+        raise HTTPException(status_code=422, detail=message)
+    logger.warning("%s.%s: %s", model.__name__, name, message)
+
+
+def filters(model: type[SQLModel], public: type[SQLModel]) -> Callable[..., Filters]:
+    """
+    Dependency for ?filter=field:op:value (repeatable) and ?sort=-field,field
+    on the fields of a public model.
+
+    Outside of production, filtering or sorting by a column that isn't
+    indexed only logs a warning, in production it's rejected.
+    """
+    adapters = {
+        name: TypeAdapter(info.rebuild_annotation())
+        for name, info in public.model_fields.items()
+    }
+    indexed = indexed_columns(model)
+
+    def parse_value(name: str, value: str) -> Any:
+        if value == "null":
+            return None
+        try:
+            return adapters[name].validate_python(value)
+        except ValidationError:
+            raise HTTPException(
+                status_code=422, detail=f"Invalid value for {name}: {value}"
+            )
+
+    def get_filters(
+        filter_: Annotated[
+            list[str] | None,
+            Query(
+                alias="filter",
+                description=(
+                    "field:op:value, op is one of "
+                    f"{', '.join(operators)}. Repeat for more than one filter"
+                ),
+            ),
+        ] = None,
+        sort: Annotated[
+            str | None,
+            Query(
+                description="Comma separated fields, prefixed with - to sort descending"
+            ),
+        ] = None,
+    ) -> Filters:
+        result = Filters()
+        for expression in filter_ or []:
+            name, _, rest = expression.partition(":")
+            op, _, value = rest.partition(":")
+            if name not in adapters:
+                raise HTTPException(status_code=422, detail=f"Unknown field: {name}")
+            if op not in operators:
+                raise HTTPException(status_code=422, detail=f"Unknown operator: {op}")
+            check_indexed(model, name, indexed)
+            column = col(getattr(model, name))
+            if op == "in":
+                values = [parse_value(name, v) for v in value.split(",")]
+                result.where.append(operators[op](column, values))
+                continue
+            parsed = parse_value(name, value)
+            if parsed is not None:
+                result.where.append(operators[op](column, parsed))
+            elif op in ("eq", "ne"):
+                result.where.append(
+                    column.is_(None) if op == "eq" else column.is_not(None)
+                )
+            else:
+                raise HTTPException(
+                    status_code=422, detail="Only eq and ne can be used with null"
+                )
+        if sort:
+            names = []
+            for key in sort.split(","):
+                name = key.strip().removeprefix("-")
+                if name not in adapters:
+                    raise HTTPException(
+                        status_code=422, detail=f"Unknown field: {name}"
+                    )
+                check_indexed(model, name, indexed)
+                column = col(getattr(model, name))
+                names.append(name)
+                result.order_by.append(
+                    column.desc() if key.strip().startswith("-") else column.asc()
+                )
+            # Break ties, so that pages don't overlap
+            if "id" not in names:
+                id_column = col(model.id)  # type: ignore[attr-defined]
+                result.order_by.append(id_column.asc())
+        return result
+
+    return get_filters
@@ -0,0 +1,152 @@
+from collections import defaultdict
+from collections.abc import Callable
+from typing import Annotated, Any
+
+from fastapi import HTTPException, Query
+from sqlalchemy import any_, bindparam, select
+from sqlalchemy.dialects.postgresql import ARRAY
+from sqlalchemy.orm import RelationshipDirection, RelationshipProperty, class_mapper
+from sqlmodel import Session, SQLModel
+
+from app.models import (
+    CV,
+    Contact,
+    ContactPublic,
+    CVPublic,
+    Job,
+    JobPublic,
+    School,
+    SchoolPublic,
+    Skill,
+    SkillPublic,
+    Task,
+    TaskPublic,
+)
+
+# Nested relationship names to include, e.g. {"tasks": {"skills": {}}}
+IncludeTree = dict[str, "IncludeTree"]
+
+# Models that can be included, with the public model used to return them
+public_models: dict[type[SQLModel], type[SQLModel]] = {
+    CV: CVPublic,
+    Job: JobPublic,
+    Task: TaskPublic,
+    Skill: SkillPublic,
+    School: SchoolPublic,
+    Contact: ContactPublic,
+}
+
+MAX_INCLUDE_DEPTH = 3
+MAX_INCLUDES = 6
+# Related rows loaded per relationship for one request
+MAX_INCLUDE_ROWS = 1000
+
+
+def relationships(model: type[SQLModel]) -> dict[str, RelationshipProperty[Any]]:
+    return {
+        rel.key: rel
+        for rel in class_mapper(model).relationships
+        if rel.mapper.class_ in public_models
+    }
+
+
+def parse_include(model: type[SQLModel], include: str) -> IncludeTree:
+    tree: IncludeTree = {}
+    paths = {path.strip() for path in include.split(",") if path.strip()}
+    if len(paths) > MAX_INCLUDES:
+        raise HTTPException(
+            status_code=422, detail=f"At most {MAX_INCLUDES} includes are allowed"
+        )
+    for path in sorted(paths):
+        names = path.split(".")
+        if len(names) > MAX_INCLUDE_DEPTH:
+            raise HTTPException(
+                status_code=422,
+                detail=f"Includes can be at most {MAX_INCLUDE_DEPTH} levels deep",
+            )
+        current_model, subtree = model, tree
+        for name in names:
+            rel = relationships(current_model).get(name)
+            if rel is None:
+                raise HTTPException(status_code=422, detail=f"Unknown include: {path}")
+            current_model = rel.mapper.class_
+            subtree = subtree.setdefault(name, {})
+    return tree
+
+
+def includes(model: type[SQLModel]) -> Callable[..., IncludeTree]:
+    """
+    Dependency for the optional ?include= of related resources of a model,
+    e.g. ?include=tasks.skills,cv for jobs.
+    """
+    names = ", ".join(sorted(relationships(model)))
+
+    def get_include(
+        include: Annotated[
+            str | None,
+            Query(
+                description=(
+                    "Comma separated relationships to include, nested with dots. "
+                    f"Available: {names}"
+                )
+            ),
+        ] = None,
+    ) -> IncludeTree:
+        if not include:
+            return {}
+        return parse_include(model, include)
+
+    return get_include
+
+
+def expand(
+    session: Session,
+    model: type[SQLModel],
+    rows: list[dict[str, Any]],
+    include: IncludeTree,
+) -> None:
+    """
+    Add the included relationships to rows of model, in place.
+
+    Each relationship is loaded for all the rows with a single query, so the
+    number of queries is the number of included relationships, whatever the
+    number of rows.
+    """
+    if not rows:
+        return
+    id_column = class_mapper(model).primary_key[0]
+    ids = list({row["id"] for row in rows})
+    for name, subtree in include.items():
+        rel = relationships(model)[name]
+        target = rel.mapper.class_
+        fields = tuple(public_models[target].model_fields)
+        columns = [getattr(target, field) for field in fields]
+        if rel.direction is RelationshipDirection.ONETOMANY:
+            # The foreign key to the rows is on the related table
+            _, key = rel.local_remote_pairs[0]
+            statement = select(key, *columns).where(
+                key == any_(bindparam("ids", ids, type_=ARRAY(key.type)))
+            )
+        else:
+            key = id_column
+            statement = (
+                select(key, *columns)
+                .join_from(model, target, getattr(model, name))
+                .where(key == any_(bindparam("ids", ids, type_=ARRAY(key.type))))
+            )
+        related = session.execute(statement.limit(MAX_INCLUDE_ROWS + 1)).all()
+        if len(related) > MAX_INCLUDE_ROWS:
+            raise HTTPException(
+                status_code=400,
+                detail=f"Too many {name} to include, request fewer rows",
+            )
+        by_key: defaultdict[Any, list[dict[str, Any]]] = defaultdict(list)
+        children = []
+        for key_value, *values in related:
+            child = dict(zip(fields, values, strict=True))
+            by_key[key_value].append(child)
+            children.append(child)
+        for row in rows:
+            matches = by_key.get(row["id"], [])
+            row[name] = matches if rel.uselist else next(iter(matches), None)
+        expand(session, target, children, subtree)
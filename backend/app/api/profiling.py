@@ -0,0 +1,112 @@
+import time
+from collections import deque
+from collections.abc import Callable, Iterator
+from contextlib import contextmanager
+from urllib.parse import parse_qs
+
+from fastapi import HTTPException
+from fastapi.security.utils import get_authorization_scheme_param
+from sqlmodel import Session
+from starlette.concurrency import run_in_threadpool
+from starlette.datastructures import Headers
+from starlette.responses import JSONResponse
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from app.api.deps import get_current_active_superuser, get_current_user, get_db
+from app.core.profiling import Sampler
+
+PROFILE_PARAM = "__profile"
+PROFILE_HEADER = "x-profile"
+
+
+def authorize(
+    authorization: str | None, get_session: Callable[[], Iterator[Session]]
+) -> None:
+    """
+    Raise the error of get_current_active_superuser unless the bearer token
+    is of an active superuser.
+    """
+    scheme, token = get_authorization_scheme_param(authorization)
+    if not authorization or scheme.lower() != "bearer":
+        raise HTTPException(status_code=401, detail="Not authenticated")
+    with contextmanager(get_session)() as session:
+        get_current_active_superuser(get_current_user(session, token))
+
+
+class ProfilingMiddleware:
+    """
+    Profile a request with ?__profile=1 or the X-Profile: 1 header, and
+    return the speedscope JSON of the samples instead of the response.
+
+    Only for superusers, one request at a time, at most max_per_minute, and
+    sampled for at most max_seconds.
+    """
+
+    def __init__(
+        self, app: ASGIApp, *, max_per_minute: int = 10, max_seconds: float = 30
+    ) -> None:
+        self.app = app
+        self.max_per_minute = max_per_minute
+        self.max_seconds = max_seconds
+        self.running = False
+        # Start times of the profiles of the last minute
+        self.started: deque[float] = deque()
+
+    def requested(self, scope: Scope) -> bool:
+        query = parse_qs(scope.get("query_string", b"").decode("latin-1"))
+        if query.get(PROFILE_PARAM, ["0"])[-1] not in ("", "0"):
+            return True
+        return Headers(scope=scope).get(PROFILE_HEADER, "0") not in ("", "0")
+
+    def acquire(self) -> bool:
+        now = time.monotonic()
+        while self.started and now - self.started[0] >= 60:
+            self.started.popleft()
+        if self.running or len(self.started) >= self.max_per_minute:
+            return False
+        self.running = True
+        self.started.append(now)
+        return True
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http" or not self.requested(scope):
+            await self.app(scope, receive, send)
+            return
+        # The session of the routes, or of the tests when get_db is overridden
+        get_session = scope["app"].dependency_overrides.get(get_db, get_db)
+        try:
+            await run_in_threadpool(
+                authorize, Headers(scope=scope).get("authorization"), get_session
+            )
+        except HTTPException as e:
+            response = JSONResponse({"detail": e.detail}, status_code=e.status_code)
+            await response(scope, receive, send)
+            return
+        if not self.acquire():
+            response = JSONResponse(
+                {"detail": "Too many profiled requests, try again later"},
+                status_code=429,
+            )
+            await response(scope, receive, send)
+            return
+
+        status = 500
+
+        async def discard(message: Message) -> None:
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+
+        try:
+            with Sampler(max_seconds=self.max_seconds) as sampler:
+                await self.app(scope, receive, discard)
+        finally:
+            self.running = False
+        name = f"{scope['method']} {scope['path']} {status}"
+        response = JSONResponse(
+            sampler.speedscope(name),
+            headers={
+                "Content-Disposition": 'attachment; filename="profile.speedscope.json"'
+            },
+        )
+        await response(scope, receive, send)
@@ -0,0 +1,99 @@
+import uuid
+from collections import defaultdict
+from typing import Any
+
+from fastapi import APIRouter
+from fastapi.responses import ORJSONResponse
+from sqlalchemy import Uuid, any_, bindparam
+from sqlalchemy.dialects.postgresql import ARRAY
+from sqlmodel import SQLModel, col
+
+from app.api.deps import CurrentUser, SessionDep
+from app.api.fieldsets import select_fields
+from app.models import (
+    CV,
+    BatchGet,
+    BatchResults,
+    BatchType,
+    Certificate,
+    CertificatePublic,
+    Contact,
+    ContactPublic,
+    CVPublic,
+    Item,
+    ItemPublic,
+    Job,
+    JobPublic,
+    Knowledge,
+    KnowledgePublic,
+    Language,
+    LanguagePublic,
+    School,
+    SchoolPublic,
+    Skill,
+    SkillPublic,
+    Task,
+    TaskPublic,
+)
+
+router = APIRouter(prefix="/batch", tags=["batch"])
+
+# Table model, public model and the name used in "not found" errors
+resources: dict[str, tuple[type[SQLModel], type[SQLModel], str]] = {
+    "items": (Item, ItemPublic, "Item"),
+    "cvs": (CV, CVPublic, "CV"),
+    "jobs": (Job, JobPublic, "Job"),
+    "tasks": (Task, TaskPublic, "Task"),
+    "skills": (Skill, SkillPublic, "Skill"),
+    "schools": (School, SchoolPublic, "School"),
+    "contacts": (Contact, ContactPublic, "Contact"),
+    "knowledges": (Knowledge, KnowledgePublic, "Knowledge"),
+    "languages": (Language, LanguagePublic, "Language"),
+    "certificates": (Certificate, CertificatePublic, "Certificate"),
+}
+
+
+@router.post("/get", response_model=BatchResults)
+def batch_get(
+    session: SessionDep, current_user: CurrentUser, batch_in: BatchGet
+) -> Any:
+    """
+    Get many resources by type and id, with one query per type.
+
+    Results are in the order of the keys, missing ones have an error instead
+    of data.
+    """
+    ids_by_type: dict[BatchType, set[uuid.UUID]] = defaultdict(set)
+    for key in batch_in.keys:
+        ids_by_type[key.type].add(key.id)
+
+    found: dict[tuple[str, uuid.UUID], dict[str, Any]] = {}
+    for type_, ids in ids_by_type.items():
+        model, public, _ = resources[type_]
+        fields = tuple(public.model_fields)
+        # A single array parameter, so the statement is the same for any
+        # number of ids
+        id_column = col(model.id)  # type: ignore[attr-defined]
+        statement = select_fields(model, fields).where(
+            id_column == any_(bindparam("ids", list(ids), type_=ARRAY(Uuid())))
+        )
+        for row in session.execute(statement):
+            resource = dict(zip(fields, row, strict=True))
+            found[type_, resource["id"]] = resource
+
+    results: list[dict[str, Any]] = []
+    for key in batch_in.keys:
+        data = found.get((key.type, key.id))
+        if data is None:
+            error = f"{resources[key.type][2]} not found"
+        elif (
+            key.type == "items"
+            and not current_user.is_superuser
+            and data["owner_id"] != current_user.id
+        ):
+            error = "Not enough permissions"
+        else:
+            results.append({"type": key.type, "id": key.id, "data": data})
+            continue
+        results.append({"type": key.type, "id": key.id, "error": error})
+    return ORJSONResponse({"data": results})
@@ -1,10 +1,14 @@
 import uuid
-from typing import Any
+from typing import Annotated, Any
 
-from fastapi import APIRouter, HTTPException
-from sqlmodel import func, select
+from fastapi import APIRouter, Depends, HTTPException
+from sqlalchemy.exc import IntegrityError
 
+from app import crud
 from app.api.deps import CurrentUser, SessionDep
+from app.api.fieldsets import fieldset, select_fields
+from app.api.filters import Filters, filters
+from app.api.responses import as_dicts, list_response
 from app.models import Certificate, CertificateCreate, CertificateUpdate, CertificatePublic, Message
 
 router = APIRouter(prefix="/certificates", tags=["certificates"])
@@ -12,14 +16,25 @@ router = APIRouter(prefix="/certificates", tags=["certificates"])
 
 @router.get("/", response_model=list[CertificatePublic])
 def read_certificates(
-    session: SessionDep, current_user: CurrentUser, skip: int = 0, limit: int = 100
+    session: SessionDep,
+    current_user: CurrentUser,
+    fields: Annotated[tuple[str, ...], Depends(fieldset(CertificatePublic))],
+    query: Annotated[Filters, Depends(filters(Certificate, CertificatePublic))],
+    skip: int = 0,
+    limit: int = 100,
 ) -> Any:
     """
     Retrieve certificates.
     """
-    statement = select(Certificate).offset(skip).limit(limit)
-    certificates = session.exec(statement).all()
-    return certificates
+    statement = (
+        select_fields(Certificate, fields)
+        .where(*query.where)
+        .order_by(*query.order_by)
+        .offset(skip)
+        .limit(limit)
+    )
+    certificates = session.execute(statement).all()
+    return list_response(as_dicts(fields, certificates))
 
 
 @router.get("/{id}", response_model=CertificatePublic)
@@ -42,11 +57,31 @@ def create_certificate(
     """
     certificate = Certificate.model_validate(certificate_in)
     session.add(certificate)
-    session.commit()
+    try:
+        session.commit()
+    except IntegrityError:
+        session.rollback()
+        raise HTTPException(status_code=409, detail="Certificate already exists")
     session.refresh(certificate)
     return certificate
 
 
+@router.put("/", response_model=CertificatePublic)
+def upsert_certificate(
+    *,
+    session: SessionDep,
+    current_user: CurrentUser,  # noqa: ARG001
+    certificate_in: CertificateCreate,
+) -> Any:
+    """
+    Create a certificate, or update the existing one with the same name.
+    """
+    certificate = crud.upsert_certificate(
+        session=session, certificate_data=certificate_in.model_dump()
+    )
+    return certificate
+
+
 @router.put("/{id}", response_model=CertificatePublic)
 def update_certificate(
     *,
@@ -64,7 +99,11 @@ def update_certificate(
     update_dict = certificate_in.model_dump(exclude_unset=True)
     certificate.sqlmodel_update(update_dict)
     session.add(certificate)
-    session.commit()
+    try:
+        session.commit()
+    except IntegrityError:
+        session.rollback()
+        raise HTTPException(status_code=409, detail="Certificate already exists")
     session.refresh(certificate)
     return certificate
 
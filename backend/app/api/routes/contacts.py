@@ -1,10 +1,14 @@
 import uuid
-from typing import Any
+from typing import Annotated, Any
 
-from fastapi import APIRouter, HTTPException
-from sqlmodel import func, select
+from fastapi import APIRouter, Depends, HTTPException, Response
 
+from app.api.caching import CachedDep
 from app.api.deps import CurrentUser, SessionDep
+from app.api.fieldsets import fieldset, select_fields
+from app.api.filters import Filters, filters
+from app.api.includes import IncludeTree, expand, includes
+from app.api.responses import as_dicts, list_response, object_response
 from app.models import Contact, ContactCreate, ContactUpdate, ContactPublic, Message
 
 router = APIRouter(prefix="/contacts", tags=["contacts"])
@@ -12,25 +16,50 @@ router = APIRouter(prefix="/contacts", tags=["contacts"])
 
 @router.get("/", response_model=list[ContactPublic])
 def read_contacts(
-    session: SessionDep, current_user: CurrentUser, skip: int = 0, limit: int = 100
+    session: SessionDep,
+    current_user: CurrentUser,
+    fields: Annotated[tuple[str, ...], Depends(fieldset(ContactPublic))],
+    query: Annotated[Filters, Depends(filters(Contact, ContactPublic))],
+    include: Annotated[IncludeTree, Depends(includes(Contact))],
+    skip: int = 0,
+    limit: int = 100,
 ) -> Any:
     """
     Retrieve contacts.
     """
-    statement = select(Contact).offset(skip).limit(limit)
-    contacts = session.exec(statement).all()
-    return contacts
+    statement = (
+        select_fields(Contact, fields)
+        .where(*query.where)
+        .order_by(*query.order_by)
+        .offset(skip)
+        .limit(limit)
+    )
+    contacts = as_dicts(fields, session.execute(statement))
+    expand(session, Contact, contacts, include)
+    return list_response(contacts)
 
 
 @router.get("/{id}", response_model=ContactPublic)
-def read_contact(session: SessionDep, current_user: CurrentUser, id: uuid.UUID) -> Any:
+def read_contact(
+    session: SessionDep,
+    current_user: CurrentUser,
+    id: uuid.UUID,
+    include: Annotated[IncludeTree, Depends(includes(Contact))],
+    cached: CachedDep,
+) -> Any:
     """
     Get contact by ID.
     """
-    contact = session.get(Contact, id)
-    if not contact:
-        raise HTTPException(status_code=404, detail="Contact not found")
-    return contact
+
+    def fetch() -> Response:
+        contact = session.get(Contact, id)
+        if not contact:
+            raise HTTPException(status_code=404, detail="Contact not found")
+        data = contact.model_dump(include=set(ContactPublic.model_fields))
+        expand(session, Contact, [data], include)
+        return object_response(data)
+
+    return cached.response(fetch, Contact, id)
 
 
 @router.post("/", response_model=ContactPublic)
@@ -1,10 +1,15 @@
 import uuid
-from typing import Any
+from typing import Annotated, Any
 
-from fastapi import APIRouter, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Response
 from sqlmodel import func, select
 
+from app.api.caching import CachedDep
 from app.api.deps import CurrentUser, SessionDep
+from app.api.fieldsets import fieldset, select_fields
+from app.api.filters import Filters, filters
+from app.api.includes import IncludeTree, expand, includes
+from app.api.responses import as_dicts, object_response, page_response
 from app.models import CV, Job, Task, Skill, School, Contact, Knowledge, Language, Certificate
 from app.models import CVCreate, CVUpdate, CVPublic, CVsPublic, Message
 
@@ -13,27 +18,52 @@ router = APIRouter(prefix="/cvs", tags=["cvs"])
 
 @router.get("/", response_model=CVsPublic)
 def read_cvs(
-    session: SessionDep, current_user: CurrentUser, skip: int = 0, limit: int = 100
+    session: SessionDep,
+    current_user: CurrentUser,
+    fields: Annotated[tuple[str, ...], Depends(fieldset(CVPublic))],
+    query: Annotated[Filters, Depends(filters(CV, CVPublic))],
+    include: Annotated[IncludeTree, Depends(includes(CV))],
+    skip: int = 0,
+    limit: int = 100,
 ) -> Any:
     """
     Retrieve CVs.
     """
-    count_statement = select(func.count()).select_from(CV)
+    count_statement = select(func.count()).select_from(CV).where(*query.where)
     count = session.exec(count_statement).one()
-    statement = select(CV).offset(skip).limit(limit)
-    cvs = session.exec(statement).all()
-    return CVsPublic(data=cvs, count=count)
+    statement = (
+        select_fields(CV, fields)
+        .where(*query.where)
+        .order_by(*query.order_by)
+        .offset(skip)
+        .limit(limit)
+    )
+    cvs = as_dicts(fields, session.execute(statement))
+    expand(session, CV, cvs, include)
+    return page_response(cvs, count)
 
 
 @router.get("/{id}", response_model=CVPublic)
-def read_cv(session: SessionDep, current_user: CurrentUser, id: uuid.UUID) -> Any:
+def read_cv(
+    session: SessionDep,
+    current_user: CurrentUser,
+    id: uuid.UUID,
+    include: Annotated[IncludeTree, Depends(includes(CV))],
+    cached: CachedDep,
+) -> Any:
     """
     Get CV by ID.
     """
-    cv = session.get(CV, id)
-    if not cv:
-        raise HTTPException(status_code=404, detail="CV not found")
-    return cv
+
+    def fetch() -> Response:
+        cv = session.get(CV, id)
+        if not cv:
+            raise HTTPException(status_code=404, detail="CV not found")
+        data = cv.model_dump(include=set(CVPublic.model_fields))
+        expand(session, CV, [data], include)
+        return object_response(data)
+
+    return cached.response(fetch, CV, id)
 
 
 @router.post("/", response_model=CVPublic)
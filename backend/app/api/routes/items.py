@@ -1,10 +1,13 @@
 import uuid
-from typing import Any
+from typing import Annotated, Any
 
-from fastapi import APIRouter, HTTPException
-from sqlmodel import func, select
+from fastapi import APIRouter, Depends, HTTPException
+from sqlmodel import col, func, select
 
 from app.api.deps import CurrentUser, SessionDep
+from app.api.fieldsets import fieldset, select_fields
+from app.api.filters import Filters, filters
+from app.api.responses import as_dicts, page_response
 from app.models import Item, ItemCreate, ItemPublic, ItemsPublic, ItemUpdate, Message
 
 router = APIRouter(prefix="/items", tags=["items"])
@@ -12,33 +15,47 @@ router = APIRouter(prefix="/items", tags=["items"])
 
 @router.get("/", response_model=ItemsPublic)
 def read_items(
-    session: SessionDep, current_user: CurrentUser, skip: int = 0, limit: int = 100
+    session: SessionDep,
+    current_user: CurrentUser,
+    fields: Annotated[tuple[str, ...], Depends(fieldset(ItemPublic))],
+    query: Annotated[Filters, Depends(filters(Item, ItemPublic))],
+    skip: int = 0,
+    limit: int = 100,
 ) -> Any:
     """
     Retrieve items.
     """
 
     if current_user.is_superuser:
-        count_statement = select(func.count()).select_from(Item)
+        count_statement = select(func.count()).select_from(Item).where(*query.where)
         count = session.exec(count_statement).one()
-        statement = select(Item).offset(skip).limit(limit)
-        items = session.exec(statement).all()
+        statement = (
+            select_fields(Item, fields)
+            .where(*query.where)
+            .order_by(*query.order_by)
+            .offset(skip)
+            .limit(limit)
+        )
+        items = session.execute(statement).all()
     else:
         count_statement = (
             select(func.count())
             .select_from(Item)
-            .where(Item.owner_id == current_user.id)
+            .where(col(Item.owner_id) == current_user.id)
+            .where(*query.where)
         )
         count = session.exec(count_statement).one()
         statement = (
-            select(Item)
-            .where(Item.owner_id == current_user.id)
+            select_fields(Item, fields)
+            .where(col(Item.owner_id) == current_user.id)
+            .where(*query.where)
+            .order_by(*query.order_by)
             .offset(skip)
             .limit(limit)
         )
-        items = session.exec(statement).all()
+        items = session.execute(statement).all()
 
-    return ItemsPublic(data=items, count=count)
+    return page_response(as_dicts(fields, items), count)
 
 
 @router.get("/{id}", response_model=ItemPublic)
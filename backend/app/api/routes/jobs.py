@@ -1,10 +1,14 @@
 import uuid
-from typing import Any
+from typing import Annotated, Any
 
-from fastapi import APIRouter, HTTPException
-from sqlmodel import func, select
+from fastapi import APIRouter, Depends, HTTPException, Response
 
+from app.api.caching import CachedDep
 from app.api.deps import CurrentUser, SessionDep
+from app.api.fieldsets import fieldset, select_fields
+from app.api.filters import Filters, filters
+from app.api.includes import IncludeTree, expand, includes
+from app.api.responses import as_dicts, list_response, object_response
 from app.models import Job, JobCreate, JobUpdate, JobPublic, Message
 
 router = APIRouter(prefix="/jobs", tags=["jobs"])
@@ -12,25 +16,50 @@ router = APIRouter(prefix="/jobs", tags=["jobs"])
 
 @router.get("/", response_model=list[JobPublic])
 def read_jobs(
-    session: SessionDep, current_user: CurrentUser, skip: int = 0, limit: int = 100
+    session: SessionDep,
+    current_user: CurrentUser,
+    fields: Annotated[tuple[str, ...], Depends(fieldset(JobPublic))],
+    query: Annotated[Filters, Depends(filters(Job, JobPublic))],
+    include: Annotated[IncludeTree, Depends(includes(Job))],
+    skip: int = 0,
+    limit: int = 100,
 ) -> Any:
     """
     Retrieve jobs.
     """
-    statement = select(Job).offset(skip).limit(limit)
-    jobs = session.exec(statement).all()
-    return jobs
+    statement = (
+        select_fields(Job, fields)
+        .where(*query.where)
+        .order_by(*query.order_by)
+        .offset(skip)
+        .limit(limit)
+    )
+    jobs = as_dicts(fields, session.execute(statement))
+    expand(session, Job, jobs, include)
+    return list_response(jobs)
 
 
 @router.get("/{id}", response_model=JobPublic)
-def read_job(session: SessionDep, current_user: CurrentUser, id: uuid.UUID) -> Any:
+def read_job(
+    session: SessionDep,
+    current_user: CurrentUser,
+    id: uuid.UUID,
+    include: Annotated[IncludeTree, Depends(includes(Job))],
+    cached: CachedDep,
+) -> Any:
     """
     Get job by ID.
     """
-    job = session.get(Job, id)
-    if not job:
-        raise HTTPException(status_code=404, detail="Job not found")
-    return job
+
+    def fetch() -> Response:
+        job = session.get(Job, id)
+        if not job:
+            raise HTTPException(status_code=404, detail="Job not found")
+        data = job.model_dump(include=set(JobPublic.model_fields))
+        expand(session, Job, [data], include)
+        return object_response(data)
+
+    return cached.response(fetch, Job, id)
 
 
 @router.post("/", response_model=JobPublic)
@@ -1,10 +1,14 @@
 import uuid
-from typing import Any
+from typing import Annotated, Any
 
-from fastapi import APIRouter, HTTPException
-from sqlmodel import func, select
+from fastapi import APIRouter, Depends, HTTPException
+from sqlalchemy.exc import IntegrityError
 
+from app import crud
 from app.api.deps import CurrentUser, SessionDep
+from app.api.fieldsets import fieldset, select_fields
+from app.api.filters import Filters, filters
+from app.api.responses import as_dicts, list_response
 from app.models import Knowledge, KnowledgeCreate, KnowledgeUpdate, KnowledgePublic, Message
 
 router = APIRouter(prefix="/knowledges", tags=["knowledges"])
@@ -12,14 +16,25 @@ router = APIRouter(prefix="/knowledges", tags=["knowledges"])
 
 @router.get("/", response_model=list[KnowledgePublic])
 def read_knowledges(
-    session: SessionDep, current_user: CurrentUser, skip: int = 0, limit: int = 100
+    session: SessionDep,
+    current_user: CurrentUser,
+    fields: Annotated[tuple[str, ...], Depends(fieldset(KnowledgePublic))],
+    query: Annotated[Filters, Depends(filters(Knowledge, KnowledgePublic))],
+    skip: int = 0,
+    limit: int = 100,
 ) -> Any:
     """
     Retrieve knowledges.
     """
-    statement = select(Knowledge).offset(skip).limit(limit)
-    knowledges = session.exec(statement).all()
-    return knowledges
+    statement = (
+        select_fields(Knowledge, fields)
+        .where(*query.where)
+        .order_by(*query.order_by)
+        .offset(skip)
+        .limit(limit)
+    )
+    knowledges = session.execute(statement).all()
+    return list_response(as_dicts(fields, knowledges))
 
 
 @router.get("/{id}", response_model=KnowledgePublic)
@@ -42,11 +57,31 @@ def create_knowledge(
     """
     knowledge = Knowledge.model_validate(knowledge_in)
     session.add(knowledge)
-    session.commit()
+    try:
+        session.commit()
+    except IntegrityError:
+        session.rollback()
+        raise HTTPException(status_code=409, detail="Knowledge already exists")
     session.refresh(knowledge)
     return knowledge
 
 
+@router.put("/", response_model=KnowledgePublic)
+def upsert_knowledge(
+    *,
+    session: SessionDep,
+    current_user: CurrentUser,  # noqa: ARG001
+    knowledge_in: KnowledgeCreate,
+) -> Any:
+    """
+    Create a knowledge, or update the existing one with the same name.
+    """
+    knowledge = crud.upsert_knowledge(
+        session=session, knowledge_data=knowledge_in.model_dump()
+    )
+    return knowledge
+
+
 @router.put("/{id}", response_model=KnowledgePublic)
 def update_knowledge(
     *,
@@ -64,7 +99,11 @@ def update_knowledge(
     update_dict = knowledge_in.model_dump(exclude_unset=True)
     knowledge.sqlmodel_update(update_dict)
     session.add(knowledge)
-    session.commit()
+    try:
+        session.commit()
+    except IntegrityError:
+        session.rollback()
+        raise HTTPException(status_code=409, detail="Knowledge already exists")
     session.refresh(knowledge)
     return knowledge
 
@@ -1,10 +1,14 @@
 import uuid
-from typing import Any
+from typing import Annotated, Any
 
-from fastapi import APIRouter, HTTPException
-from sqlmodel import func, select
+from fastapi import APIRouter, Depends, HTTPException
+from sqlalchemy.exc import IntegrityError
 
+from app import crud
 from app.api.deps import CurrentUser, SessionDep
+from app.api.fieldsets import fieldset, select_fields
+from app.api.filters import Filters, filters
+from app.api.responses import as_dicts, list_response
 from app.models import Language, LanguageCreate, LanguageUpdate, LanguagePublic, Message
 
 router = APIRouter(prefix="/languages", tags=["languages"])
@@ -12,14 +16,25 @@ router = APIRouter(prefix="/languages", tags=["languages"])
 
 @router.get("/", response_model=list[LanguagePublic])
 def read_languages(
-    session: SessionDep, current_user: CurrentUser, skip: int = 0, limit: int = 100
+    session: SessionDep,
+    current_user: CurrentUser,
+    fields: Annotated[tuple[str, ...], Depends(fieldset(LanguagePublic))],
+    query: Annotated[Filters, Depends(filters(Language, LanguagePublic))],
+    skip: int = 0,
+    limit: int = 100,
 ) -> Any:
     """
     Retrieve languages.
     """
-    statement = select(Language).offset(skip).limit(limit)
-    languages = session.exec(statement).all()
-    return languages
+    statement = (
+        select_fields(Language, fields)
+        .where(*query.where)
+        .order_by(*query.order_by)
+        .offset(skip)
+        .limit(limit)
+    )
+    languages = session.execute(statement).all()
+    return list_response(as_dicts(fields, languages))
 
 
 @router.get("/{id}", response_model=LanguagePublic)
@@ -42,11 +57,31 @@ def create_language(
     """
     language = Language.model_validate(language_in)
     session.add(language)
-    session.commit()
+    try:
+        session.commit()
+    except IntegrityError:
+        session.rollback()
+        raise HTTPException(status_code=409, detail="Language already exists")
     session.refresh(language)
     return language
 
 
+@router.put("/", response_model=LanguagePublic)
+def upsert_language(
+    *,
+    session: SessionDep,
+    current_user: CurrentUser,  # noqa: ARG001
+    language_in: LanguageCreate,
+) -> Any:
+    """
+    Create a language, or update the existing one with the same language.
+    """
+    language = crud.upsert_language(
+        session=session, language_data=language_in.model_dump()
+    )
+    return language
+
+
 @router.put("/{id}", response_model=LanguagePublic)
 def update_language(
     *,
@@ -64,7 +99,11 @@ def update_language(
     update_dict = language_in.model_dump(exclude_unset=True)
     language.sqlmodel_update(update_dict)
     session.add(language)
-    session.commit()
+    try:
+        session.commit()
+    except IntegrityError:
+        session.rollback()
+        raise HTTPException(status_code=409, detail="Language already exists")
     session.refresh(language)
     return language
 
@@ -27,7 +27,7 @@ def create_user(user_in: PrivateUserCreate, session: SessionDep) -> Any:
     """
 
     user = User(
-        email=user_in.email,
+        email=user_in.email.lower(),
         full_name=user_in.full_name,
         hashed_password=get_password_hash(user_in.password),
     )
@@ -1,10 +1,14 @@
 import uuid
-from typing import Any
+from typing import Annotated, Any
 
-from fastapi import APIRouter, HTTPException
-from sqlmodel import func, select
+from fastapi import APIRouter, Depends, HTTPException, Response
 
+from app.api.caching import CachedDep
 from app.api.deps import CurrentUser, SessionDep
+from app.api.fieldsets import fieldset, select_fields
+from app.api.filters import Filters, filters
+from app.api.includes import IncludeTree, expand, includes
+from app.api.responses import as_dicts, list_response, object_response
 from app.models import School, SchoolCreate, SchoolUpdate, SchoolPublic, Message
 
 router = APIRouter(prefix="/schools", tags=["schools"])
@@ -12,25 +16,50 @@ router = APIRouter(prefix="/schools", tags=["schools"])
 
 @router.get("/", response_model=list[SchoolPublic])
 def read_schools(
-    session: SessionDep, current_user: CurrentUser, skip: int = 0, limit: int = 100
+    session: SessionDep,
+    current_user: CurrentUser,
+    fields: Annotated[tuple[str, ...], Depends(fieldset(SchoolPublic))],
+    query: Annotated[Filters, Depends(filters(School, SchoolPublic))],
+    include: Annotated[IncludeTree, Depends(includes(School))],
+    skip: int = 0,
+    limit: int = 100,
 ) -> Any:
     """
     Retrieve schools.
     """
-    statement = select(School).offset(skip).limit(limit)
-    schools = session.exec(statement).all()
-    return schools
+    statement = (
+        select_fields(School, fields)
+        .where(*query.where)
+        .order_by(*query.order_by)
+        .offset(skip)
+        .limit(limit)
+    )
+    schools = as_dicts(fields, session.execute(statement))
+    expand(session, School, schools, include)
+    return list_response(schools)
 
 
 @router.get("/{id}", response_model=SchoolPublic)
-def read_school(session: SessionDep, current_user: CurrentUser, id: uuid.UUID) -> Any:
+def read_school(
+    session: SessionDep,
+    current_user: CurrentUser,
+    id: uuid.UUID,
+    include: Annotated[IncludeTree, Depends(includes(School))],
+    cached: CachedDep,
+) -> Any:
     """
     Get school by ID.
     """
-    school = session.get(School, id)
-    if not school:
-        raise HTTPException(status_code=404, detail="School not found")
-    return school
+
+    def fetch() -> Response:
+        school = session.get(School, id)
+        if not school:
+            raise HTTPException(status_code=404, detail="School not found")
+        data = school.model_dump(include=set(SchoolPublic.model_fields))
+        expand(session, School, [data], include)
+        return object_response(data)
+
+    return cached.response(fetch, School, id)
 
 
 @router.post("/", response_model=SchoolPublic)
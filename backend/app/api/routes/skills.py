@@ -1,10 +1,14 @@
 import uuid
-from typing import Any
+from typing import Annotated, Any
 
-from fastapi import APIRouter, HTTPException
-from sqlmodel import func, select
+from fastapi import APIRouter, Depends, HTTPException, Response
 
+from app.api.caching import CachedDep
 from app.api.deps import CurrentUser, SessionDep
+from app.api.fieldsets import fieldset, select_fields
+from app.api.filters import Filters, filters
+from app.api.includes import IncludeTree, expand, includes
+from app.api.responses import as_dicts, list_response, object_response
 from app.models import Skill, SkillCreate, SkillUpdate, SkillPublic, Message
 
 router = APIRouter(prefix="/skills", tags=["skills"])
@@ -12,25 +16,50 @@ router = APIRouter(prefix="/skills", tags=["skills"])
 
 @router.get("/", response_model=list[SkillPublic])
 def read_skills(
-    session: SessionDep, current_user: CurrentUser, skip: int = 0, limit: int = 100
+    session: SessionDep,
+    current_user: CurrentUser,
+    fields: Annotated[tuple[str, ...], Depends(fieldset(SkillPublic))],
+    query: Annotated[Filters, Depends(filters(Skill, SkillPublic))],
+    include: Annotated[IncludeTree, Depends(includes(Skill))],
+    skip: int = 0,
+    limit: int = 100,
 ) -> Any:
     """
     Retrieve skills.
     """
-    statement = select(Skill).offset(skip).limit(limit)
-    skills = session.exec(statement).all()
-    return skills
+    statement = (
+        select_fields(Skill, fields)
+        .where(*query.where)
+        .order_by(*query.order_by)
+        .offset(skip)
+        .limit(limit)
+    )
+    skills = as_dicts(fields, session.execute(statement))
+    expand(session, Skill, skills, include)
+    return list_response(skills)
 
 
 @router.get("/{id}", response_model=SkillPublic)
-def read_skill(session: SessionDep, current_user: CurrentUser, id: uuid.UUID) -> Any:
+def read_skill(
+    session: SessionDep,
+    current_user: CurrentUser,
+    id: uuid.UUID,
+    include: Annotated[IncludeTree, Depends(includes(Skill))],
+    cached: CachedDep,
+) -> Any:
     """
     Get skill by ID.
     """
-    skill = session.get(Skill, id)
-    if not skill:
-        raise HTTPException(status_code=404, detail="Skill not found")
-    return skill
+
+    def fetch() -> Response:
+        skill = session.get(Skill, id)
+        if not skill:
+            raise HTTPException(status_code=404, detail="Skill not found")
+        data = skill.model_dump(include=set(SkillPublic.model_fields))
+        expand(session, Skill, [data], include)
+        return object_response(data)
+
+    return cached.response(fetch, Skill, id)
 
 
 @router.post("/", response_model=SkillPublic)
@@ -1,10 +1,14 @@
 import uuid
-from typing import Any
+from typing import Annotated, Any
 
-from fastapi import APIRouter, HTTPException
-from sqlmodel import func, select
+from fastapi import APIRouter, Depends, HTTPException, Response
 
+from app.api.caching import CachedDep
 from app.api.deps import CurrentUser, SessionDep
+from app.api.fieldsets import fieldset, select_fields
+from app.api.filters import Filters, filters
+from app.api.includes import IncludeTree, expand, includes
+from app.api.responses import as_dicts, list_response, object_response
 from app.models import Task, TaskCreate, TaskUpdate, TaskPublic, Message
 
 router = APIRouter(prefix="/tasks", tags=["tasks"])
@@ -12,25 +16,50 @@ router = APIRouter(prefix="/tasks", tags=["tasks"])
 
 @router.get("/", response_model=list[TaskPublic])
 def read_tasks(
-    session: SessionDep, current_user: CurrentUser, skip: int = 0, limit: int = 100
+    session: SessionDep,
+    current_user: CurrentUser,
+    fields: Annotated[tuple[str, ...], Depends(fieldset(TaskPublic))],
+    query: Annotated[Filters, Depends(filters(Task, TaskPublic))],
+    include: Annotated[IncludeTree, Depends(includes(Task))],
+    skip: int = 0,
+    limit: int = 100,
 ) -> Any:
     """
     Retrieve tasks.
     """
-    statement = select(Task).offset(skip).limit(limit)
-    tasks = session.exec(statement).all()
-    return tasks
+    statement = (
+        select_fields(Task, fields)
+        .where(*query.where)
+        .order_by(*query.order_by)
+        .offset(skip)
+        .limit(limit)
+    )
+    tasks = as_dicts(fields, session.execute(statement))
+    expand(session, Task, tasks, include)
+    return list_response(tasks)
 
 
 @router.get("/{id}", response_model=TaskPublic)
-def read_task(session: SessionDep, current_user: CurrentUser, id: uuid.UUID) -> Any:
+def read_task(
+    session: SessionDep,
+    current_user: CurrentUser,
+    id: uuid.UUID,
+    include: Annotated[IncludeTree, Depends(includes(Task))],
+    cached: CachedDep,
+) -> Any:
     """
     Get task by ID.
     """
-    task = session.get(Task, id)
-    if not task:
-        raise HTTPException(status_code=404, detail="Task not found")
-    return task
+
+    def fetch() -> Response:
+        task = session.get(Task, id)
+        if not task:
+            raise HTTPException(status_code=404, detail="Task not found")
+        data = task.model_dump(include=set(TaskPublic.model_fields))
+        expand(session, Task, [data], include)
+        return object_response(data)
+
+    return cached.response(fetch, Task, id)
 
 
 @router.post("/", response_model=TaskPublic)
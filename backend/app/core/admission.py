@@ -0,0 +1,119 @@
+"""
+Admission control: cap the requests handled at once per class of route, so
+that when the database slows down requests wait in a short queue, and are
+answered 503 when they waited too long, instead of all of them piling up in
+the thread pool, holding pooled connections, until the clients time out.
+"""
+
+import math
+from collections.abc import Mapping
+
+import anyio
+from anyio import to_thread
+from starlette.responses import JSONResponse
+from starlette.types import ASGIApp, Receive, Scope, Send
+
+from app.core.metrics import admission_queue_depth, requests_shed
+
+READ_METHODS = {"GET", "HEAD", "OPTIONS"}
+# Paths, after the API prefix, of the routes that hash or verify passwords
+AUTH_PATHS = ("/login/", "/password-recovery", "/reset-password/")
+# And the methods and paths of the user routes that do
+AUTH_ROUTES = {
+    ("POST", "/users/"),
+    ("POST", "/users/signup"),
+    ("PATCH", "/users/me/password"),
+}
+
+
+def route_class(method: str, path: str) -> str:
+    """
+    The class of route a request is for: auth, read or write.
+    """
+    if path.startswith(AUTH_PATHS) or (method, path) in AUTH_ROUTES:
+        return "auth"
+    if method in READ_METHODS:
+        return "read"
+    return "write"
+
+
+def set_thread_pool_size(size: int) -> None:
+    """
+    Set the number of threads sync routes and dependencies run in, must be
+    called in the event loop.
+    """
+    to_thread.current_default_thread_limiter().total_tokens = size
+
+
+class AdmissionMiddleware:
+    """
+    Handle at most limits[class] requests at once for each route class of
+    route_class(), the others wait in a queue, in order. Requests that
+    waited for queue_seconds are answered 503 with a Retry-After header.
+
+    Only the paths under prefix are limited, not /metrics or the docs, nor
+    the exempt ones, like the health check, so that probes don't fail
+    because of the load. The limits are per process.
+    """
+
+    def __init__(
+        self,
+        app: ASGIApp,
+        *,
+        prefix: str,
+        limits: Mapping[str, int],
+        queue_seconds: float,
+        retry_after_seconds: float = 1,
+        exempt: tuple[str, ...] = (),
+    ) -> None:
+        self.app = app
+        self.prefix = prefix
+        self.limits = limits
+        self.queue_seconds = queue_seconds
+        self.retry_after = str(math.ceil(retry_after_seconds))
+        self.exempt = exempt
+        self.semaphores: dict[str, anyio.Semaphore] = {}
+
+    def semaphore(self, name: str) -> anyio.Semaphore | None:
+        if name not in self.limits:
+            return None
+        if name not in self.semaphores:
+            # FIFO, so that the requests that waited longest go first
+            self.semaphores[name] = anyio.Semaphore(self.limits[name])
+        return self.semaphores[name]
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        path = scope.get("path", "")
+        if (
+            scope["type"] != "http"
+            or not path.startswith(self.prefix)
+            or path.startswith(self.exempt)
+        ):
+            await self.app(scope, receive, send)
+            return
+        name = route_class(scope["method"], path[len(self.prefix) :])
+        semaphore = self.semaphore(name)
+        if semaphore is None:
+            await self.app(scope, receive, send)
+            return
+        admitted = False
+        admission_queue_depth.labels(name).inc()
+        try:
+            with anyio.move_on_after(self.queue_seconds):
+                await semaphore.acquire()
+                admitted = True
+        finally:
+            admission_queue_depth.labels(name).dec()
+        if not admitted:
+            requests_shed.labels(name).inc()
+            response = JSONResponse(
+                {"detail": "The server is overloaded, try again later"},
+                status_code=503,
+                headers={"Retry-After": self.retry_after},
+            )
+            await response(scope, receive, send)
+            return
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            semaphore.release()
@@ -0,0 +1,204 @@
+"""
+Storage of the response cache, and the versions of the CV documents it's
+invalidated with.
+
+A CV and its contact, schools, jobs, tasks and skills form one document,
+with one version: a random token replaced on every commit that writes any
+of its rows. A cached response records the version of its document, and is
+only used while that is still the version, so includes of related rows are
+invalidated too.
+"""
+
+import threading
+import uuid
+from collections import OrderedDict
+from collections.abc import Iterable
+from typing import Any, Protocol
+
+from sqlalchemy import event, inspect
+from sqlmodel import Session, col, select
+
+from app.core.config import settings
+from app.models import CV, Contact, Job, School, Skill, Task
+
+
+class CacheBackend(Protocol):
+    def get_many(self, keys: list[str]) -> list[bytes | None]: ...
+
+    def set_many(self, values: dict[str, bytes], ttl: float | None = None) -> None:
+        """
+        Set the keys, expiring after ttl seconds if the backend can.
+        """
+        ...
+
+
+class MemoryBackend:
+    """
+    In-process LRU cache, the least recently used keys are evicted when the
+    keys and values take more than max_bytes. Entries don't expire, ttl is
+    ignored. Each process has its own.
+    """
+
+    def __init__(self, max_bytes: int) -> None:
+        self.max_bytes = max_bytes
+        self.size = 0
+        self.values: OrderedDict[str, bytes] = OrderedDict()
+        self.lock = threading.Lock()
+
+    def get_many(self, keys: list[str]) -> list[bytes | None]:
+        found: list[bytes | None] = []
+        with self.lock:
+            for key in keys:
+                value = self.values.get(key)
+                if value is not None:
+                    self.values.move_to_end(key)
+                found.append(value)
+        return found
+
+    def set_many(self, values: dict[str, bytes], ttl: float | None = None) -> None:  # noqa: ARG002
+        with self.lock:
+            for key, value in values.items():
+                old = self.values.pop(key, None)
+                if old is not None:
+                    self.size -= len(key) + len(old)
+                self.values[key] = value
+                self.size += len(key) + len(value)
+            while self.size > self.max_bytes and self.values:
+                key, value = self.values.popitem(last=False)
+                self.size -= len(key) + len(value)
+
+
+class RedisBackend:
+    """
+    Shared by all processes, needs the redis extra: uv sync --extra redis.
+    """
+
+    def __init__(self, url: str) -> None:
+        import redis  # type: ignore[import-not-found, unused-ignore]
+
+        self.client = redis.Redis.from_url(url)
+
+    def get_many(self, keys: list[str]) -> list[bytes | None]:
+        return self.client.mget(keys)  # type: ignore[no-any-return]
+
+    def set_many(self, values: dict[str, bytes], ttl: float | None = None) -> None:
+        with self.client.pipeline(transaction=False) as pipeline:
+            for key, value in values.items():
+                pipeline.set(key, value, px=int(ttl * 1000) if ttl else None)
+            pipeline.execute()
+
+
+def get_backend() -> CacheBackend | None:
+    if settings.RESPONSE_CACHE == "memory":
+        return MemoryBackend(settings.RESPONSE_CACHE_MEMORY_BYTES)
+    if settings.RESPONSE_CACHE == "redis":
+        assert settings.RESPONSE_CACHE_REDIS_URL, "RESPONSE_CACHE_REDIS_URL"
+        return RedisBackend(settings.RESPONSE_CACHE_REDIS_URL)
+    return None
+
+
+backend = get_backend()
+
+
+def version_key(document: uuid.UUID) -> str:
+    return f"version:{document}"
+
+
+def document_version(document: uuid.UUID) -> str:
+    """
+    The version of a document, set to a new one if the cache has none, e.g.
+    evicted, so that the entries stored with the old one aren't used.
+    """
+    assert backend is not None
+    [version] = backend.get_many([version_key(document)])
+    if version is not None:
+        return version.decode()
+    return bump([document])[document]
+
+
+def bump(documents: Iterable[uuid.UUID]) -> dict[uuid.UUID, str]:
+    assert backend is not None
+    versions = {document: uuid.uuid4().hex for document in documents}
+    if versions:
+        backend.set_many(
+            {version_key(document): v.encode() for document, v in versions.items()}
+        )
+    return versions
+
+
+def documents_of(
+    session: Session,
+    *,
+    cvs: Iterable[Any] = (),
+    jobs: Iterable[Any] = (),
+    tasks: Iterable[Any] = (),
+    skills: Iterable[Any] = (),
+) -> set[uuid.UUID]:
+    """
+    The ids of the CVs of the jobs, tasks and skills with these ids.
+    """
+    documents = {cv for cv in cvs if cv is not None}
+    job_ids = {job for job in jobs if job is not None}
+    task_ids = {task for task in tasks if task is not None}
+    skill_ids = {skill for skill in skills if skill is not None}
+    with session.no_autoflush:
+        if skill_ids:
+            statement = select(Skill.task_id).where(col(Skill.id).in_(skill_ids))
+            task_ids.update(session.exec(statement))
+        if task_ids:
+            statement = select(Task.job_id).where(col(Task.id).in_(task_ids))
+            job_ids.update(session.exec(statement))
+        if job_ids:
+            statement = select(Job.cv_id).where(col(Job.id).in_(job_ids))
+            documents.update(session.exec(statement))
+    return documents
+
+
+def values(obj: Any, name: str) -> list[Any]:
+    """
+    The value of an attribute, and the one it had before if it changed.
+    """
+    history = inspect(obj).attrs[name].history
+    return [getattr(obj, name), *history.deleted]
+
+
+def written_documents(session: Session) -> set[uuid.UUID]:
+    cvs: list[Any] = []
+    jobs: list[Any] = []
+    tasks: list[Any] = []
+    skills: list[Any] = []
+    for obj in [*session.new, *session.dirty, *session.deleted]:
+        if isinstance(obj, CV):
+            cvs.append(obj.id)
+        elif isinstance(obj, Job | School | Contact):
+            cvs.extend(values(obj, "cv_id"))
+        elif isinstance(obj, Task):
+            jobs.extend(values(obj, "job_id"))
+        elif isinstance(obj, Skill):
+            tasks.extend(values(obj, "task_id"))
+    # New rows may not be in the database yet, their parents are looked up
+    return documents_of(session, cvs=cvs, jobs=jobs, tasks=tasks, skills=skills)
+
+
+def invalidate_on_commit() -> None:
+    """
+    Give the documents written by a session new versions when it commits.
+    """
+
+    @event.listens_for(Session, "before_flush")
+    def before_flush(session: Session, *_args: Any) -> None:
+        if backend is not None:
+            written = session.info.setdefault("cache_documents", set())
+            written.update(written_documents(session))
+
+    @event.listens_for(Session, "after_commit")
+    def after_commit(session: Session) -> None:
+        written = session.info.pop("cache_documents", None)
+        if written:
+            bump(written)
+
+    @event.listens_for(Session, "after_soft_rollback")
+    def after_soft_rollback(session: Session, previous_transaction: Any) -> None:
+        # Not a SAVEPOINT, the rows written were rolled back
+        if previous_transaction.parent is None:
+            session.info.pop("cache_documents", None)
@@ -0,0 +1,151 @@
+import gzip
+from collections.abc import Callable, Mapping
+from typing import Any
+
+import brotli  # type: ignore[import-untyped]
+import zstandard
+from anyio import to_thread
+from starlette.datastructures import Headers, MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+Compressor = Callable[[bytes, int], bytes]
+
+
+def _gzip(body: bytes, level: int) -> bytes:
+    # mtime=0 keeps the output deterministic for the same body
+    return gzip.compress(body, compresslevel=level, mtime=0)
+
+
+def _brotli(body: bytes, level: int) -> bytes:
+    return brotli.compress(body, quality=level, mode=brotli.MODE_TEXT)  # type: ignore[no-any-return]
+
+
+def _zstd(body: bytes, level: int) -> bytes:
+    return zstandard.ZstdCompressor(level=level).compress(body)
+
+
+# In order of preference when the client accepts several with the same q
+compressors: dict[str, Compressor] = {"zstd": _zstd, "br": _brotli, "gzip": _gzip}
+
+# Tuned for dynamic responses, where compression runs on every request
+default_levels = {"zstd": 3, "br": 4, "gzip": 6}
+
+# Already compressed formats or responses that must be flushed as they are
+# produced
+skipped_content_types = (
+    "image/",
+    "video/",
+    "audio/",
+    "font/woff",
+    "application/zip",
+    "application/gzip",
+    "application/zstd",
+    "application/octet-stream",
+    "text/event-stream",
+)
+
+
+def negotiate_encoding(accept_encoding: str) -> str | None:
+    """
+    Pick the encoding to use from an Accept-Encoding header, or None for
+    identity.
+    """
+    qualities: dict[str, float] = {}
+    for part in accept_encoding.split(","):
+        coding, _, params = part.strip().partition(";")
+        coding = coding.strip().lower()
+        if not coding:
+            continue
+        quality = 1.0
+        name, _, value = params.strip().partition("=")
+        if name.strip() == "q":
+            try:
+                quality = float(value)
+            except ValueError:
+                quality = 0.0
+        qualities[coding] = quality
+    wildcard = qualities.get("*", 0.0)
+    best, best_quality = None, 0.0
+    for coding in compressors:
+        quality = qualities.get(coding, wildcard)
+        if quality > best_quality:
+            best, best_quality = coding, quality
+    return best
+
+
+class CompressionMiddleware:
+    """
+    Compress responses with zstd, brotli or gzip, following Accept-Encoding.
+
+    Only responses sent in a single body message of at least minimum_size
+    bytes are compressed, streaming responses pass through as they are.
+    Bodies of at least offload_size bytes are compressed in a worker thread
+    so they don't block the event loop.
+
+    Routes can change the levels with the compression_levels dependency in
+    app.api.deps, which stores them in request.state.
+    """
+
+    def __init__(
+        self,
+        app: ASGIApp,
+        *,
+        minimum_size: int = 1000,
+        offload_size: int = 64 * 1024,
+        levels: Mapping[str, int] | None = None,
+    ) -> None:
+        self.app = app
+        self.minimum_size = minimum_size
+        self.offload_size = offload_size
+        self.levels = {**default_levels, **(levels or {})}
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        encoding = negotiate_encoding(Headers(scope=scope).get("accept-encoding", ""))
+        start_message: Message | None = None
+        passthrough = False
+
+        async def send_compressed(message: Message) -> None:
+            nonlocal start_message, passthrough
+            if passthrough:
+                await send(message)
+                return
+            if message["type"] == "http.response.start":
+                start_message = message
+                headers = Headers(raw=message["headers"])
+                content_type = headers.get("content-type", "")
+                if "content-encoding" in headers or content_type.startswith(
+                    skipped_content_types
+                ):
+                    passthrough = True
+                    await send(message)
+                return
+            assert start_message is not None
+            passthrough = True
+            body: bytes = message.get("body", b"")
+            if message.get("more_body", False) or len(body) < self.minimum_size:
+                await send(start_message)
+                await send(message)
+                return
+            headers = MutableHeaders(raw=start_message["headers"])
+            headers.add_vary_header("Accept-Encoding")
+            if encoding is not None:
+                body = await self.compress(scope, encoding, body)
+                headers["Content-Encoding"] = encoding
+                headers["Content-Length"] = str(len(body))
+            await send(start_message)
+            await send({"type": "http.response.body", "body": body})
+
+        await self.app(scope, receive, send_compressed)
+
+    async def compress(self, scope: Scope, encoding: str, body: bytes) -> bytes:
+        route_levels: dict[str, Any] = scope.get("state", {}).get(
+            "compression_levels", {}
+        )
+        level = route_levels.get(encoding, self.levels[encoding])
+        compressor = compressors[encoding]
+        if len(body) >= self.offload_size:
+            return await to_thread.run_sync(compressor, body, level)
+        return compressor(body, level)
@@ -68,6 +68,36 @@ class Settings(BaseSettings):
             path=self.POSTGRES_DB,
         )
 
+    DB_POOL_SIZE: int = 5
+    DB_MAX_OVERFLOW: int = 10
+    # Threads that sync routes and dependencies run in, by default as many as
+    # the pool has connections, so that threads don't wait for one
+    THREAD_POOL_SIZE: int | None = None
+
+    @computed_field  # type: ignore[prop-decorator]
+    @property
+    def thread_pool_size(self) -> int:
+        return self.THREAD_POOL_SIZE or self.DB_POOL_SIZE + self.DB_MAX_OVERFLOW
+
+    # Requests handled at once per route class, read, write or auth, the
+    # others wait up to ADMISSION_QUEUE_SECONDS and are then answered 503. A
+    # class missing here isn't limited
+    ADMISSION_LIMITS: dict[str, int] = {"read": 8, "write": 4, "auth": 3}
+    ADMISSION_QUEUE_SECONDS: float = 1
+    ADMISSION_RETRY_AFTER_SECONDS: float = 1
+
+    # Cache of the GET by id responses of the CV routes, in the process, only
+    # for a single worker, or in Redis, which needs the redis extra
+    RESPONSE_CACHE: Literal["off", "memory", "redis"] = "off"
+    RESPONSE_CACHE_MEMORY_BYTES: int = 64 * 1024 * 1024
+    RESPONSE_CACHE_REDIS_URL: str | None = None
+    # Cached responses are fresh for TTL seconds, then served for STALE more
+    # seconds while refreshed in the background. They are used for up to
+    # STALE_IF_ERROR seconds, even if outdated, when the database fails
+    RESPONSE_CACHE_TTL_SECONDS: float = 60
+    RESPONSE_CACHE_STALE_SECONDS: float = 300
+    RESPONSE_CACHE_STALE_IF_ERROR_SECONDS: float = 24 * 60 * 60
+
     SMTP_TLS: bool = True
     SMTP_SSL: bool = False
     SMTP_PORT: int = 587
@@ -77,6 +107,8 @@ class Settings(BaseSettings):
     # TODO: update type to EmailStr when sqlmodel supports it
     EMAILS_FROM_EMAIL: str | None = None
     EMAILS_FROM_NAME: str | None = None
+    # Pooled SMTP connections idle for longer are reopened before the next send
+    SMTP_MAX_IDLE_SECONDS: int = 60
 
     @model_validator(mode="after")
     def _set_default_emails_from(self) -> Self:
@@ -86,6 +118,52 @@ class Settings(BaseSettings):
 
     EMAIL_RESET_TOKEN_EXPIRE_HOURS: int = 48
 
+    EMAIL_OUTBOX_BATCH_SIZE: int = 50
+    EMAIL_OUTBOX_POLL_SECONDS: float = 5
+    EMAIL_OUTBOX_MAX_ATTEMPTS: int = 5
+    # Delay before the first retry, doubled on every following attempt
+    EMAIL_OUTBOX_RETRY_SECONDS: int = 30
+    # How long a claimed batch is left to its worker before others retry it,
+    # longer than sending a batch takes
+    EMAIL_OUTBOX_LEASE_SECONDS: int = 300
+    # Emails queued for one recipient within an hour beyond this are throttled
+    EMAILS_PER_RECIPIENT_PER_HOUR: int = 5
+
+    # Server-Timing header on every response, otherwise only for superusers
+    SERVER_TIMING: bool = False
+
+    # Bearer token Prometheus has to send to scrape /metrics, open if unset
+    METRICS_TOKEN: str | None = None
+    # Port of the email worker's own /metrics, disabled if unset
+    EMAIL_WORKER_METRICS_PORT: int | None = None
+
+    # Statements slower than this are logged with their plan, disabled if unset
+    SLOW_QUERY_SECONDS: float | None = None
+    # Each slow statement, by fingerprint, is logged at most once per interval
+    SLOW_QUERY_LOG_INTERVAL_SECONDS: float = 300
+
+    # OTLP/HTTP endpoint to export traces to, e.g.
+    # http://collector:4318/v1/traces, tracing is off if unset
+    OTLP_TRACES_ENDPOINT: str | None = None
+    TRACING_SAMPLING: Literal["head", "tail"] = "head"
+    TRACING_SAMPLE_RATIO: float = 0.01
+    # Ratios by path prefix, the longest matching one is used, e.g.
+    # {"/api/v1/login": 1}
+    TRACING_SAMPLE_RATIOS: dict[str, float] = {}
+    # With tail sampling, failed and slower traces are always exported
+    TRACING_TAIL_LATENCY_SECONDS: float = 1
+
+    # Superusers can profile requests with ?__profile=1, not in production
+    # unless allowed here
+    PROFILING_IN_PRODUCTION: bool = False
+    PROFILING_MAX_PER_MINUTE: int = 10
+    PROFILING_MAX_SECONDS: float = 30
+
+    # Responses smaller than this are sent uncompressed
+    COMPRESSION_MINIMUM_SIZE: int = 1000
+    # Responses at least this big are compressed in a worker thread
+    COMPRESSION_OFFLOAD_SIZE: int = 64 * 1024
+
     @computed_field  # type: ignore[prop-decorator]
     @property
     def emails_enabled(self) -> bool:
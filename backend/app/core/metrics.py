@@ -0,0 +1,193 @@
+"""
+Prometheus metrics for the API and the email worker.
+
+With several worker processes (fastapi run --workers 4), set
+PROMETHEUS_MULTIPROC_DIR to a directory shared by the workers and emptied
+before they start, so that /metrics adds up the values of all of them.
+"""
+
+import os
+import time
+from collections.abc import Callable
+from typing import Any
+
+from fastapi.routing import APIRoute
+from prometheus_client import (
+    CollectorRegistry,
+    Counter,
+    Gauge,
+    Histogram,
+    multiprocess,
+)
+from prometheus_client.registry import REGISTRY
+from sqlalchemy import Engine, event
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from app.core.timing import RequestStats, request_stats
+
+multiprocess_dir = os.environ.get("PROMETHEUS_MULTIPROC_DIR")
+if multiprocess_dir:
+    os.makedirs(multiprocess_dir, exist_ok=True)
+
+request_duration = Histogram(
+    "http_request_duration_seconds",
+    "Time to respond to a request, by route id",
+    ["route", "method", "status"],
+)
+requests_in_progress = Gauge(
+    "http_requests_in_progress",
+    "Requests being handled",
+    multiprocess_mode="livesum",
+)
+admission_queue_depth = Gauge(
+    "http_admission_queue_depth",
+    "Requests waiting to be admitted, by route class",
+    ["route_class"],
+    multiprocess_mode="livesum",
+)
+requests_shed = Counter(
+    "http_requests_shed_total",
+    "Requests answered 503 after waiting too long to be admitted, by route class",
+    ["route_class"],
+)
+coalesced_requests = Counter(
+    "http_coalesced_requests_total",
+    "Requests that could share the response of an identical one running, by"
+    " route id and whether they did",
+    ["route", "shared"],
+)
+request_db_queries = Histogram(
+    "http_request_db_queries",
+    "SQL statements executed per request, by route id",
+    ["route"],
+    buckets=(0, 1, 2, 3, 5, 8, 13, 21, 34, 55, 100),
+)
+request_db_duration = Histogram(
+    "http_request_db_duration_seconds",
+    "Time spent executing SQL statements per request, by route id",
+    ["route"],
+)
+db_pool_connections = Gauge(
+    "db_pool_connections",
+    "Database connections by state: checked_out, idle or overflow",
+    ["state"],
+    multiprocess_mode="livesum",
+)
+password_hash_duration = Histogram(
+    "password_hash_duration_seconds",
+    "Time to hash or verify a password with bcrypt",
+    ["operation"],
+    buckets=(0.05, 0.1, 0.2, 0.3, 0.5, 0.75, 1, 2),
+)
+email_send_duration = Histogram(
+    "email_send_duration_seconds",
+    "Time to send an email through SMTP, by result",
+    ["result"],
+)
+
+
+def metrics_registry() -> CollectorRegistry:
+    """
+    The registry to expose, which collects all processes in multiprocess mode.
+    """
+    if not multiprocess_dir:
+        return REGISTRY
+    registry = CollectorRegistry()
+    multiprocess.MultiProcessCollector(registry)  # type: ignore[no-untyped-call]
+    return registry
+
+
+# Transaction control rather than queries, and only run by the sessions of the
+# tests, which are in a SAVEPOINT each
+savepoint_statements = ("SAVEPOINT", "RELEASE SAVEPOINT", "ROLLBACK TO SAVEPOINT")
+
+
+def instrument_engine(engine: Engine) -> None:
+    """
+    Count the statements and time spent in the database for each request,
+    and track the connection pool.
+    """
+
+    # The start is kept on the execution context, which is dropped with the
+    # statement if it fails and after_cursor_execute isn't called
+    @event.listens_for(engine, "before_cursor_execute")
+    def before_cursor_execute(
+        _conn: Any,
+        _cursor: Any,
+        _statement: str,
+        _parameters: Any,
+        context: Any,
+        _executemany: bool,
+    ) -> None:
+        context._query_start = time.perf_counter()
+
+    @event.listens_for(engine, "after_cursor_execute")
+    def after_cursor_execute(
+        _conn: Any,
+        _cursor: Any,
+        statement: str,
+        _parameters: Any,
+        context: Any,
+        _executemany: bool,
+    ) -> None:
+        elapsed = time.perf_counter() - context._query_start
+        stats = request_stats.get()
+        if stats is not None and not statement.startswith(savepoint_statements):
+            stats.db_queries += 1
+            stats.db_seconds += elapsed
+
+    @event.listens_for(engine, "checkout")
+    @event.listens_for(engine, "checkin")
+    def update_pool(*_args: Any) -> None:
+        pool: Any = engine.pool
+        db_pool_connections.labels("checked_out").set(pool.checkedout())
+        db_pool_connections.labels("idle").set(pool.checkedin())
+        db_pool_connections.labels("overflow").set(max(pool.overflow(), 0))
+
+
+class MetricsMiddleware:
+    """
+    Record latency, status and database use of each request, labelled with
+    route_id of the matched route, the same id used for the OpenAPI
+    operations. Requests that don't match a route are labelled "unmatched",
+    to keep the number of series bounded.
+    """
+
+    def __init__(self, app: ASGIApp, *, route_id: Callable[[APIRoute], str]) -> None:
+        self.app = app
+        self.route_id = route_id
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        status = 500
+        stats = RequestStats(scope=scope)
+        token = request_stats.set(stats)
+
+        async def send_with_status(message: Message) -> None:
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            await send(message)
+
+        requests_in_progress.inc()
+        start = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_with_status)
+        finally:
+            elapsed = time.perf_counter() - start
+            requests_in_progress.dec()
+            request_stats.reset(token)
+            route = self.route_label(scope.get("route"))
+            request_duration.labels(route, scope["method"], str(status)).observe(
+                elapsed
+            )
+            request_db_queries.labels(route).observe(stats.db_queries)
+            request_db_duration.labels(route).observe(stats.db_seconds)
+
+    def route_label(self, route: Any) -> str:
+        # Only API routes are set in the scope, the docs are "unmatched" too
+        if isinstance(route, APIRoute):
+            return self.route_id(route)
+        return "unmatched"
@@ -0,0 +1,125 @@
+"""
+A sampling profiler for single requests.
+
+Sync routes and dependencies run in the thread pool, so instead of tracing
+the current thread it samples the stacks of all threads. Threads that are
+waiting for work, like idle workers or the event loop in select(), are
+left out, but other requests handled at the same time are included.
+"""
+
+import os
+import sys
+import threading
+import time
+from dataclasses import dataclass, field
+from types import FrameType
+from typing import Any
+
+# Innermost frames in these files mean the thread is waiting for work
+idle_files = {
+    os.path.join(os.path.dirname(threading.__file__), name)
+    for name in ("threading.py", "queue.py", "selectors.py")
+}
+
+Frame = tuple[str, str, int]
+
+
+@dataclass
+class Samples:
+    # Stacks from the outermost frame, and the seconds since the previous sample
+    stacks: list[tuple[Frame, ...]] = field(default_factory=list)
+    weights: list[float] = field(default_factory=list)
+
+
+def stack_of(frame: FrameType | None) -> tuple[Frame, ...]:
+    stack = []
+    while frame is not None:
+        code = frame.f_code
+        # co_qualname is new in Python 3.11
+        name = getattr(code, "co_qualname", code.co_name)
+        stack.append((name, code.co_filename, code.co_firstlineno))
+        frame = frame.f_back
+    stack.reverse()
+    return tuple(stack)
+
+
+class Sampler:
+    """
+    Sample the stacks of all threads every interval seconds, in a thread,
+    for at most max_seconds.
+    """
+
+    def __init__(self, *, interval: float = 0.001, max_seconds: float = 30) -> None:
+        self.interval = interval
+        self.max_seconds = max_seconds
+        self.samples: dict[str, Samples] = {}
+        self.stopped = threading.Event()
+        self.thread = threading.Thread(target=self.run, name="sampler", daemon=True)
+        self.start = self.end = 0.0
+
+    def __enter__(self) -> "Sampler":
+        self.start = time.perf_counter()
+        self.thread.start()
+        return self
+
+    def __exit__(self, *_args: Any) -> None:
+        self.stopped.set()
+        self.thread.join()
+
+    def run(self) -> None:
+        own = threading.get_ident()
+        names = {thread.ident: thread.name for thread in threading.enumerate()}
+        last = self.start
+        deadline = self.start + self.max_seconds
+        while not self.stopped.wait(self.interval):
+            now = time.perf_counter()
+            for ident, frame in sys._current_frames().items():
+                if ident == own or frame.f_code.co_filename in idle_files:
+                    continue
+                if ident not in names:
+                    names = {t.ident: t.name for t in threading.enumerate()}
+                samples = self.samples.setdefault(
+                    names.get(ident, str(ident)), Samples()
+                )
+                samples.stacks.append(stack_of(frame))
+                samples.weights.append(now - last)
+            last = now
+            if now >= deadline:
+                break
+        self.end = last
+
+    def speedscope(self, name: str) -> dict[str, Any]:
+        """
+        The samples in the speedscope format, one profile per thread, to
+        open in https://www.speedscope.app.
+        """
+        frames: dict[Frame, int] = {}
+        profiles = []
+        for thread, samples in self.samples.items():
+            indexes = [
+                [frames.setdefault(frame, len(frames)) for frame in stack]
+                for stack in samples.stacks
+            ]
+            profiles.append(
+                {
+                    "type": "sampled",
+                    "name": thread,
+                    "unit": "seconds",
+                    "startValue": 0,
+                    "endValue": self.end - self.start,
+                    "samples": indexes,
+                    "weights": samples.weights,
+                }
+            )
+        return {
+            "$schema": "https://www.speedscope.app/file-format-schema.json",
+            "name": name,
+            "exporter": "app.core.profiling",
+            "shared": {
+                "frames": [
+                    {"name": function, "file": file, "line": line}
+                    for function, file, line in frames
+                ]
+            },
+            "profiles": profiles,
+        }
@@ -5,6 +5,8 @@ import jwt
 from passlib.context import CryptContext
 
 from app.core.config import settings
+from app.core.metrics import password_hash_duration
+from app.core.tracing import child_span
 
 pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
 
@@ -20,8 +22,16 @@ def create_access_token(subject: str | Any, expires_delta: timedelta) -> str:
 
 
 def verify_password(plain_password: str, hashed_password: str) -> bool:
-    return pwd_context.verify(plain_password, hashed_password)
+    with (
+        password_hash_duration.labels("verify").time(),
+        child_span("bcrypt.verify"),
+    ):
+        return pwd_context.verify(plain_password, hashed_password)
 
 
 def get_password_hash(password: str) -> str:
-    return pwd_context.hash(password)
+    with (
+        password_hash_duration.labels("hash").time(),
+        child_span("bcrypt.hash"),
+    ):
+        return pwd_context.hash(password)
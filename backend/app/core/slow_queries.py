@@ -0,0 +1,178 @@
+"""
+Log the SQL statements slower than SLOW_QUERY_SECONDS, with their plan.
+
+Each slow statement is logged once per SLOW_QUERY_LOG_INTERVAL_SECONDS by
+fingerprint (the statement with its values replaced by ?), with the route
+that ran it and the type of each parameter, not their values. The plan,
+EXPLAIN (ANALYZE off, FORMAT JSON) of the same statement, is captured in a
+background thread on another connection and logged after it.
+"""
+
+import json
+import logging
+import re
+import threading
+import time
+from collections.abc import Callable
+from concurrent.futures import ThreadPoolExecutor
+from hashlib import sha1
+from typing import Any
+
+from fastapi.routing import APIRoute
+from sqlalchemy import Engine, event
+
+from app.core.timing import request_stats
+
+logger = logging.getLogger(__name__)
+
+# Execution option of the EXPLAIN connection, so it isn't logged itself
+SKIP_OPTION = "skip_slow_query_log"
+
+# Only one plan is captured at a time, the others wait
+explain_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="explain")
+
+normalize_patterns = [
+    # Bind parameters, %(name)s and %s
+    (re.compile(r"%\(\w+\)s|%s"), "?"),
+    (re.compile(r"'(?:[^']|'')*'"), "?"),
+    (re.compile(r"\b\d+(?:\.\d+)?\b"), "?"),
+    # Lists of values, e.g. IN (?, ?, ?), whatever their length
+    (re.compile(r"\(\s*\?(?:\s*,\s*\?)*\s*\)"), "(...)"),
+    (re.compile(r"\s+"), " "),
+]
+
+
+def normalize(statement: str) -> str:
+    for pattern, replacement in normalize_patterns:
+        statement = pattern.sub(replacement, statement)
+    return statement.strip()
+
+
+def fingerprint(normalized: str) -> str:
+    return sha1(normalized.encode()).hexdigest()[:16]
+
+
+def redact(parameters: Any) -> Any:
+    """
+    Replace the parameter values with their type, they can be emails,
+    password hashes or tokens.
+    """
+    if isinstance(parameters, dict):
+        return {name: type(value).__name__ for name, value in parameters.items()}
+    if isinstance(parameters, list | tuple):
+        return [redact(value) for value in parameters]
+    return type(parameters).__name__
+
+
+class SlowQueryLog:
+    def __init__(
+        self,
+        engine: Engine,
+        *,
+        threshold: float,
+        interval: float,
+        route_id: Callable[[APIRoute], str],
+    ) -> None:
+        self.engine = engine
+        self.threshold = threshold
+        self.interval = interval
+        self.route_id = route_id
+        # Fingerprint to the time it was last logged
+        self.logged: dict[str, float] = {}
+        self.lock = threading.Lock()
+
+    def should_log(self, key: str) -> bool:
+        now = time.monotonic()
+        with self.lock:
+            last = self.logged.get(key)
+            if last is not None and now - last < self.interval:
+                return False
+            self.logged[key] = now
+            return True
+
+    def route(self) -> str | None:
+        stats = request_stats.get()
+        if stats is None or stats.scope is None:
+            # Not run for a request, e.g. by the email worker
+            return None
+        route = stats.scope.get("route")
+        if isinstance(route, APIRoute):
+            return self.route_id(route)
+        return "unmatched"
+
+    def log(
+        self, statement: str, parameters: Any, elapsed: float, executemany: bool
+    ) -> None:
+        normalized = normalize(statement)
+        key = fingerprint(normalized)
+        if not self.should_log(key):
+            return
+        logger.warning(
+            "Slow query %s took %.1f ms in %s: %s, parameters: %s",
+            key,
+            elapsed * 1000,
+            self.route(),
+            normalized,
+            redact(parameters),
+        )
+        # The plan of one statement stands for all of an executemany
+        if executemany:
+            parameters = parameters[0]
+        explain_executor.submit(self.explain, key, statement, parameters)
+
+    def explain(self, key: str, statement: str, parameters: Any) -> None:
+        try:
+            with self.engine.connect() as conn:
+                conn = conn.execution_options(**{SKIP_OPTION: True})
+                plan = conn.exec_driver_sql(
+                    f"EXPLAIN (ANALYZE off, FORMAT JSON) {statement}", parameters
+                ).scalar_one()
+        except Exception:
+            logger.exception("Failed to explain slow query %s", key)
+            return
+        logger.warning("Plan of slow query %s: %s", key, json.dumps(plan))
+
+
+def instrument_slow_queries(
+    engine: Engine,
+    *,
+    threshold: float,
+    interval: float,
+    route_id: Callable[[APIRoute], str],
+) -> SlowQueryLog:
+    """
+    Log the statements run through engine that take longer than threshold
+    seconds, at most once every interval seconds for each fingerprint.
+    """
+    slow_query_log = SlowQueryLog(
+        engine, threshold=threshold, interval=interval, route_id=route_id
+    )
+
+    # On the execution context rather than the connection, so that nothing is
+    # left behind by a statement that fails before after_cursor_execute
+    @event.listens_for(engine, "before_cursor_execute")
+    def before_cursor_execute(
+        _conn: Any,
+        _cursor: Any,
+        _statement: str,
+        _parameters: Any,
+        context: Any,
+        _executemany: bool,
+    ) -> None:
+        context._slow_query_start = time.perf_counter()
+
+    @event.listens_for(engine, "after_cursor_execute")
+    def after_cursor_execute(
+        conn: Any,
+        _cursor: Any,
+        statement: str,
+        parameters: Any,
+        context: Any,
+        executemany: bool,
+    ) -> None:
+        elapsed = time.perf_counter() - context._slow_query_start
+        if elapsed < threshold or conn.get_execution_options().get(SKIP_OPTION):
+            return
+        slow_query_log.log(statement, parameters, elapsed, executemany)
+
+    return slow_query_log
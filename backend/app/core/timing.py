@@ -0,0 +1,100 @@
+import time
+from collections.abc import Iterator
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+
+from starlette.datastructures import MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+
+@dataclass
+class RequestStats:
+    db_queries: int = 0
+    db_seconds: float = 0
+    # Seconds spent in each phase timed with timed()
+    phases: dict[str, float] = field(default_factory=dict)
+    superuser: bool = False
+    # The ASGI scope, with the matched route once routed
+    scope: Scope | None = None
+
+
+# Stats of the request being handled. Sync routes run in a thread pool with a
+# copy of the context, which still points to the same RequestStats
+request_stats: ContextVar[RequestStats | None] = ContextVar(
+    "request_stats", default=None
+)
+
+
+@contextmanager
+def timed(phase: str) -> Iterator[None]:
+    """
+    Add the time spent in the block to phase of the current request.
+    """
+    stats = request_stats.get()
+    if stats is None:
+        yield
+        return
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        elapsed = time.perf_counter() - start
+        stats.phases[phase] = stats.phases.get(phase, 0) + elapsed
+
+
+def server_timing(stats: RequestStats, total: float) -> str:
+    auth = stats.phases.get("auth", 0)
+    serialize = stats.phases.get("serialize", 0)
+    # Dependencies and the route function, including their queries
+    handler = max(total - auth - serialize, 0)
+    return ", ".join(
+        [
+            f"auth;dur={auth * 1000:.1f}",
+            f"db;dur={stats.db_seconds * 1000:.1f};count={stats.db_queries}"
+            f';desc="{stats.db_queries} queries"',
+            f"handler;dur={handler * 1000:.1f}",
+            f"serialize;dur={serialize * 1000:.1f}",
+        ]
+    )
+
+
+class ServerTimingMiddleware:
+    """
+    Add a Server-Timing header with the time spent authenticating, in the
+    database, in the route and serializing the response, for browser
+    devtools.
+
+    Added for every response when enabled, otherwise only for superusers.
+    """
+
+    def __init__(self, app: ASGIApp, *, enabled: bool = False) -> None:
+        self.app = app
+        self.enabled = enabled
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        stats = request_stats.get()
+        token = None
+        if stats is None:
+            stats = RequestStats(scope=scope)
+            token = request_stats.set(stats)
+        start = time.perf_counter()
+
+        async def send_with_timing(message: Message) -> None:
+            assert stats is not None
+            if message["type"] == "http.response.start" and (
+                self.enabled or stats.superuser
+            ):
+                total = time.perf_counter() - start
+                headers = MutableHeaders(scope=message)
+                headers.append("Server-Timing", server_timing(stats, total))
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_timing)
+        finally:
+            if token is not None:
+                request_stats.reset(token)
@@ -0,0 +1,340 @@
+"""
+OpenTelemetry tracing of requests, authentication, bcrypt, SQL statements
+and emails.
+
+The spans are created with the OpenTelemetry API, which does nothing until
+setup_tracing() installs a tracer provider, so the instrumentation costs
+next to nothing when tracing is off.
+
+Sampling is either:
+
+* head: a share of the traces, decided when the request starts, by the
+  longest prefix of its path in ratios, or ratio.
+* tail: all traces are recorded, and they are exported when they failed or
+  were slower than latency, otherwise with the same ratios.
+"""
+
+import threading
+from collections import OrderedDict
+from collections.abc import Callable, Iterator, Mapping, Sequence
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Any
+
+from fastapi.routing import APIRoute
+from opentelemetry import context, propagate, trace
+from opentelemetry.exporter.otlp.proto.http.trace_exporter import OTLPSpanExporter
+from opentelemetry.sdk.resources import Resource
+from opentelemetry.sdk.trace import ReadableSpan, Span, SpanProcessor, TracerProvider
+from opentelemetry.sdk.trace.export import BatchSpanProcessor
+from opentelemetry.sdk.trace.id_generator import RandomIdGenerator
+from opentelemetry.sdk.trace.sampling import (
+    ALWAYS_ON,
+    Decision,
+    ParentBased,
+    Sampler,
+    SamplingResult,
+)
+from opentelemetry.trace import Link, SpanKind, StatusCode
+from opentelemetry.trace.span import TraceState
+from opentelemetry.util.types import Attributes
+from sqlalchemy import Engine, event
+from starlette.datastructures import Headers
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from app.core.config import settings
+from app.core.slow_queries import normalize
+
+tracer = trace.get_tracer("app")
+
+# Recent FastAPI versions trace requests themselves once a tracer provider is
+# set, in a trace of their own. Their tracing is turned off with these FastAPI()
+# options, so that TracingMiddleware makes the only server span
+try:
+    import fastapi.telemetry  # type: ignore[import-not-found, unused-ignore]  # noqa: F401
+
+    fastapi_telemetry_options: dict[str, Any] = {"telemetry": {"tracing": False}}
+except ImportError:
+    fastapi_telemetry_options = {}
+
+# Headers of the trace context and baggage propagators
+propagated = {b"traceparent", b"tracestate", b"baggage"}
+
+# Traces kept in memory by tail sampling, waiting for their root span
+MAX_PENDING_TRACES = 10_000
+
+# The trace id TracingMiddleware sampled a request with, while it starts its span
+sampled_trace_id: ContextVar[int | None] = ContextVar("sampled_trace_id", default=None)
+
+
+def ratio_for(path: str, ratio: float, ratios: Mapping[str, float]) -> float:
+    prefixes = [prefix for prefix in ratios if path.startswith(prefix)]
+    if not prefixes:
+        return ratio
+    return ratios[max(prefixes, key=len)]
+
+
+def sampled(trace_id: int, ratio: float) -> bool:
+    # The same decision as TraceIdRatioBased, from the random low 64 bits
+    return trace_id & 0xFFFFFFFFFFFFFFFF < round(ratio * 2**64)
+
+
+class PathRatioSampler(Sampler):
+    """
+    Sample root spans with the ratio of the longest prefix of their url.path
+    attribute in ratios, or ratio.
+    """
+
+    def __init__(self, ratio: float, ratios: Mapping[str, float]) -> None:
+        self.ratio = ratio
+        self.ratios = dict(ratios)
+
+    def should_sample(
+        self,
+        parent_context: context.Context | None,
+        trace_id: int,
+        name: str,
+        kind: SpanKind | None = None,
+        attributes: Attributes = None,
+        links: Sequence[Link] | None = None,
+        trace_state: TraceState | None = None,
+    ) -> SamplingResult:
+        path = str((attributes or {}).get("url.path", ""))
+        if sampled(trace_id, ratio_for(path, self.ratio, self.ratios)):
+            return SamplingResult(Decision.RECORD_AND_SAMPLE, attributes)
+        return SamplingResult(Decision.DROP)
+
+    def get_description(self) -> str:
+        return f"PathRatioSampler{{{self.ratio}, {self.ratios}}}"
+
+
+class SampledIdGenerator(RandomIdGenerator):
+    """
+    Random ids, except for the span of a request, that gets the trace id
+    TracingMiddleware sampled it with.
+    """
+
+    def generate_trace_id(self) -> int:
+        return sampled_trace_id.get() or super().generate_trace_id()
+
+
+class TailSamplingProcessor(SpanProcessor):
+    """
+    Hold the spans of each trace until its root span ends, then pass them to
+    processor if the trace failed, was slower than latency seconds, or is
+    sampled with the ratio of its path.
+    """
+
+    def __init__(
+        self,
+        processor: SpanProcessor,
+        *,
+        latency: float,
+        ratio: float,
+        ratios: Mapping[str, float],
+    ) -> None:
+        self.processor = processor
+        self.latency = latency
+        self.ratio = ratio
+        self.ratios = dict(ratios)
+        self.pending: OrderedDict[int, list[ReadableSpan]] = OrderedDict()
+        self.lock = threading.Lock()
+
+    def on_start(
+        self, span: Span, parent_context: context.Context | None = None
+    ) -> None:
+        self.processor.on_start(span, parent_context=parent_context)
+
+    def on_end(self, span: ReadableSpan) -> None:
+        assert span.context is not None
+        trace_id = span.context.trace_id
+        with self.lock:
+            spans = self.pending.setdefault(trace_id, [])
+            spans.append(span)
+            if span.parent is not None and not span.parent.is_remote:
+                # Drop the oldest traces whose root never ended
+                while len(self.pending) > MAX_PENDING_TRACES:
+                    self.pending.popitem(last=False)
+                return
+            del self.pending[trace_id]
+        if self.keep(span):
+            for ended in spans:
+                self.processor.on_end(ended)
+
+    def keep(self, root: ReadableSpan) -> bool:
+        assert root.context is not None
+        if root.status.status_code is StatusCode.ERROR:
+            return True
+        if root.end_time and root.start_time:
+            if (root.end_time - root.start_time) / 1e9 >= self.latency:
+                return True
+        path = str((root.attributes or {}).get("url.path", ""))
+        return sampled(root.context.trace_id, ratio_for(path, self.ratio, self.ratios))
+
+    def shutdown(self) -> None:
+        self.processor.shutdown()
+
+    def force_flush(self, timeout_millis: int = 30000) -> bool:
+        return self.processor.force_flush(timeout_millis)
+
+
+@contextmanager
+def child_span(name: str, **attributes: Any) -> Iterator[trace.Span]:
+    """
+    A span in the current trace, only if it's sampled, skipping the cost of
+    the spans that would be dropped anyway.
+    """
+    if not trace.get_current_span().is_recording():
+        yield trace.INVALID_SPAN
+        return
+    with tracer.start_as_current_span(name, attributes=attributes) as span:
+        yield span
+
+
+def setup_tracing(
+    processor: SpanProcessor,
+    *,
+    service_name: str,
+    sampling: str = "head",
+    ratio: float = 1.0,
+    ratios: Mapping[str, float] | None = None,
+    latency: float = 1.0,
+) -> TracerProvider:
+    """
+    Install the global tracer provider, exporting the sampled spans through
+    processor, e.g. a BatchSpanProcessor of an OTLPSpanExporter.
+    """
+    ratios = ratios or {}
+    resource = Resource.create({"service.name": service_name})
+    if sampling == "tail":
+        provider = TracerProvider(
+            sampler=ALWAYS_ON, resource=resource, id_generator=SampledIdGenerator()
+        )
+        provider.add_span_processor(
+            TailSamplingProcessor(
+                processor, latency=latency, ratio=ratio, ratios=ratios
+            )
+        )
+    else:
+        provider = TracerProvider(
+            sampler=ParentBased(PathRatioSampler(ratio, ratios)),
+            resource=resource,
+            id_generator=SampledIdGenerator(),
+        )
+        provider.add_span_processor(processor)
+    trace.set_tracer_provider(provider)
+    return provider
+
+
+def setup_otlp_tracing() -> None:
+    """
+    Export traces to OTLP_TRACES_ENDPOINT, sampled as configured in the
+    settings, if it's set.
+    """
+    if not settings.OTLP_TRACES_ENDPOINT:
+        return
+    setup_tracing(
+        BatchSpanProcessor(OTLPSpanExporter(endpoint=settings.OTLP_TRACES_ENDPOINT)),
+        service_name=settings.PROJECT_NAME,
+        sampling=settings.TRACING_SAMPLING,
+        ratio=settings.TRACING_SAMPLE_RATIO,
+        ratios=settings.TRACING_SAMPLE_RATIOS,
+        latency=settings.TRACING_TAIL_LATENCY_SECONDS,
+    )
+
+
+def instrument_engine_tracing(engine: Engine) -> None:
+    """
+    A span for each SQL statement run in a sampled trace, with the statement
+    without its values.
+    """
+
+    @event.listens_for(engine, "before_cursor_execute")
+    def before_cursor_execute(
+        conn: Any, _cursor: Any, statement: str, *_args: Any
+    ) -> None:
+        # Only in sampled traces, skipping the cost of a span that is dropped
+        span: trace.Span = trace.INVALID_SPAN
+        if trace.get_current_span().is_recording():
+            normalized = normalize(statement)
+            span = tracer.start_span(
+                normalized.split(" ", 1)[0],
+                kind=SpanKind.CLIENT,
+                attributes={
+                    "db.system.name": "postgresql",
+                    "db.query.text": normalized,
+                },
+            )
+        conn.info.setdefault("trace_spans", []).append(span)
+
+    @event.listens_for(engine, "after_cursor_execute")
+    def after_cursor_execute(conn: Any, *_args: Any) -> None:
+        conn.info["trace_spans"].pop().end()
+
+    @event.listens_for(engine, "handle_error")
+    def handle_error(exception_context: Any) -> None:
+        conn = exception_context.connection
+        if conn is None or not conn.info.get("trace_spans"):
+            return
+        span = conn.info["trace_spans"].pop()
+        span.record_exception(exception_context.original_exception)
+        span.set_status(StatusCode.ERROR)
+        span.end()
+
+
+class TracingMiddleware:
+    """
+    A server span for each request, continuing the trace of a traceparent
+    header, named after route_id of the matched route.
+
+    The sampler of the tracer provider is asked first, so that a request that
+    isn't sampled runs without any span, nor the work of its attributes.
+    """
+
+    def __init__(self, app: ASGIApp, *, route_id: Callable[[APIRoute], str]) -> None:
+        self.app = app
+        self.route_id = route_id
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        provider = trace.get_tracer_provider()
+        if scope["type"] != "http" or not isinstance(provider, TracerProvider):
+            await self.app(scope, receive, send)
+            return
+        parent = None
+        trace_id = 0
+        if any(name in propagated for name, _ in scope["headers"]):
+            parent = propagate.extract(Headers(scope=scope))
+            trace_id = trace.get_current_span(parent).get_span_context().trace_id
+        method = scope["method"]
+        attributes = {"http.request.method": method, "url.path": scope["path"]}
+        sampled_id = trace_id or provider.id_generator.generate_trace_id()
+        sampling = provider.sampler.should_sample(
+            parent, sampled_id, method, SpanKind.SERVER, attributes
+        )
+        if sampling.decision is Decision.DROP:
+            await self.app(scope, receive, send)
+            return
+        # The same trace id, for the same decision of the sampler
+        token = sampled_trace_id.set(None if trace_id else sampled_id)
+        try:
+            span = tracer.start_span(
+                method, context=parent, kind=SpanKind.SERVER, attributes=attributes
+            )
+        finally:
+            sampled_trace_id.reset(token)
+
+        async def send_with_status(message: Message) -> None:
+            if message["type"] == "http.response.start":
+                status = message["status"]
+                span.set_attribute("http.response.status_code", status)
+                if status >= 500:
+                    span.set_status(StatusCode.ERROR)
+            await send(message)
+
+        with trace.use_span(span, end_on_exit=True):
+            try:
+                await self.app(scope, receive, send_with_status)
+            finally:
+                route = scope.get("route")
+                if isinstance(route, APIRoute):
+                    span.update_name(f"{method} {self.route_id(route)}")
@@ -1,10 +1,13 @@
 import uuid
-from typing import Any
+from datetime import datetime, timedelta
+from typing import Any, TypeVar
 
-from sqlmodel import Session, select
+from sqlalchemy.dialects.postgresql import insert
+from sqlmodel import Session, SQLModel, col, func, select
 
+from app.core.config import settings
 from app.core.security import get_password_hash, verify_password
-from app.models import Item, ItemCreate, User, UserCreate, UserUpdate
+from app.models import EmailOutbox, Item, ItemCreate, User, UserCreate, UserUpdate
 from app.models import CV, Job, Task, Skill, School, Contact, Knowledge, Language, Certificate
 
 
@@ -18,6 +21,22 @@ def create_user(*, session: Session, user_create: UserCreate) -> User:
     return db_obj
 
 
+def try_create_user(*, session: Session, user_create: UserCreate) -> User | None:
+    # Single INSERT ... ON CONFLICT DO NOTHING: returns None when the email is
+    # already taken, without a separate lookup or a race between the two.
+    db_obj = User.model_validate(
+        user_create, update={"hashed_password": get_password_hash(user_create.password)}
+    )
+    statement = (
+        insert(User)
+        .values(**db_obj.model_dump())
+        .on_conflict_do_nothing(index_elements=[func.lower(col(User.email))])
+        .returning(User)
+    )
+    # Not committed, so callers can add related writes to the same transaction
+    return session.scalars(statement).one_or_none()
+
+
 def update_user(*, session: Session, db_user: User, user_in: UserUpdate) -> Any:
     user_data = user_in.model_dump(exclude_unset=True)
     extra_data = {}
@@ -33,7 +52,8 @@ def update_user(*, session: Session, db_user: User, user_in: UserUpdate) -> Any:
 
 
 def get_user_by_email(*, session: Session, email: str) -> User | None:
-    statement = select(User).where(User.email == email)
+    # Match the ix_user_email_lower expression so the lookup is an index scan
+    statement = select(User).where(func.lower(col(User.email)) == email.lower())
     session_user = session.exec(statement).first()
     return session_user
 
@@ -47,6 +67,35 @@ def authenticate(*, session: Session, email: str, password: str) -> User | None:
     return db_user
 
 
+def enqueue_email(
+    *, session: Session, email_to: str, subject: str, html_content: str
+) -> EmailOutbox:
+    # Added to the caller's transaction (not committed), the outbox worker
+    # delivers it once the triggering change is committed
+    assert settings.emails_enabled, "no provided configuration for email variables"
+    since = datetime.utcnow() - timedelta(hours=1)
+    count_statement = (
+        select(func.count())
+        .select_from(EmailOutbox)
+        .where(
+            EmailOutbox.email_to == email_to,
+            EmailOutbox.created_at >= since,
+            EmailOutbox.status != "throttled",
+        )
+    )
+    count = session.exec(count_statement).one()
+    throttled = count >= settings.EMAILS_PER_RECIPIENT_PER_HOUR
+    db_email = EmailOutbox(
+        email_to=email_to,
+        subject=subject,
+        # Never sent, and new account emails include the password
+        html_content="" if throttled else html_content,
+        status="throttled" if throttled else "pending",
+    )
+    session.add(db_email)
+    return db_email
+
+
 def create_item(*, session: Session, item_in: ItemCreate, owner_id: uuid.UUID) -> Item:
     db_item = Item.model_validate(item_in, update={"owner_id": owner_id})
     session.add(db_item)
@@ -55,6 +104,35 @@ def create_item(*, session: Session, item_in: ItemCreate, owner_id: uuid.UUID) -
     return db_item
 
 
+ModelType = TypeVar("ModelType", bound=SQLModel)
+
+
+def _upsert(
+    *,
+    session: Session,
+    model: type[ModelType],
+    data: dict[str, Any],
+    index_elements: list[str],
+) -> ModelType:
+    # INSERT ... ON CONFLICT (natural key) DO UPDATE, keeping the existing id
+    values = model(**data).model_dump()
+    statement = insert(model).values(**values)
+    upsert = statement.on_conflict_do_update(
+        index_elements=index_elements,
+        set_={
+            name: statement.excluded[name]
+            for name in values
+            if name != "id" and name not in index_elements
+        },
+    ).returning(model)
+    db_obj: ModelType = session.scalars(
+        upsert, execution_options={"populate_existing": True}
+    ).one()
+    session.commit()
+    session.refresh(db_obj)
+    return db_obj
+
+
 # CRUD operations for CV
 def create_cv(*, session: Session, cv_data: dict) -> CV:
     db_cv = CV(**cv_data)
@@ -244,6 +322,11 @@ def delete_knowledge(*, session: Session, knowledge_id: uuid.UUID) -> None:
         session.delete(db_knowledge)
         session.commit()
 
+def upsert_knowledge(*, session: Session, knowledge_data: dict[str, Any]) -> Knowledge:
+    return _upsert(
+        session=session, model=Knowledge, data=knowledge_data, index_elements=["name"]
+    )
+
 # CRUD operations for Language
 def create_language(*, session: Session, language_data: dict) -> Language:
     db_language = Language(**language_data)
@@ -271,6 +354,11 @@ def delete_language(*, session: Session, language_id: uuid.UUID) -> None:
         session.delete(db_language)
         session.commit()
 
+def upsert_language(*, session: Session, language_data: dict[str, Any]) -> Language:
+    return _upsert(
+        session=session, model=Language, data=language_data, index_elements=["language"]
+    )
+
 # CRUD operations for Certificate
 def create_certificate(*, session: Session, certificate_data: dict) -> Certificate:
     db_certificate = Certificate(**certificate_data)
@@ -297,3 +385,11 @@ def delete_certificate(*, session: Session, certificate_id: uuid.UUID) -> None:
     if db_certificate:
         session.delete(db_certificate)
         session.commit()
+
+def upsert_certificate(*, session: Session, certificate_data: dict[str, Any]) -> Certificate:
+    return _upsert(
+        session=session,
+        model=Certificate,
+        data=certificate_data,
+        index_elements=["name"],
+    )
@@ -0,0 +1,109 @@
+import logging
+import time
+from datetime import datetime, timedelta
+
+from prometheus_client import start_http_server
+from sqlmodel import Session, col, select
+
+from app.core.config import settings
+from app.core.db import engine
+from app.core.metrics import metrics_registry
+from app.core.tracing import instrument_engine_tracing, setup_otlp_tracing
+from app.models import EmailOutbox
+from app.utils import close_smtp_connections, get_smtp_pool_stats, send_email
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+
+def process_batch(session: Session) -> int:
+    """
+    Claim a batch of due emails from the outbox and try to deliver them.
+
+    The rows are locked with FOR UPDATE SKIP LOCKED only to claim them: they
+    are leased to this worker by moving their next attempt
+    EMAIL_OUTBOX_LEASE_SECONDS ahead, and the claim is committed before
+    sending. Each email is committed as soon as it's sent, so a worker that
+    dies only leaves the email it was sending to be retried once its lease
+    expires. Returns the number of emails claimed.
+
+    The content of an email is cleared once it's sent or has failed for
+    good, new account emails include the password.
+    """
+    now = datetime.utcnow()
+    statement = (
+        select(EmailOutbox)
+        .where(EmailOutbox.status == "pending", EmailOutbox.next_attempt_at <= now)
+        .order_by(col(EmailOutbox.next_attempt_at))
+        .limit(settings.EMAIL_OUTBOX_BATCH_SIZE)
+        .with_for_update(skip_locked=True)
+    )
+    emails = session.exec(statement).all()
+    for email in emails:
+        email.attempts += 1
+        email.next_attempt_at = now + timedelta(
+            seconds=settings.EMAIL_OUTBOX_LEASE_SECONDS
+        )
+        session.add(email)
+    session.commit()
+    for email in emails:
+        try:
+            send_email(
+                email_to=email.email_to,
+                subject=email.subject,
+                html_content=email.html_content,
+            )
+        except Exception as e:
+            logger.warning(f"Failed to send email {email.id}: {e}")
+            email.last_error = str(e)
+            if email.attempts >= settings.EMAIL_OUTBOX_MAX_ATTEMPTS:
+                email.status = "failed"
+                email.html_content = ""
+            else:
+                delay = settings.EMAIL_OUTBOX_RETRY_SECONDS * 2 ** (email.attempts - 1)
+                email.next_attempt_at = datetime.utcnow() + timedelta(seconds=delay)
+        else:
+            email.status = "sent"
+            email.sent_at = datetime.utcnow()
+            email.last_error = None
+            email.html_content = ""
+        session.add(email)
+        session.commit()
+    if emails:
+        for server, stats in get_smtp_pool_stats().items():
+            logger.info(
+                f"SMTP {server}: {stats.messages} sent, {stats.failures} failed, "
+                f"{stats.connections} connections, "
+                f"{stats.messages_per_second:.1f} messages/s"
+            )
+    return len(emails)
+
+
+def run() -> None:
+    while True:
+        try:
+            with Session(engine) as session:
+                claimed = process_batch(session)
+        except Exception as e:
+            logger.error(e)
+            claimed = 0
+        if claimed < settings.EMAIL_OUTBOX_BATCH_SIZE:
+            time.sleep(settings.EMAIL_OUTBOX_POLL_SECONDS)
+
+
+def main() -> None:
+    logger.info("Starting email outbox worker")
+    setup_otlp_tracing()
+    instrument_engine_tracing(engine)
+    if settings.EMAIL_WORKER_METRICS_PORT:
+        start_http_server(
+            settings.EMAIL_WORKER_METRICS_PORT, registry=metrics_registry()
+        )
+    try:
+        run()
+    finally:
+        close_smtp_connections()
+
+
+if __name__ == "__main__":
+    main()
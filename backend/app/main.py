@@ -1,10 +1,30 @@
+from collections.abc import AsyncIterator
+from contextlib import asynccontextmanager
+
 import sentry_sdk
 from fastapi import FastAPI
 from fastapi.routing import APIRoute
 from starlette.middleware.cors import CORSMiddleware
 
 from app.api.main import api_router
+from app.api.profiling import ProfilingMiddleware
+from app.api.responses import TimedORJSONResponse
+from app.api.routes import metrics
+from app.core.admission import AdmissionMiddleware, set_thread_pool_size
+from app.core.cache import invalidate_on_commit
+from app.core.compression import CompressionMiddleware
 from app.core.config import settings
+from app.core.db import engine
+from app.core.metrics import MetricsMiddleware, instrument_engine
+from app.core.slow_queries import instrument_slow_queries
+from app.core.timing import ServerTimingMiddleware
+from app.core.tracing import (
+    TracingMiddleware,
+    fastapi_telemetry_options,
+    instrument_engine_tracing,
+    setup_otlp_tracing,
+)
+from app.utils import load_email_templates
 
 
 def custom_generate_unique_id(route: APIRoute) -> str:
@@ -12,15 +32,71 @@ def custom_generate_unique_id(route: APIRoute) -> str:
 
 
 if settings.SENTRY_DSN and settings.ENVIRONMENT != "local":
-    sentry_sdk.init(dsn=str(settings.SENTRY_DSN), enable_tracing=True)
+    sentry_sdk.init(
+        dsn=str(settings.SENTRY_DSN), traces_sample_rate=settings.TRACING_SAMPLE_RATIO
+    )
+
+
+@asynccontextmanager
+async def lifespan(_app: FastAPI) -> AsyncIterator[None]:
+    load_email_templates()
+    set_thread_pool_size(settings.thread_pool_size)
+    yield
+
 
 app = FastAPI(
     title=settings.PROJECT_NAME,
     openapi_url=f"{settings.API_V1_STR}/openapi.json",
     generate_unique_id_function=custom_generate_unique_id,
+    default_response_class=TimedORJSONResponse,
+    lifespan=lifespan,
+    **fastapi_telemetry_options,
+)
+
+# Inside the compression, so that it doesn't count as handler time
+app.add_middleware(ServerTimingMiddleware, enabled=settings.SERVER_TIMING)
+app.add_middleware(
+    CompressionMiddleware,
+    minimum_size=settings.COMPRESSION_MINIMUM_SIZE,
+    offload_size=settings.COMPRESSION_OFFLOAD_SIZE,
 )
 
-# Set all CORS enabled origins
+if settings.ENVIRONMENT != "production" or settings.PROFILING_IN_PRODUCTION:
+    app.add_middleware(
+        ProfilingMiddleware,
+        max_per_minute=settings.PROFILING_MAX_PER_MINUTE,
+        max_seconds=settings.PROFILING_MAX_SECONDS,
+    )
+
+app.add_middleware(TracingMiddleware, route_id=custom_generate_unique_id)
+setup_otlp_tracing()
+instrument_engine_tracing(engine)
+
+# Inside the metrics, so that the time queued and the 503s are recorded
+app.add_middleware(
+    AdmissionMiddleware,
+    prefix=settings.API_V1_STR,
+    limits=settings.ADMISSION_LIMITS,
+    queue_seconds=settings.ADMISSION_QUEUE_SECONDS,
+    retry_after_seconds=settings.ADMISSION_RETRY_AFTER_SECONDS,
+    exempt=(f"{settings.API_V1_STR}/utils/health-check/",),
+)
+
+# Outside all but CORS, so that the latency includes the other middlewares
+app.add_middleware(MetricsMiddleware, route_id=custom_generate_unique_id)
+instrument_engine(engine)
+if settings.SLOW_QUERY_SECONDS is not None:
+    instrument_slow_queries(
+        engine,
+        threshold=settings.SLOW_QUERY_SECONDS,
+        interval=settings.SLOW_QUERY_LOG_INTERVAL_SECONDS,
+        route_id=custom_generate_unique_id,
+    )
+
+invalidate_on_commit()
+
+# Set all CORS enabled origins. Outermost, so that the responses of the other
+# middlewares, like the 503 of admission control, have the CORS headers too
 if settings.all_cors_origins:
     app.add_middleware(
         CORSMiddleware,
@@ -31,3 +107,4 @@ if settings.all_cors_origins:
     )
 
 app.include_router(api_router, prefix=settings.API_V1_STR)
+app.include_router(metrics.router)
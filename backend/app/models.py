@@ -1,13 +1,19 @@
 import uuid
 from datetime import datetime
+from typing import Annotated, Any, Literal
 
-from pydantic import EmailStr
+from pydantic import AfterValidator, EmailStr
+from sqlalchemy import Index, Text, text
 from sqlmodel import Field, Relationship, SQLModel
 
+# User emails are stored lower-cased, so that lookups can use the unique
+# index on lower(email) and differently cased duplicates are rejected
+NormalizedEmail = Annotated[EmailStr, AfterValidator(str.lower)]
+
 
 # Shared properties
 class UserBase(SQLModel):
-    email: EmailStr = Field(unique=True, index=True, max_length=255)
+    email: NormalizedEmail = Field(max_length=255)
     is_active: bool = True
     is_superuser: bool = False
     full_name: str | None = Field(default=None, max_length=255)
@@ -19,20 +25,20 @@ class UserCreate(UserBase):
 
 
 class UserRegister(SQLModel):
-    email: EmailStr = Field(max_length=255)
+    email: NormalizedEmail = Field(max_length=255)
     password: str = Field(min_length=8, max_length=40)
     full_name: str | None = Field(default=None, max_length=255)
 
 
 # Properties to receive via API on update, all are optional
 class UserUpdate(UserBase):
-    email: EmailStr | None = Field(default=None, max_length=255)  # type: ignore
+    email: NormalizedEmail | None = Field(default=None, max_length=255)  # type: ignore
     password: str | None = Field(default=None, min_length=8, max_length=40)
 
 
 class UserUpdateMe(SQLModel):
     full_name: str | None = Field(default=None, max_length=255)
-    email: EmailStr | None = Field(default=None, max_length=255)
+    email: NormalizedEmail | None = Field(default=None, max_length=255)
 
 
 class UpdatePassword(SQLModel):
@@ -42,6 +48,10 @@ class UpdatePassword(SQLModel):
 
 # Database model, database table inferred from class name
 class User(UserBase, table=True):
+    __table_args__ = (
+        Index("ix_user_email_lower", text("lower(email)"), unique=True),
+    )
+
     id: uuid.UUID = Field(default_factory=uuid.uuid4, primary_key=True)
     hashed_password: str
     items: list["Item"] = Relationship(back_populates="owner", cascade_delete=True)
@@ -78,7 +88,7 @@ class Item(ItemBase, table=True):
     id: uuid.UUID = Field(default_factory=uuid.uuid4, primary_key=True)
     title: str = Field(max_length=255)
     owner_id: uuid.UUID = Field(
-        foreign_key="user.id", nullable=False, ondelete="CASCADE"
+        foreign_key="user.id", nullable=False, ondelete="CASCADE", index=True
     )
     owner: User | None = Relationship(back_populates="items")
 
@@ -115,6 +125,27 @@ class NewPassword(SQLModel):
     new_password: str = Field(min_length=8, max_length=40)
 
 
+# Emails waiting to be delivered by the outbox worker (app/email_worker.py).
+# status is one of "pending", "sent", "failed" or "throttled".
+class EmailOutbox(SQLModel, table=True):
+    __tablename__ = "email_outbox"
+    __table_args__ = (
+        Index("ix_email_outbox_status_next_attempt_at", "status", "next_attempt_at"),
+        Index("ix_email_outbox_email_to_created_at", "email_to", "created_at"),
+    )
+
+    id: uuid.UUID = Field(default_factory=uuid.uuid4, primary_key=True)
+    email_to: str = Field(max_length=255)
+    subject: str
+    html_content: str = Field(sa_type=Text)
+    status: str = Field(default="pending", max_length=20)
+    attempts: int = 0
+    last_error: str | None = Field(default=None, sa_type=Text)
+    created_at: datetime = Field(default_factory=datetime.utcnow)
+    next_attempt_at: datetime = Field(default_factory=datetime.utcnow)
+    sent_at: datetime | None = None
+
+
 class CVBase(SQLModel):
     name: str = Field(max_length=255)
     recipient: str = Field(max_length=255)
@@ -145,7 +176,7 @@ class CV(SQLModel, table=True):
     name: str = Field(max_length=255)
     created_at: datetime = Field(default_factory=datetime.utcnow)
     edited_at: datetime = Field(default_factory=datetime.utcnow)
-    recipient: str = Field(max_length=255)
+    recipient: str = Field(max_length=255, index=True)
     jobs: list["Job"] = Relationship(back_populates="cv")
     schools: list["School"] = Relationship(back_populates="cv")
     contact: "Contact" = Relationship(back_populates="cv", sa_relationship_kwargs={"uselist": False})
@@ -181,9 +212,9 @@ class Job(SQLModel, table=True):
     position: str = Field(max_length=255)
     company: str = Field(max_length=255)
     location: str = Field(max_length=255)
-    start: datetime
+    start: datetime = Field(index=True)
     end: datetime | None = None
-    cv_id: uuid.UUID = Field(foreign_key="cv.id")
+    cv_id: uuid.UUID = Field(foreign_key="cv.id", index=True)
     cv: CV = Relationship(back_populates="jobs")
     tasks: list["Task"] = Relationship(back_populates="job")
 
@@ -214,7 +245,7 @@ class Task(SQLModel, table=True):
     name: str = Field(max_length=255)
     description: str | None = Field(default=None, max_length=255)
     duration: int
-    job_id: uuid.UUID = Field(foreign_key="job.id")
+    job_id: uuid.UUID = Field(foreign_key="job.id", index=True)
     job: Job = Relationship(back_populates="tasks")
     skills: list["Skill"] = Relationship(back_populates="task")
 
@@ -241,8 +272,8 @@ class SkillPublic(SkillBase):
 class Skill(SQLModel, table=True):
     id: uuid.UUID = Field(default_factory=uuid.uuid4, primary_key=True)
     name: str = Field(max_length=255)
-    rating: int
-    task_id: uuid.UUID = Field(foreign_key="task.id")
+    rating: int = Field(index=True)
+    task_id: uuid.UUID = Field(foreign_key="task.id", index=True)
     task: Task = Relationship(back_populates="skills")
 
 
@@ -268,7 +299,7 @@ class KnowledgePublic(KnowledgeBase):
 
 class Knowledge(SQLModel, table=True):
     id: uuid.UUID = Field(default_factory=uuid.uuid4, primary_key=True)
-    name: str = Field(max_length=255)
+    name: str = Field(unique=True, max_length=255)
     description: str | None = Field(default=None, max_length=255)
     rating: int
 
@@ -308,7 +339,7 @@ class School(SQLModel, table=True):
     location: str = Field(max_length=255)
     start: datetime
     end: datetime | None = None
-    cv_id: uuid.UUID = Field(foreign_key="cv.id")
+    cv_id: uuid.UUID = Field(foreign_key="cv.id", index=True)
     cv: CV = Relationship(back_populates="schools")
 
 
@@ -358,7 +389,7 @@ class Contact(SQLModel, table=True):
     birthdate: datetime
     photo: str | None = Field(default=None, max_length=255)
     marital_status: str | None = Field(default=None, max_length=255)
-    cv_id: uuid.UUID = Field(foreign_key="cv.id")
+    cv_id: uuid.UUID = Field(foreign_key="cv.id", index=True)
     cv: CV = Relationship(back_populates="contact")
 
 
@@ -382,7 +413,7 @@ class LanguagePublic(LanguageBase):
 
 class Language(SQLModel, table=True):
     id: uuid.UUID = Field(default_factory=uuid.uuid4, primary_key=True)
-    language: str = Field(max_length=255)
+    language: str = Field(unique=True, max_length=255)
     level: str = Field(max_length=255)
 
 
@@ -413,6 +444,42 @@ class CertificatePublic(CertificateBase):
 
 class Certificate(SQLModel, table=True):
     id: uuid.UUID = Field(default_factory=uuid.uuid4, primary_key=True)
-    name: str = Field(max_length=255)
+    name: str = Field(unique=True, max_length=255)
     description: str | None = Field(default=None, max_length=255)
     date: datetime
+
+
+# Batch read of resources by type and id, see app/api/routes/batch.py
+BatchType = Literal[
+    "items",
+    "cvs",
+    "jobs",
+    "tasks",
+    "skills",
+    "schools",
+    "contacts",
+    "knowledges",
+    "languages",
+    "certificates",
+]
+
+
+class BatchKey(SQLModel):
+    type: BatchType
+    id: uuid.UUID
+
+
+class BatchGet(SQLModel):
+    keys: list[BatchKey] = Field(min_length=1, max_length=100)
+
+
+# data holds the public fields of the resource, or error why it is missing
+class BatchResult(SQLModel):
+    type: BatchType
+    id: uuid.UUID
+    data: dict[str, Any] | None = None
+    error: str | None = None
+
+
+class BatchResults(SQLModel):
+    data: list[BatchResult]
@@ -0,0 +1,403 @@
+"""
+Generate a large synthetic dataset of users, items, CVs and all the CV
+tables, to test indexes and pagination at a realistic scale.
+
+The rows are streamed with COPY, in chunks of CHUNK users or CVs, each a
+range of ids generated in a process of a pool. Every chunk has a random
+generator of its own, seeded from --seed and its number, so the same
+options give the same rows whatever the number of processes.
+
+    python app/synthetic_data.py --users 100000 --cvs 1000000 --processes 8
+"""
+
+import argparse
+import bisect
+import logging
+import random
+import time
+import uuid
+from collections import Counter
+from collections.abc import Iterable, Iterator
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+from typing import Any
+
+from psycopg import sql
+from sqlmodel import SQLModel
+
+from app.core.config import settings
+from app.core.db import engine
+from app.core.security import get_password_hash
+from app.models import (
+    CV,
+    Certificate,
+    Contact,
+    Item,
+    Job,
+    Knowledge,
+    Language,
+    School,
+    Skill,
+    Task,
+    User,
+)
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+# Users or CVs per chunk, the unit of work of a process and of a transaction
+CHUNK = 2_000
+
+EMAIL_DOMAIN = "synthetic.example.com"
+PASSWORD = "synthetic-password"
+
+FIRST_NAMES = ["Anna", "Ben", "Clara", "David", "Elena", "Felix", "Greta", "Hugo"]
+LAST_NAMES = ["Muller", "Schmidt", "Garcia", "Rossi", "Martin", "Novak", "Silva"]
+POSITIONS = ["Engineer", "Designer", "Manager", "Analyst", "Consultant", "Intern"]
+SUBJECTS = ["Computer Science", "Economics", "Physics", "Design", "Law", "Biology"]
+DEGREES = ["Bachelor", "Master", "PhD", "Diploma"]
+LEVELS = ["A1", "A2", "B1", "B2", "C1", "C2", "Native"]
+MARITAL_STATUSES = [None, "single", "married", "divorced"]
+LANGUAGES = ["English", "German", "French", "Spanish", "Italian", "Polish"]
+SKILLS = [
+    "Python", "SQL", "JavaScript", "Docker", "Excel", "Communication", "Git",
+    "Kubernetes", "React", "Java", "Leadership", "Linux", "AWS", "TypeScript",
+    "Go", "Rust", "Figma", "Scrum", "Terraform", "PostgreSQL", "C++", "Kotlin",
+]  # fmt: skip
+COMPANIES = [f"Company {i}" for i in range(2_000)]
+LOCATIONS = [f"City {i}" for i in range(500)]
+
+EPOCH = datetime(1990, 1, 1)
+
+
+class Zipf:
+    """
+    Choose from values, the k-th most frequent with a weight of 1 / k^s, so
+    that a few are very common and most are rare, like skill names.
+    """
+
+    def __init__(self, values: list[str], s: float = 1.1) -> None:
+        self.values = values
+        self.cum_weights: list[float] = []
+        total = 0.0
+        for k in range(1, len(values) + 1):
+            total += 1 / k**s
+            self.cum_weights.append(total)
+
+    def __call__(self, rng: random.Random) -> str:
+        x = rng.random() * self.cum_weights[-1]
+        return self.values[bisect.bisect(self.cum_weights, x)]
+
+
+skill_names = Zipf(SKILLS)
+companies = Zipf(COMPANIES)
+locations = Zipf(LOCATIONS)
+
+
+@dataclass
+class Options:
+    users: int
+    items_per_user: float
+    cvs: int
+    languages: int
+    knowledges: int
+    certificates: int
+    seed: int
+
+
+def new_id(rng: random.Random) -> uuid.UUID:
+    return uuid.UUID(int=rng.getrandbits(128), version=4)
+
+
+def date(rng: random.Random, days: int = 12_000) -> datetime:
+    return EPOCH + timedelta(days=rng.randrange(days))
+
+
+def chunk_random(seed: int, kind: str, chunk: int) -> random.Random:
+    # Seeding with a str is stable across processes and runs, unlike hash()
+    return random.Random(f"{seed}-{kind}-{chunk}")
+
+
+def skills_per_task(rng: random.Random) -> int:
+    # Pareto: most tasks have one or two skills, a few have many
+    return min(int(rng.paretovariate(1.5)), 20)
+
+
+def user_rows(
+    options: Options, chunk: int, hashed_password: str
+) -> dict[type[SQLModel], list[dict[str, Any]]]:
+    rng = chunk_random(options.seed, "users", chunk)
+    users, items = [], []
+    for n in range(chunk * CHUNK, min((chunk + 1) * CHUNK, options.users)):
+        user_id = new_id(rng)
+        users.append(
+            {
+                "id": user_id,
+                "email": f"user{n}@{EMAIL_DOMAIN}",
+                "full_name": f"{rng.choice(FIRST_NAMES)} {rng.choice(LAST_NAMES)}",
+                "hashed_password": hashed_password,
+                "is_active": rng.random() > 0.05,
+                "is_superuser": False,
+            }
+        )
+        # Exponential: many users with a few items, some with hundreds
+        for i in range(int(rng.expovariate(1 / options.items_per_user))):
+            items.append(
+                {
+                    "id": new_id(rng),
+                    "title": f"Item {i}",
+                    "description": rng.choice([None, "Description"]),
+                    "owner_id": user_id,
+                }
+            )
+    return {User: users, Item: items}
+
+
+def cv_rows(options: Options, chunk: int) -> dict[type[SQLModel], list[dict[str, Any]]]:
+    rng = chunk_random(options.seed, "cvs", chunk)
+    rows: dict[type[SQLModel], list[dict[str, Any]]] = {
+        model: [] for model in (CV, Contact, School, Job, Task, Skill)
+    }
+    for n in range(chunk * CHUNK, min((chunk + 1) * CHUNK, options.cvs)):
+        cv_id = new_id(rng)
+        created_at = date(rng)
+        rows[CV].append(
+            {
+                "id": cv_id,
+                "name": f"CV {n}",
+                "recipient": companies(rng),
+                "created_at": created_at,
+                "edited_at": created_at + timedelta(days=rng.randrange(365)),
+            }
+        )
+        first_name, last_name = rng.choice(FIRST_NAMES), rng.choice(LAST_NAMES)
+        rows[Contact].append(
+            {
+                "id": new_id(rng),
+                "first_name": first_name,
+                "last_name": last_name,
+                "address": f"Street {rng.randrange(1, 200)}",
+                "zip_code": f"{rng.randrange(10_000, 99_999)}",
+                "location": locations(rng),
+                "phone": f"+49{rng.randrange(10**9, 10**10)}",
+                "email": f"{first_name}.{last_name}.{n}@{EMAIL_DOMAIN}".lower(),
+                "birthdate": date(rng),
+                "photo": None,
+                "marital_status": rng.choice(MARITAL_STATUSES),
+                "cv_id": cv_id,
+            }
+        )
+        for _ in range(rng.choices((0, 1, 2, 3), weights=(5, 40, 40, 15))[0]):
+            start = date(rng)
+            rows[School].append(
+                {
+                    "id": new_id(rng),
+                    "school": f"University of {locations(rng)}",
+                    "subject": rng.choice(SUBJECTS),
+                    "degree": rng.choice(DEGREES),
+                    "location": locations(rng),
+                    "start": start,
+                    "end": start + timedelta(days=rng.randrange(365, 2_000)),
+                    "cv_id": cv_id,
+                }
+            )
+        for _ in range(min(1 + int(rng.expovariate(1 / 3)), 15)):
+            job_id = new_id(rng)
+            start = date(rng)
+            rows[Job].append(
+                {
+                    "id": job_id,
+                    "position": rng.choice(POSITIONS),
+                    "company": companies(rng),
+                    "location": locations(rng),
+                    "start": start,
+                    # The current job has no end
+                    "end": start + timedelta(days=rng.randrange(30, 3_000))
+                    if rng.random() > 0.2
+                    else None,
+                    "cv_id": cv_id,
+                }
+            )
+            for t in range(rng.randint(1, 5)):
+                task_id = new_id(rng)
+                rows[Task].append(
+                    {
+                        "id": task_id,
+                        "name": f"Task {t}",
+                        "description": None,
+                        "duration": rng.randint(1, 52),
+                        "job_id": job_id,
+                    }
+                )
+                for _ in range(skills_per_task(rng)):
+                    rows[Skill].append(
+                        {
+                            "id": new_id(rng),
+                            "name": skill_names(rng),
+                            "rating": rng.randint(1, 5),
+                            "task_id": task_id,
+                        }
+                    )
+    return rows
+
+
+def unique_names(names: list[str], count: int) -> Iterator[str]:
+    # The reference tables have unique names
+    for n in range(count):
+        name = names[n % len(names)]
+        yield name if n < len(names) else f"{name} {n // len(names)}"
+
+
+def reference_rows(options: Options) -> dict[type[SQLModel], list[dict[str, Any]]]:
+    rng = chunk_random(options.seed, "reference", 0)
+    return {
+        Language: [
+            {"id": new_id(rng), "language": name, "level": rng.choice(LEVELS)}
+            for name in unique_names(LANGUAGES, options.languages)
+        ],
+        Knowledge: [
+            {
+                "id": new_id(rng),
+                "name": name,
+                "description": None,
+                "rating": rng.randint(1, 5),
+            }
+            for name in unique_names(SKILLS, options.knowledges)
+        ],
+        Certificate: [
+            {
+                "id": new_id(rng),
+                "name": f"{name} certification",
+                "description": None,
+                "date": date(rng),
+            }
+            for name in unique_names(SKILLS, options.certificates)
+        ],
+    }
+
+
+def copy(
+    rows_by_model: dict[type[SQLModel], list[dict[str, Any]]],
+) -> Counter[str]:
+    """
+    COPY the rows into their tables, in one transaction, parents first.
+    """
+    counts: Counter[str] = Counter()
+    connection = engine.raw_connection()
+    try:
+        cursor = connection.cursor()
+        for model, rows in rows_by_model.items():
+            table = model.__table__  # type: ignore[attr-defined]
+            columns = [column.name for column in table.columns]
+            statement = sql.SQL("COPY {} ({}) FROM STDIN").format(
+                sql.Identifier(table.name),
+                sql.SQL(", ").join(map(sql.Identifier, columns)),
+            )
+            with cursor.copy(statement) as copy:
+                for row in rows:
+                    copy.write_row([row[column] for column in columns])
+            counts[table.name] += len(rows)
+        connection.commit()
+    finally:
+        connection.close()
+    return counts
+
+
+def generate_chunk(
+    kind: str, chunk: int, options: Options, hashed_password: str
+) -> Counter[str]:
+    if kind == "users":
+        return copy(user_rows(options, chunk, hashed_password))
+    return copy(cv_rows(options, chunk))
+
+
+def init_process() -> None:
+    # Don't share the pooled connections of the parent process
+    engine.dispose(close=False)
+
+
+def chunks(count: int) -> Iterable[int]:
+    return range((count + CHUNK - 1) // CHUNK)
+
+
+def generate(options: Options, processes: int) -> Counter[str]:
+    start = time.perf_counter()
+    counts = copy(reference_rows(options))
+    hashed_password = get_password_hash(PASSWORD)
+    with ProcessPoolExecutor(processes, initializer=init_process) as executor:
+        futures = [
+            executor.submit(generate_chunk, kind, chunk, options, hashed_password)
+            for kind, count in (("users", options.users), ("cvs", options.cvs))
+            for chunk in chunks(count)
+        ]
+        for done, future in enumerate(as_completed(futures), 1):
+            counts.update(future.result())
+            total = sum(counts.values())
+            seconds = time.perf_counter() - start
+            logger.info(
+                "%d/%d chunks, %d rows, %.0f rows/s",
+                done,
+                len(futures),
+                total,
+                total / seconds,
+            )
+    seconds = time.perf_counter() - start
+    for table, count in counts.most_common():
+        logger.info("%-12s %12d rows", table, count)
+    total = sum(counts.values())
+    logger.info("%d rows in %.1f s, %.0f rows/s", total, seconds, total / seconds)
+    return counts
+
+
+def truncate() -> None:
+    connection = engine.raw_connection()
+    try:
+        models: list[type[SQLModel]] = [User, Item, CV, Contact, School, Job, Task]
+        models += [Skill, Language, Knowledge, Certificate]
+        tables = [model.__table__.name for model in models]  # type: ignore[attr-defined]
+        connection.cursor().execute(
+            sql.SQL("TRUNCATE {} CASCADE").format(
+                sql.SQL(", ").join(map(sql.Identifier, tables))
+            )
+        )
+        connection.commit()
+    finally:
+        connection.close()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--users", type=int, default=10_000)
+    parser.add_argument("--items-per-user", type=float, default=20)
+    parser.add_argument("--cvs", type=int, default=100_000)
+    parser.add_argument("--languages", type=int, default=100)
+    parser.add_argument("--knowledges", type=int, default=1_000)
+    parser.add_argument("--certificates", type=int, default=1_000)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--processes", type=int, default=None)
+    parser.add_argument(
+        "--truncate",
+        action="store_true",
+        help="Delete all the rows of the tables first, including the superuser",
+    )
+    args = parser.parse_args()
+    if settings.ENVIRONMENT == "production":
+        parser.error("Not in production")
+    if args.truncate:
+        truncate()
+    options = Options(
+        users=args.users,
+        items_per_user=args.items_per_user,
+        cvs=args.cvs,
+        languages=args.languages,
+        knowledges=args.knowledges,
+        certificates=args.certificates,
+        seed=args.seed,
+    )
+    logger.info("Generating synthetic data")
+    generate(options, args.processes)
+
+
+if __name__ == "__main__":
+    main()
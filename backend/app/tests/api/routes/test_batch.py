@@ -0,0 +1,71 @@
+import uuid
+
+from fastapi.testclient import TestClient
+from sqlmodel import Session
+
+from app.core.config import settings
+from app.tests.utils.item import create_random_item
+from app.tests.utils.queries import query_budget
+
+
+def test_batch_get(
+    client: TestClient, superuser_token_headers: dict[str, str], db: Session
+) -> None:
+    items = [create_random_item(db) for _ in range(3)]
+    missing_id = uuid.uuid4()
+    keys = [{"type": "items", "id": str(item.id)} for item in items]
+    keys.insert(1, {"type": "items", "id": str(missing_id)})
+    keys.append({"type": "jobs", "id": str(missing_id)})
+
+    # The current user, then one query per type
+    with query_budget("batch-batch_get", extra=2, max_repeats=1):
+        response = client.post(
+            f"{settings.API_V1_STR}/batch/get",
+            headers=superuser_token_headers,
+            json={"keys": keys},
+        )
+
+    assert response.status_code == 200
+    results = response.json()["data"]
+    assert [(r["type"], r["id"]) for r in results] == [
+        (k["type"], k["id"]) for k in keys
+    ]
+    assert results[0]["data"]["title"] == items[0].title
+    assert results[0]["data"]["owner_id"] == str(items[0].owner_id)
+    assert results[1] == {
+        "type": "items",
+        "id": str(missing_id),
+        "error": "Item not found",
+    }
+    assert results[2]["data"]["id"] == str(items[1].id)
+    assert results[4]["error"] == "Job not found"
+
+
+def test_batch_get_not_enough_permissions(
+    client: TestClient, normal_user_token_headers: dict[str, str], db: Session
+) -> None:
+    item = create_random_item(db)
+    response = client.post(
+        f"{settings.API_V1_STR}/batch/get",
+        headers=normal_user_token_headers,
+        json={"keys": [{"type": "items", "id": str(item.id)}]},
+    )
+    assert response.status_code == 200
+    assert response.json()["data"][0]["error"] == "Not enough permissions"
+
+
+def test_batch_get_validation(
+    client: TestClient, superuser_token_headers: dict[str, str]
+) -> None:
+    response = client.post(
+        f"{settings.API_V1_STR}/batch/get",
+        headers=superuser_token_headers,
+        json={"keys": []},
+    )
+    assert response.status_code == 422
+    response = client.post(
+        f"{settings.API_V1_STR}/batch/get",
+        headers=superuser_token_headers,
+        json={"keys": [{"type": "users", "id": str(uuid.uuid4())}]},
+    )
+    assert response.status_code == 422
@@ -0,0 +1,111 @@
+import uuid
+from datetime import datetime
+
+from fastapi.testclient import TestClient
+from sqlmodel import Session
+
+from app.core.config import settings
+from app.models import Certificate
+from app.tests.utils.queries import query_budget
+from app.tests.utils.utils import random_lower_string
+
+
+def create_random_certificate(db: Session) -> Certificate:
+    certificate = Certificate(name=random_lower_string(), date=datetime(2021, 6, 1))
+    db.add(certificate)
+    db.commit()
+    db.refresh(certificate)
+    return certificate
+
+
+def test_read_certificates(
+    client: TestClient, superuser_token_headers: dict[str, str], db: Session
+) -> None:
+    create_random_certificate(db)
+    create_random_certificate(db)
+    with query_budget("certificates-read_certificates"):
+        response = client.get(
+            f"{settings.API_V1_STR}/certificates/", headers=superuser_token_headers
+        )
+    assert response.status_code == 200
+    assert len(response.json()) >= 2
+
+
+def test_read_certificate(
+    client: TestClient, superuser_token_headers: dict[str, str], db: Session
+) -> None:
+    certificate = create_random_certificate(db)
+    url = f"{settings.API_V1_STR}/certificates/{certificate.id}"
+    with query_budget("certificates-read_certificate"):
+        response = client.get(url, headers=superuser_token_headers)
+    assert response.status_code == 200
+    assert response.json()["name"] == certificate.name
+
+
+def test_read_certificate_not_found(
+    client: TestClient, superuser_token_headers: dict[str, str]
+) -> None:
+    with query_budget("certificates-read_certificate"):
+        response = client.get(
+            f"{settings.API_V1_STR}/certificates/{uuid.uuid4()}",
+            headers=superuser_token_headers,
+        )
+    assert response.status_code == 404
+    assert response.json()["detail"] == "Certificate not found"
+
+
+def test_create_certificate(
+    client: TestClient, superuser_token_headers: dict[str, str]
+) -> None:
+    data = {"name": random_lower_string(), "date": "2021-06-01T00:00:00"}
+    with query_budget("certificates-create_certificate"):
+        response = client.post(
+            f"{settings.API_V1_STR}/certificates/",
+            headers=superuser_token_headers,
+            json=data,
+        )
+    assert response.status_code == 200
+    assert response.json()["name"] == data["name"]
+
+
+def test_upsert_certificate(
+    client: TestClient, superuser_token_headers: dict[str, str], db: Session
+) -> None:
+    certificate = create_random_certificate(db)
+    with query_budget("certificates-upsert_certificate"):
+        response = client.put(
+            f"{settings.API_V1_STR}/certificates/",
+            headers=superuser_token_headers,
+            json={
+                "name": certificate.name,
+                "description": "Renewed",
+                "date": "2024-06-01T00:00:00",
+            },
+        )
+    assert response.status_code == 200
+    assert response.json()["id"] == str(certificate.id)
+    assert response.json()["description"] == "Renewed"
+
+
+def test_update_certificate(
+    client: TestClient, superuser_token_headers: dict[str, str], db: Session
+) -> None:
+    certificate = create_random_certificate(db)
+    url = f"{settings.API_V1_STR}/certificates/{certificate.id}"
+    with query_budget("certificates-update_certificate"):
+        response = client.put(
+            url, headers=superuser_token_headers, json={"description": "Renewed"}
+        )
+    assert response.status_code == 200
+    assert response.json()["description"] == "Renewed"
+
+
+def test_delete_certificate(
+    client: TestClient, superuser_token_headers: dict[str, str], db: Session
+) -> None:
+    certificate = create_random_certificate(db)
+    url = f"{settings.API_V1_STR}/certificates/{certificate.id}"
+    with query_budget("certificates-delete_certificate"):
+        response = client.delete(url, headers=superuser_token_headers)
+    assert response.status_code == 200
+    assert response.json()["message"] == "Certificate deleted successfully"
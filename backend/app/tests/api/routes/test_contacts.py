@@ -0,0 +1,83 @@
+import uuid
+
+from fastapi.testclient import TestClient
+from sqlmodel import Session
+
+from app.core.config import settings
+from app.tests.utils.cv import create_random_contact, create_random_cv
+from app.tests.utils.queries import query_budget
+
+
+def test_read_contacts(
+    client: TestClient, superuser_token_headers: dict[str, str], db: Session
+) -> None:
+    for _ in range(2):
+        create_random_contact(db, create_random_cv(db))
+    with query_budget("contacts-read_contacts"):
+        response = client.get(
+            f"{settings.API_V1_STR}/contacts/", headers=superuser_token_headers
+        )
+    assert response.status_code == 200
+    assert len(response.json()) >= 2
+
+
+def test_read_contacts_include(
+    client: TestClient, superuser_token_headers: dict[str, str], db: Session
+) -> None:
+    for _ in range(3):
+        create_random_contact(db, create_random_cv(db))
+    # One query for the CVs, whatever the number of contacts
+    with query_budget("contacts-read_contacts", extra=1, max_repeats=1):
+        response = client.get(
+            f"{settings.API_V1_STR}/contacts/",
+            headers=superuser_token_headers,
+            params={"include": "cv"},
+        )
+    assert response.status_code == 200
+    assert all(contact["cv"] for contact in response.json())
+
+
+def test_read_contact(
+    client: TestClient, superuser_token_headers: dict[str, str], db: Session
+) -> None:
+    contact = create_random_contact(db, create_random_cv(db))
+    url = f"{settings.API_V1_STR}/contacts/{contact.id}"
+    with query_budget("contacts-read_contact"):
+        response = client.get(url, headers=superuser_token_headers)
+    assert response.status_code == 200
+    assert response.json()["email"] == contact.email
+
+
+def test_read_contact_not_found(
+    client: TestClient, superuser_token_headers: dict[str, str]
+) -> None:
+    with query_budget("contacts-read_contact"):
+        response = client.get(
+            f"{settings.API_V1_STR}/contacts/{uuid.uuid4()}",
+            headers=superuser_token_headers,
+        )
+    assert response.status_code == 404
+
+
+def test_update_contact(
+    client: TestClient, superuser_token_headers: dict[str, str], db: Session
+) -> None:
+    contact = create_random_contact(db, create_random_cv(db))
+    url = f"{settings.API_V1_STR}/contacts/{contact.id}"
+    with query_budget("contacts-update_contact"):
+        response = client.put(
+            url, headers=superuser_token_headers, json={"location": "Hamburg"}
+        )
+    assert response.status_code == 200
+    assert response.json()["location"] == "Hamburg"
+
+
+def test_delete_contact(
+    client: TestClient, superuser_token_headers: dict[str, str], db: Session
+) -> None:
+    contact = create_random_contact(db, create_random_cv(db))
+    url = f"{settings.API_V1_STR}/contacts/{contact.id}"
+    with query_budget("contacts-delete_contact"):
+        response = client.delete(url, headers=superuser_token_headers)
+    assert response.status_code == 200
+    assert response.json()["message"] == "Contact deleted successfully"
@@ -0,0 +1,136 @@
+import uuid
+
+from fastapi.testclient import TestClient
+from sqlmodel import Session
+
+from app.core.config import settings
+from app.tests.utils.cv import create_random_cv
+from app.tests.utils.queries import query_budget
+
+
+def test_read_cv_include(
+    client: TestClient, superuser_token_headers: dict[str, str], db: Session
+) -> None:
+    cv = create_random_cv(db, jobs=2, tasks=2, skills=2)
+    response = client.get(
+        f"{settings.API_V1_STR}/cvs/{cv.id}",
+        headers=superuser_token_headers,
+        params={"include": "jobs.tasks.skills,contact"},
+    )
+    assert response.status_code == 200
+    content = response.json()
+    assert content["id"] == str(cv.id)
+    assert content["contact"] is None
+    assert len(content["jobs"]) == 2
+    for job in content["jobs"]:
+        assert job["cv_id"] == str(cv.id)
+        assert len(job["tasks"]) == 2
+        for task in job["tasks"]:
+            assert task["job_id"] == job["id"]
+            assert len(task["skills"]) == 2
+
+
+def test_read_cv_include_query_count(
+    client: TestClient, superuser_token_headers: dict[str, str], db: Session
+) -> None:
+    small = create_random_cv(db, jobs=1, tasks=1, skills=1)
+    large = create_random_cv(db, jobs=5, tasks=4, skills=3)
+    for cv in (small, large):
+        # Outside the budget, cv.id may be loaded again after a commit
+        url = f"{settings.API_V1_STR}/cvs/{cv.id}"
+        # The current user, the CV, then one query per level
+        with query_budget("cvs-read_cv", extra=3, max_repeats=1) as statements:
+            response = client.get(
+                url,
+                headers=superuser_token_headers,
+                params={"include": "jobs.tasks.skills"},
+            )
+        assert response.status_code == 200
+        assert len(statements) == 5
+
+
+def test_read_cvs_unknown_include(
+    client: TestClient, superuser_token_headers: dict[str, str]
+) -> None:
+    response = client.get(
+        f"{settings.API_V1_STR}/cvs/",
+        headers=superuser_token_headers,
+        params={"include": "jobs.owner"},
+    )
+    assert response.status_code == 422
+    assert response.json()["detail"] == "Unknown include: jobs.owner"
+
+
+def test_read_cvs(
+    client: TestClient, superuser_token_headers: dict[str, str], db: Session
+) -> None:
+    create_random_cv(db)
+    create_random_cv(db)
+    with query_budget("cvs-read_cvs"):
+        response = client.get(
+            f"{settings.API_V1_STR}/cvs/", headers=superuser_token_headers
+        )
+    assert response.status_code == 200
+    content = response.json()
+    assert content["count"] >= 2
+    assert len(content["data"]) >= 2
+
+
+def test_read_cvs_include_query_count(
+    client: TestClient, superuser_token_headers: dict[str, str], db: Session
+) -> None:
+    for _ in range(3):
+        create_random_cv(db, jobs=2, tasks=2, skills=2)
+    # One query per level, whatever the number of CVs
+    with query_budget("cvs-read_cvs", extra=3, max_repeats=1):
+        response = client.get(
+            f"{settings.API_V1_STR}/cvs/",
+            headers=superuser_token_headers,
+            params={"include": "jobs.tasks.skills"},
+        )
+    assert response.status_code == 200
+
+
+def test_read_cv_not_found(
+    client: TestClient, superuser_token_headers: dict[str, str]
+) -> None:
+    with query_budget("cvs-read_cv"):
+        response = client.get(
+            f"{settings.API_V1_STR}/cvs/{uuid.uuid4()}",
+            headers=superuser_token_headers,
+        )
+    assert response.status_code == 404
+
+
+def test_create_cv(client: TestClient, superuser_token_headers: dict[str, str]) -> None:
+    data = {"name": "CV", "recipient": "Company"}
+    with query_budget("cvs-create_cv"):
+        response = client.post(
+            f"{settings.API_V1_STR}/cvs/", headers=superuser_token_headers, json=data
+        )
+    assert response.status_code == 200
+    assert response.json()["name"] == data["name"]
+
+
+def test_update_cv(
+    client: TestClient, superuser_token_headers: dict[str, str], db: Session
+) -> None:
+    cv = create_random_cv(db)
+    url = f"{settings.API_V1_STR}/cvs/{cv.id}"
+    with query_budget("cvs-update_cv"):
+        response = client.put(
+            url, headers=superuser_token_headers, json={"recipient": "Other"}
+        )
+    assert response.status_code == 200
+    assert response.json()["recipient"] == "Other"
+
+
+def test_delete_cv(
+    client: TestClient, superuser_token_headers: dict[str, str], db: Session
+) -> None:
+    cv = create_random_cv(db)
+    url = f"{settings.API_V1_STR}/cvs/{cv.id}"
+    with query_budget("cvs-delete_cv"):
+        response = client.delete(url, headers=superuser_token_headers)
+    assert response.status_code == 200
+    assert response.json()["message"] == "CV deleted successfully"
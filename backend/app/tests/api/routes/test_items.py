@@ -1,21 +1,24 @@
 import uuid
 
+import pytest
 from fastapi.testclient import TestClient
 from sqlmodel import Session
 
 from app.core.config import settings
 from app.tests.utils.item import create_random_item
+from app.tests.utils.queries import query_budget
 
 
 def test_create_item(
     client: TestClient, superuser_token_headers: dict[str, str]
 ) -> None:
     data = {"title": "Foo", "description": "Fighters"}
-    response = client.post(
-        f"{settings.API_V1_STR}/items/",
-        headers=superuser_token_headers,
-        json=data,
-    )
+    with query_budget("items-create_item"):
+        response = client.post(
+            f"{settings.API_V1_STR}/items/",
+            headers=superuser_token_headers,
+            json=data,
+        )
     assert response.status_code == 200
     content = response.json()
     assert content["title"] == data["title"]
@@ -28,10 +31,11 @@ def test_read_item(
     client: TestClient, superuser_token_headers: dict[str, str], db: Session
 ) -> None:
     item = create_random_item(db)
-    response = client.get(
-        f"{settings.API_V1_STR}/items/{item.id}",
-        headers=superuser_token_headers,
-    )
+    with query_budget("items-read_item"):
+        response = client.get(
+            f"{settings.API_V1_STR}/items/{item.id}",
+            headers=superuser_token_headers,
+        )
     assert response.status_code == 200
     content = response.json()
     assert content["title"] == item.title
@@ -43,10 +47,11 @@ def test_read_item(
 def test_read_item_not_found(
     client: TestClient, superuser_token_headers: dict[str, str]
 ) -> None:
-    response = client.get(
-        f"{settings.API_V1_STR}/items/{uuid.uuid4()}",
-        headers=superuser_token_headers,
-    )
+    with query_budget("items-read_item"):
+        response = client.get(
+            f"{settings.API_V1_STR}/items/{uuid.uuid4()}",
+            headers=superuser_token_headers,
+        )
     assert response.status_code == 404
     content = response.json()
     assert content["detail"] == "Item not found"
@@ -56,10 +61,11 @@ def test_read_item_not_enough_permissions(
     client: TestClient, normal_user_token_headers: dict[str, str], db: Session
 ) -> None:
     item = create_random_item(db)
-    response = client.get(
-        f"{settings.API_V1_STR}/items/{item.id}",
-        headers=normal_user_token_headers,
-    )
+    with query_budget("items-read_item"):
+        response = client.get(
+            f"{settings.API_V1_STR}/items/{item.id}",
+            headers=normal_user_token_headers,
+        )
     assert response.status_code == 400
     content = response.json()
     assert content["detail"] == "Not enough permissions"
@@ -70,25 +76,110 @@ def test_read_items(
 ) -> None:
     create_random_item(db)
     create_random_item(db)
-    response = client.get(
-        f"{settings.API_V1_STR}/items/",
-        headers=superuser_token_headers,
-    )
+    with query_budget("items-read_items"):
+        response = client.get(
+            f"{settings.API_V1_STR}/items/",
+            headers=superuser_token_headers,
+        )
     assert response.status_code == 200
     content = response.json()
     assert len(content["data"]) >= 2
 
 
+def test_read_items_fields(
+    client: TestClient, superuser_token_headers: dict[str, str], db: Session
+) -> None:
+    create_random_item(db)
+    with query_budget("items-read_items"):
+        response = client.get(
+            f"{settings.API_V1_STR}/items/",
+            headers=superuser_token_headers,
+            params={"fields": "title"},
+        )
+    assert response.status_code == 200
+    content = response.json()
+    assert content["data"]
+    for item in content["data"]:
+        assert set(item) == {"title", "id"}
+
+
+def test_read_items_unknown_field(
+    client: TestClient, superuser_token_headers: dict[str, str]
+) -> None:
+    with query_budget("items-read_items"):
+        response = client.get(
+            f"{settings.API_V1_STR}/items/",
+            headers=superuser_token_headers,
+            params={"fields": "title,owner"},
+        )
+    assert response.status_code == 422
+    assert response.json()["detail"] == "Unknown fields: owner"
+
+
+def test_read_items_filter_and_sort(
+    client: TestClient, superuser_token_headers: dict[str, str], db: Session
+) -> None:
+    item = create_random_item(db)
+    with query_budget("items-read_items"):
+        response = client.get(
+            f"{settings.API_V1_STR}/items/",
+            headers=superuser_token_headers,
+            params={"filter": f"owner_id:eq:{item.owner_id}", "sort": "-title"},
+        )
+    assert response.status_code == 200
+    content = response.json()
+    assert content["count"] == 1
+    assert content["data"][0]["id"] == str(item.id)
+
+
+def test_read_items_invalid_filter(
+    client: TestClient, superuser_token_headers: dict[str, str]
+) -> None:
+    with query_budget("items-read_items"):
+        response = client.get(
+            f"{settings.API_V1_STR}/items/",
+            headers=superuser_token_headers,
+            params={"filter": "owner_id:like:foo"},
+        )
+    assert response.status_code == 422
+    assert response.json()["detail"] == "Unknown operator: like"
+    with query_budget("items-read_items"):
+        response = client.get(
+            f"{settings.API_V1_STR}/items/",
+            headers=superuser_token_headers,
+            params={"filter": "owner_id:eq:foo"},
+        )
+    assert response.status_code == 422
+    assert response.json()["detail"] == "Invalid value for owner_id: foo"
+
+
+def test_read_items_unindexed_filter_in_production(
+    client: TestClient,
+    superuser_token_headers: dict[str, str],
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    monkeypatch.setattr(settings, "ENVIRONMENT", "production")
+    with query_budget("items-read_items"):
+        response = client.get(
+            f"{settings.API_V1_STR}/items/",
+            headers=superuser_token_headers,
+            params={"filter": "title:eq:foo"},
+        )
+    assert response.status_code == 422
+    assert response.json()["detail"] == "Field is not indexed: title"
+
+
 def test_update_item(
     client: TestClient, superuser_token_headers: dict[str, str], db: Session
 ) -> None:
     item = create_random_item(db)
     data = {"title": "Updated title", "description": "Updated description"}
-    response = client.put(
-        f"{settings.API_V1_STR}/items/{item.id}",
-        headers=superuser_token_headers,
-        json=data,
-    )
+    with query_budget("items-update_item"):
+        response = client.put(
+            f"{settings.API_V1_STR}/items/{item.id}",
+            headers=superuser_token_headers,
+            json=data,
+        )
     assert response.status_code == 200
     content = response.json()
     assert content["title"] == data["title"]
@@ -101,11 +192,12 @@ def test_update_item_not_found(
     client: TestClient, superuser_token_headers: dict[str, str]
 ) -> None:
     data = {"title": "Updated title", "description": "Updated description"}
-    response = client.put(
-        f"{settings.API_V1_STR}/items/{uuid.uuid4()}",
-        headers=superuser_token_headers,
-        json=data,
-    )
+    with query_budget("items-update_item"):
+        response = client.put(
+            f"{settings.API_V1_STR}/items/{uuid.uuid4()}",
+            headers=superuser_token_headers,
+            json=data,
+        )
     assert response.status_code == 404
     content = response.json()
     assert content["detail"] == "Item not found"
@@ -116,11 +208,12 @@ def test_update_item_not_enough_permissions(
 ) -> None:
     item = create_random_item(db)
     data = {"title": "Updated title", "description": "Updated description"}
-    response = client.put(
-        f"{settings.API_V1_STR}/items/{item.id}",
-        headers=normal_user_token_headers,
-        json=data,
-    )
+    with query_budget("items-update_item"):
+        response = client.put(
+            f"{settings.API_V1_STR}/items/{item.id}",
+            headers=normal_user_token_headers,
+            json=data,
+        )
     assert response.status_code == 400
     content = response.json()
     assert content["detail"] == "Not enough permissions"
@@ -130,10 +223,11 @@ def test_delete_item(
     client: TestClient, superuser_token_headers: dict[str, str], db: Session
 ) -> None:
     item = create_random_item(db)
-    response = client.delete(
-        f"{settings.API_V1_STR}/items/{item.id}",
-        headers=superuser_token_headers,
-    )
+    with query_budget("items-delete_item"):
+        response = client.delete(
+            f"{settings.API_V1_STR}/items/{item.id}",
+            headers=superuser_token_headers,
+        )
     assert response.status_code == 200
     content = response.json()
     assert content["message"] == "Item deleted successfully"
@@ -142,10 +236,11 @@ def test_delete_item(
 def test_delete_item_not_found(
     client: TestClient, superuser_token_headers: dict[str, str]
 ) -> None:
-    response = client.delete(
-        f"{settings.API_V1_STR}/items/{uuid.uuid4()}",
-        headers=superuser_token_headers,
-    )
+    with query_budget("items-delete_item"):
+        response = client.delete(
+            f"{settings.API_V1_STR}/items/{uuid.uuid4()}",
+            headers=superuser_token_headers,
+        )
     assert response.status_code == 404
     content = response.json()
     assert content["detail"] == "Item not found"
@@ -155,10 +250,11 @@ def test_delete_item_not_enough_permissions(
     client: TestClient, normal_user_token_headers: dict[str, str], db: Session
 ) -> None:
     item = create_random_item(db)
-    response = client.delete(
-        f"{settings.API_V1_STR}/items/{item.id}",
-        headers=normal_user_token_headers,
-    )
+    with query_budget("items-delete_item"):
+        response = client.delete(
+            f"{settings.API_V1_STR}/items/{item.id}",
+            headers=normal_user_token_headers,
+        )
     assert response.status_code == 400
     content = response.json()
     assert content["detail"] == "Not enough permissions"
@@ -0,0 +1,103 @@
+import uuid
+
+from fastapi.testclient import TestClient
+from sqlmodel import Session
+
+from app.core.config import settings
+from app.tests.utils.cv import create_random_cv
+from app.tests.utils.queries import query_budget
+
+
+def test_read_jobs(
+    client: TestClient, superuser_token_headers: dict[str, str], db: Session
+) -> None:
+    create_random_cv(db, jobs=2)
+    with query_budget("jobs-read_jobs"):
+        response = client.get(
+            f"{settings.API_V1_STR}/jobs/", headers=superuser_token_headers
+        )
+    assert response.status_code == 200
+    assert len(response.json()) >= 2
+
+
+def test_read_jobs_include(
+    client: TestClient, superuser_token_headers: dict[str, str], db: Session
+) -> None:
+    for _ in range(2):
+        create_random_cv(db, jobs=3, tasks=2, skills=2)
+    # One query per level, whatever the number of jobs
+    with query_budget("jobs-read_jobs", extra=2, max_repeats=1):
+        response = client.get(
+            f"{settings.API_V1_STR}/jobs/",
+            headers=superuser_token_headers,
+            params={"include": "tasks.skills"},
+        )
+    assert response.status_code == 200
+    for job in response.json():
+        for task in job["tasks"]:
+            assert task["job_id"] == job["id"]
+
+
+def test_read_job(
+    client: TestClient, superuser_token_headers: dict[str, str], db: Session
+) -> None:
+    job = create_random_cv(db, jobs=1).jobs[0]
+    url = f"{settings.API_V1_STR}/jobs/{job.id}"
+    with query_budget("jobs-read_job"):
+        response = client.get(url, headers=superuser_token_headers)
+    assert response.status_code == 200
+    assert response.json()["position"] == job.position
+
+
+def test_read_job_not_found(
+    client: TestClient, superuser_token_headers: dict[str, str]
+) -> None:
+    with query_budget("jobs-read_job"):
+        response = client.get(
+            f"{settings.API_V1_STR}/jobs/{uuid.uuid4()}",
+            headers=superuser_token_headers,
+        )
+    assert response.status_code == 404
+
+
+def test_create_job(
+    client: TestClient, superuser_token_headers: dict[str, str], db: Session
+) -> None:
+    cv = create_random_cv(db)
+    data = {
+        "position": "Developer",
+        "company": "Company",
+        "location": "Berlin",
+        "start": "2020-01-01T00:00:00",
+        "cv_id": str(cv.id),
+    }
+    with query_budget("jobs-create_job"):
+        response = client.post(
+            f"{settings.API_V1_STR}/jobs/", headers=superuser_token_headers, json=data
+        )
+    assert response.status_code == 200
+    assert response.json()["cv_id"] == data["cv_id"]
+
+
+def test_update_job(
+    client: TestClient, superuser_token_headers: dict[str, str], db: Session
+) -> None:
+    job = create_random_cv(db, jobs=1).jobs[0]
+    url = f"{settings.API_V1_STR}/jobs/{job.id}"
+    with query_budget("jobs-update_job"):
+        response = client.put(
+            url, headers=superuser_token_headers, json={"position": "Manager"}
+        )
+    assert response.status_code == 200
+    assert response.json()["position"] == "Manager"
+
+
+def test_delete_job(
+    client: TestClient, superuser_token_headers: dict[str, str], db: Session
+) -> None:
+    job = create_random_cv(db, jobs=1).jobs[0]
+    url = f"{settings.API_V1_STR}/jobs/{job.id}"
+    with query_budget("jobs-delete_job"):
+        response = client.delete(url, headers=superuser_token_headers)
+    assert response.status_code == 200
+    assert response.json()["message"] == "Job deleted successfully"
@@ -0,0 +1,104 @@
+import uuid
+
+from fastapi.testclient import TestClient
+from sqlmodel import Session
+
+from app.core.config import settings
+from app.models import Knowledge
+from app.tests.utils.queries import query_budget
+from app.tests.utils.utils import random_lower_string
+
+
+def create_random_knowledge(db: Session) -> Knowledge:
+    knowledge = Knowledge(name=random_lower_string(), rating=3)
+    db.add(knowledge)
+    db.commit()
+    db.refresh(knowledge)
+    return knowledge
+
+
+def test_read_knowledges(
+    client: TestClient, superuser_token_headers: dict[str, str], db: Session
+) -> None:
+    create_random_knowledge(db)
+    create_random_knowledge(db)
+    with query_budget("knowledges-read_knowledges"):
+        response = client.get(
+            f"{settings.API_V1_STR}/knowledges/", headers=superuser_token_headers
+        )
+    assert response.status_code == 200
+    assert len(response.json()) >= 2
+
+
+def test_read_knowledge(
+    client: TestClient, superuser_token_headers: dict[str, str], db: Session
+) -> None:
+    knowledge = create_random_knowledge(db)
+    url = f"{settings.API_V1_STR}/knowledges/{knowledge.id}"
+    with query_budget("knowledges-read_knowledge"):
+        response = client.get(url, headers=superuser_token_headers)
+    assert response.status_code == 200
+    assert response.json()["name"] == knowledge.name
+
+
+def test_read_knowledge_not_found(
+    client: TestClient, superuser_token_headers: dict[str, str]
+) -> None:
+    with query_budget("knowledges-read_knowledge"):
+        response = client.get(
+            f"{settings.API_V1_STR}/knowledges/{uuid.uuid4()}",
+            headers=superuser_token_headers,
+        )
+    assert response.status_code == 404
+    assert response.json()["detail"] == "Knowledge not found"
+
+
+def test_create_knowledge(
+    client: TestClient, superuser_token_headers: dict[str, str]
+) -> None:
+    data = {"name": random_lower_string(), "rating": 4}
+    with query_budget("knowledges-create_knowledge"):
+        response = client.post(
+            f"{settings.API_V1_STR}/knowledges/",
+            headers=superuser_token_headers,
+            json=data,
+        )
+    assert response.status_code == 200
+    assert response.json()["name"] == data["name"]
+
+
+def test_upsert_knowledge(
+    client: TestClient, superuser_token_headers: dict[str, str], db: Session
+) -> None:
+    knowledge = create_random_knowledge(db)
+    with query_budget("knowledges-upsert_knowledge"):
+        response = client.put(
+            f"{settings.API_V1_STR}/knowledges/",
+            headers=superuser_token_headers,
+            json={"name": knowledge.name, "rating": 5},
+        )
+    assert response.status_code == 200
+    assert response.json()["id"] == str(knowledge.id)
+    assert response.json()["rating"] == 5
+
+
+def test_update_knowledge(
+    client: TestClient, superuser_token_headers: dict[str, str], db: Session
+) -> None:
+    knowledge = create_random_knowledge(db)
+    url = f"{settings.API_V1_STR}/knowledges/{knowledge.id}"
+    with query_budget("knowledges-update_knowledge"):
+        response = client.put(url, headers=superuser_token_headers, json={"rating": 1})
+    assert response.status_code == 200
+    assert response.json()["rating"] == 1
+
+
+def test_delete_knowledge(
+    client: TestClient, superuser_token_headers: dict[str, str], db: Session
+) -> None:
+    knowledge = create_random_knowledge(db)
+    url = f"{settings.API_V1_STR}/knowledges/{knowledge.id}"
+    with query_budget("knowledges-delete_knowledge"):
+        response = client.delete(url, headers=superuser_token_headers)
+    assert response.status_code == 200
+    assert response.json()["message"] == "Knowledge deleted successfully"
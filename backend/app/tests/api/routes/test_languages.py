@@ -0,0 +1,143 @@
+import uuid
+
+from fastapi.testclient import TestClient
+from sqlmodel import Session, select
+
+from app.core.config import settings
+from app.models import Language
+from app.tests.utils.queries import query_budget
+from app.tests.utils.utils import random_lower_string
+
+
+def test_create_language_already_exists(
+    client: TestClient, superuser_token_headers: dict[str, str]
+) -> None:
+    data = {"language": random_lower_string(), "level": "B2"}
+    with query_budget("languages-create_language"):
+        r = client.post(
+            f"{settings.API_V1_STR}/languages/",
+            headers=superuser_token_headers,
+            json=data,
+        )
+    assert r.status_code == 200
+    with query_budget("languages-create_language"):
+        r = client.post(
+            f"{settings.API_V1_STR}/languages/",
+            headers=superuser_token_headers,
+            json=data,
+        )
+    assert r.status_code == 409
+    assert r.json()["detail"] == "Language already exists"
+
+
+def test_upsert_language(
+    client: TestClient, superuser_token_headers: dict[str, str], db: Session
+) -> None:
+    name = random_lower_string()
+    with query_budget("languages-upsert_language"):
+        r = client.put(
+            f"{settings.API_V1_STR}/languages/",
+            headers=superuser_token_headers,
+            json={"language": name, "level": "B2"},
+        )
+    assert r.status_code == 200
+    created = r.json()
+    with query_budget("languages-upsert_language"):
+        r = client.put(
+            f"{settings.API_V1_STR}/languages/",
+            headers=superuser_token_headers,
+            json={"language": name, "level": "C1"},
+        )
+    assert r.status_code == 200
+    updated = r.json()
+    assert updated["id"] == created["id"]
+    assert updated["level"] == "C1"
+    languages = db.exec(select(Language).where(Language.language == name)).all()
+    assert len(languages) == 1
+
+
+def test_update_language_already_exists(
+    client: TestClient, superuser_token_headers: dict[str, str]
+) -> None:
+    existing = random_lower_string()
+    for language in (existing, random_lower_string()):
+        r = client.post(
+            f"{settings.API_V1_STR}/languages/",
+            headers=superuser_token_headers,
+            json={"language": language, "level": "B2"},
+        )
+        assert r.status_code == 200
+    r = client.put(
+        f"{settings.API_V1_STR}/languages/{r.json()['id']}",
+        headers=superuser_token_headers,
+        json={"language": existing},
+    )
+    assert r.status_code == 409
+    assert r.json()["detail"] == "Language already exists"
+
+
+def create_random_language(db: Session) -> Language:
+    language = Language(language=random_lower_string(), level="B2")
+    db.add(language)
+    db.commit()
+    db.refresh(language)
+    return language
+
+
+def test_read_languages(
+    client: TestClient, superuser_token_headers: dict[str, str], db: Session
+) -> None:
+    create_random_language(db)
+    create_random_language(db)
+    with query_budget("languages-read_languages"):
+        response = client.get(
+            f"{settings.API_V1_STR}/languages/", headers=superuser_token_headers
+        )
+    assert response.status_code == 200
+    assert len(response.json()) >= 2
+
+
+def test_read_language(
+    client: TestClient, superuser_token_headers: dict[str, str], db: Session
+) -> None:
+    language = create_random_language(db)
+    url = f"{settings.API_V1_STR}/languages/{language.id}"
+    with query_budget("languages-read_language"):
+        response = client.get(url, headers=superuser_token_headers)
+    assert response.status_code == 200
+    assert response.json()["language"] == language.language
+
+
+def test_read_language_not_found(
+    client: TestClient, superuser_token_headers: dict[str, str]
+) -> None:
+    with query_budget("languages-read_language"):
+        response = client.get(
+            f"{settings.API_V1_STR}/languages/{uuid.uuid4()}",
+            headers=superuser_token_headers,
+        )
+    assert response.status_code == 404
+
+
+def test_update_language(
+    client: TestClient, superuser_token_headers: dict[str, str], db: Session
+) -> None:
+    language = create_random_language(db)
+    url = f"{settings.API_V1_STR}/languages/{language.id}"
+    with query_budget("languages-update_language"):
+        response = client.put(
+            url, headers=superuser_token_headers, json={"level": "C2"}
+        )
+    assert response.status_code == 200
+    assert response.json()["level"] == "C2"
+
+
+def test_delete_language(
+    client: TestClient, superuser_token_headers: dict[str, str], db: Session
+) -> None:
+    language = create_random_language(db)
+    url = f"{settings.API_V1_STR}/languages/{language.id}"
+    with query_budget("languages-delete_language"):
+        response = client.delete(url, headers=superuser_token_headers)
+    assert response.status_code == 200
+    assert response.json()["message"] == "Language deleted successfully"
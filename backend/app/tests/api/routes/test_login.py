@@ -6,6 +6,7 @@ from sqlmodel import Session, select
 from app.core.config import settings
 from app.core.security import verify_password
 from app.models import User
+from app.tests.utils.queries import query_budget
 from app.utils import generate_password_reset_token
 
 
@@ -14,7 +15,8 @@ def test_get_access_token(client: TestClient) -> None:
         "username": settings.FIRST_SUPERUSER,
         "password": settings.FIRST_SUPERUSER_PASSWORD,
     }
-    r = client.post(f"{settings.API_V1_STR}/login/access-token", data=login_data)
+    with query_budget("login-login_access_token"):
+        r = client.post(f"{settings.API_V1_STR}/login/access-token", data=login_data)
     tokens = r.json()
     assert r.status_code == 200
     assert "access_token" in tokens
@@ -26,17 +28,19 @@ def test_get_access_token_incorrect_password(client: TestClient) -> None:
         "username": settings.FIRST_SUPERUSER,
         "password": "incorrect",
     }
-    r = client.post(f"{settings.API_V1_STR}/login/access-token", data=login_data)
+    with query_budget("login-login_access_token"):
+        r = client.post(f"{settings.API_V1_STR}/login/access-token", data=login_data)
     assert r.status_code == 400
 
 
 def test_use_access_token(
     client: TestClient, superuser_token_headers: dict[str, str]
 ) -> None:
-    r = client.post(
-        f"{settings.API_V1_STR}/login/test-token",
-        headers=superuser_token_headers,
-    )
+    with query_budget("login-test_token"):
+        r = client.post(
+            f"{settings.API_V1_STR}/login/test-token",
+            headers=superuser_token_headers,
+        )
     result = r.json()
     assert r.status_code == 200
     assert "email" in result
@@ -48,6 +52,7 @@ def test_recovery_password(
     with (
         patch("app.core.config.settings.SMTP_HOST", "smtp.example.com"),
         patch("app.core.config.settings.SMTP_USER", "admin@example.com"),
+        query_budget("login-recover_password"),
     ):
         email = "test@example.com"
         r = client.post(
@@ -62,23 +67,40 @@ def test_recovery_password_user_not_exits(
     client: TestClient, normal_user_token_headers: dict[str, str]
 ) -> None:
     email = "jVgQr@example.com"
-    r = client.post(
-        f"{settings.API_V1_STR}/password-recovery/{email}",
-        headers=normal_user_token_headers,
-    )
+    with (
+        patch("app.core.config.settings.SMTP_HOST", "smtp.example.com"),
+        query_budget("login-recover_password"),
+    ):
+        r = client.post(
+            f"{settings.API_V1_STR}/password-recovery/{email}",
+            headers=normal_user_token_headers,
+        )
     assert r.status_code == 404
 
 
+def test_recovery_password_emails_disabled(
+    client: TestClient, normal_user_token_headers: dict[str, str]
+) -> None:
+    with patch("app.core.config.settings.SMTP_HOST", None):
+        r = client.post(
+            f"{settings.API_V1_STR}/password-recovery/{settings.EMAIL_TEST_USER}",
+            headers=normal_user_token_headers,
+        )
+    assert r.status_code == 400
+    assert r.json() == {"detail": "Emails are not enabled"}
+
+
 def test_reset_password(
     client: TestClient, superuser_token_headers: dict[str, str], db: Session
 ) -> None:
     token = generate_password_reset_token(email=settings.FIRST_SUPERUSER)
     data = {"new_password": "changethis", "token": token}
-    r = client.post(
-        f"{settings.API_V1_STR}/reset-password/",
-        headers=superuser_token_headers,
-        json=data,
-    )
+    with query_budget("login-reset_password"):
+        r = client.post(
+            f"{settings.API_V1_STR}/reset-password/",
+            headers=superuser_token_headers,
+            json=data,
+        )
     assert r.status_code == 200
     assert r.json() == {"message": "Password updated successfully"}
 
@@ -92,11 +114,12 @@ def test_reset_password_invalid_token(
     client: TestClient, superuser_token_headers: dict[str, str]
 ) -> None:
     data = {"new_password": "changethis", "token": "invalid"}
-    r = client.post(
-        f"{settings.API_V1_STR}/reset-password/",
-        headers=superuser_token_headers,
-        json=data,
-    )
+    with query_budget("login-reset_password"):
+        r = client.post(
+            f"{settings.API_V1_STR}/reset-password/",
+            headers=superuser_token_headers,
+            json=data,
+        )
     response = r.json()
 
     assert "detail" in response
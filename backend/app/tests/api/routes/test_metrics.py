@@ -0,0 +1,31 @@
+import pytest
+from fastapi.testclient import TestClient
+
+from app.core.config import settings
+
+
+def test_metrics(client: TestClient, superuser_token_headers: dict[str, str]) -> None:
+    client.get(f"{settings.API_V1_STR}/users/me", headers=superuser_token_headers)
+    response = client.get("/metrics")
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/plain")
+    lines = response.text.splitlines()
+    assert any(
+        line.startswith("http_request_duration_seconds_count{")
+        and 'route="users-read_user_me"' in line
+        for line in lines
+    )
+    assert any(
+        line.startswith("http_request_db_queries_sum{")
+        and 'route="users-read_user_me"' in line
+        and float(line.split()[-1]) >= 1
+        for line in lines
+    )
+    assert any(line.startswith("password_hash_duration_seconds") for line in lines)
+
+
+def test_metrics_token(client: TestClient, monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.setattr(settings, "METRICS_TOKEN", "secret")
+    assert client.get("/metrics").status_code == 403
+    response = client.get("/metrics", headers={"Authorization": "Bearer secret"})
+    assert response.status_code == 200
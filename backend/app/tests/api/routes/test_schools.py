@@ -0,0 +1,109 @@
+import uuid
+
+from fastapi.testclient import TestClient
+from sqlmodel import Session
+
+from app.core.config import settings
+from app.tests.utils.cv import create_random_cv, create_random_school
+from app.tests.utils.queries import query_budget
+
+
+def test_read_schools(
+    client: TestClient, superuser_token_headers: dict[str, str], db: Session
+) -> None:
+    cv = create_random_cv(db)
+    create_random_school(db, cv)
+    create_random_school(db, cv)
+    with query_budget("schools-read_schools"):
+        response = client.get(
+            f"{settings.API_V1_STR}/schools/", headers=superuser_token_headers
+        )
+    assert response.status_code == 200
+    assert len(response.json()) >= 2
+
+
+def test_read_schools_include(
+    client: TestClient, superuser_token_headers: dict[str, str], db: Session
+) -> None:
+    for _ in range(2):
+        cv = create_random_cv(db)
+        create_random_school(db, cv)
+        create_random_school(db, cv)
+    # One query for the CVs, whatever the number of schools
+    with query_budget("schools-read_schools", extra=1, max_repeats=1):
+        response = client.get(
+            f"{settings.API_V1_STR}/schools/",
+            headers=superuser_token_headers,
+            params={"include": "cv"},
+        )
+    assert response.status_code == 200
+    for school in response.json():
+        assert school["cv"]["id"] == school["cv_id"]
+
+
+def test_read_school(
+    client: TestClient, superuser_token_headers: dict[str, str], db: Session
+) -> None:
+    school = create_random_school(db, create_random_cv(db))
+    url = f"{settings.API_V1_STR}/schools/{school.id}"
+    with query_budget("schools-read_school"):
+        response = client.get(url, headers=superuser_token_headers)
+    assert response.status_code == 200
+    assert response.json()["school"] == school.school
+
+
+def test_read_school_not_found(
+    client: TestClient, superuser_token_headers: dict[str, str]
+) -> None:
+    with query_budget("schools-read_school"):
+        response = client.get(
+            f"{settings.API_V1_STR}/schools/{uuid.uuid4()}",
+            headers=superuser_token_headers,
+        )
+    assert response.status_code == 404
+
+
+def test_create_school(
+    client: TestClient, superuser_token_headers: dict[str, str], db: Session
+) -> None:
+    cv = create_random_cv(db)
+    data = {
+        "school": "University",
+        "subject": "Computer Science",
+        "degree": "BSc",
+        "location": "Munich",
+        "start": "2015-09-01T00:00:00",
+        "cv_id": str(cv.id),
+    }
+    with query_budget("schools-create_school"):
+        response = client.post(
+            f"{settings.API_V1_STR}/schools/",
+            headers=superuser_token_headers,
+            json=data,
+        )
+    assert response.status_code == 200
+    assert response.json()["cv_id"] == data["cv_id"]
+
+
+def test_update_school(
+    client: TestClient, superuser_token_headers: dict[str, str], db: Session
+) -> None:
+    school = create_random_school(db, create_random_cv(db))
+    url = f"{settings.API_V1_STR}/schools/{school.id}"
+    with query_budget("schools-update_school"):
+        response = client.put(
+            url, headers=superuser_token_headers, json={"degree": "MSc"}
+        )
+    assert response.status_code == 200
+    assert response.json()["degree"] == "MSc"
+
+
+def test_delete_school(
+    client: TestClient, superuser_token_headers: dict[str, str], db: Session
+) -> None:
+    school = create_random_school(db, create_random_cv(db))
+    url = f"{settings.API_V1_STR}/schools/{school.id}"
+    with query_budget("schools-delete_school"):
+        response = client.delete(url, headers=superuser_token_headers)
+    assert response.status_code == 200
+    assert response.json()["message"] == "School deleted successfully"
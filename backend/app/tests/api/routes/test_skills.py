@@ -0,0 +1,98 @@
+import uuid
+
+from fastapi.testclient import TestClient
+from sqlmodel import Session
+
+from app.core.config import settings
+from app.models import Skill
+from app.tests.utils.cv import create_random_cv
+from app.tests.utils.queries import query_budget
+
+
+def create_random_skill(db: Session) -> Skill:
+    return create_random_cv(db, jobs=1, tasks=1, skills=1).jobs[0].tasks[0].skills[0]
+
+
+def test_read_skills(
+    client: TestClient, superuser_token_headers: dict[str, str], db: Session
+) -> None:
+    create_random_cv(db, jobs=1, tasks=1, skills=2)
+    with query_budget("skills-read_skills"):
+        response = client.get(
+            f"{settings.API_V1_STR}/skills/", headers=superuser_token_headers
+        )
+    assert response.status_code == 200
+    assert len(response.json()) >= 2
+
+
+def test_read_skills_include(
+    client: TestClient, superuser_token_headers: dict[str, str], db: Session
+) -> None:
+    create_random_cv(db, jobs=2, tasks=2, skills=2)
+    # One query for the tasks, whatever the number of skills
+    with query_budget("skills-read_skills", extra=1, max_repeats=1):
+        response = client.get(
+            f"{settings.API_V1_STR}/skills/",
+            headers=superuser_token_headers,
+            params={"include": "task"},
+        )
+    assert response.status_code == 200
+    for skill in response.json():
+        assert skill["task"]["id"] == skill["task_id"]
+
+
+def test_read_skill(
+    client: TestClient, superuser_token_headers: dict[str, str], db: Session
+) -> None:
+    skill = create_random_skill(db)
+    url = f"{settings.API_V1_STR}/skills/{skill.id}"
+    with query_budget("skills-read_skill"):
+        response = client.get(url, headers=superuser_token_headers)
+    assert response.status_code == 200
+    assert response.json()["name"] == skill.name
+
+
+def test_read_skill_not_found(
+    client: TestClient, superuser_token_headers: dict[str, str]
+) -> None:
+    with query_budget("skills-read_skill"):
+        response = client.get(
+            f"{settings.API_V1_STR}/skills/{uuid.uuid4()}",
+            headers=superuser_token_headers,
+        )
+    assert response.status_code == 404
+
+
+def test_create_skill(
+    client: TestClient, superuser_token_headers: dict[str, str], db: Session
+) -> None:
+    task = create_random_cv(db, jobs=1, tasks=1).jobs[0].tasks[0]
+    data = {"name": "Python", "rating": 4, "task_id": str(task.id)}
+    with query_budget("skills-create_skill"):
+        response = client.post(
+            f"{settings.API_V1_STR}/skills/", headers=superuser_token_headers, json=data
+        )
+    assert response.status_code == 200
+    assert response.json()["task_id"] == data["task_id"]
+
+
+def test_update_skill(
+    client: TestClient, superuser_token_headers: dict[str, str], db: Session
+) -> None:
+    skill = create_random_skill(db)
+    url = f"{settings.API_V1_STR}/skills/{skill.id}"
+    with query_budget("skills-update_skill"):
+        response = client.put(url, headers=superuser_token_headers, json={"rating": 5})
+    assert response.status_code == 200
+    assert response.json()["rating"] == 5
+
+
+def test_delete_skill(
+    client: TestClient, superuser_token_headers: dict[str, str], db: Session
+) -> None:
+    skill = create_random_skill(db)
+    url = f"{settings.API_V1_STR}/skills/{skill.id}"
+    with query_budget("skills-delete_skill"):
+        response = client.delete(url, headers=superuser_token_headers)
+    assert response.status_code == 200
+    assert response.json()["message"] == "Skill deleted successfully"
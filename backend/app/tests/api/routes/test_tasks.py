@@ -0,0 +1,95 @@
+import uuid
+
+from fastapi.testclient import TestClient
+from sqlmodel import Session
+
+from app.core.config import settings
+from app.tests.utils.cv import create_random_cv
+from app.tests.utils.queries import query_budget
+
+
+def test_read_tasks(
+    client: TestClient, superuser_token_headers: dict[str, str], db: Session
+) -> None:
+    create_random_cv(db, jobs=1, tasks=2)
+    with query_budget("tasks-read_tasks"):
+        response = client.get(
+            f"{settings.API_V1_STR}/tasks/", headers=superuser_token_headers
+        )
+    assert response.status_code == 200
+    assert len(response.json()) >= 2
+
+
+def test_read_tasks_include(
+    client: TestClient, superuser_token_headers: dict[str, str], db: Session
+) -> None:
+    create_random_cv(db, jobs=2, tasks=3, skills=2)
+    # One query per relationship, whatever the number of tasks
+    with query_budget("tasks-read_tasks", extra=2, max_repeats=1):
+        response = client.get(
+            f"{settings.API_V1_STR}/tasks/",
+            headers=superuser_token_headers,
+            params={"include": "job,skills"},
+        )
+    assert response.status_code == 200
+    for task in response.json():
+        assert task["job"]["id"] == task["job_id"]
+
+
+def test_read_task(
+    client: TestClient, superuser_token_headers: dict[str, str], db: Session
+) -> None:
+    task = create_random_cv(db, jobs=1, tasks=1).jobs[0].tasks[0]
+    url = f"{settings.API_V1_STR}/tasks/{task.id}"
+    with query_budget("tasks-read_task"):
+        response = client.get(url, headers=superuser_token_headers)
+    assert response.status_code == 200
+    assert response.json()["name"] == task.name
+
+
+def test_read_task_not_found(
+    client: TestClient, superuser_token_headers: dict[str, str]
+) -> None:
+    with query_budget("tasks-read_task"):
+        response = client.get(
+            f"{settings.API_V1_STR}/tasks/{uuid.uuid4()}",
+            headers=superuser_token_headers,
+        )
+    assert response.status_code == 404
+
+
+def test_create_task(
+    client: TestClient, superuser_token_headers: dict[str, str], db: Session
+) -> None:
+    job = create_random_cv(db, jobs=1).jobs[0]
+    data = {"name": "Code review", "duration": 2, "job_id": str(job.id)}
+    with query_budget("tasks-create_task"):
+        response = client.post(
+            f"{settings.API_V1_STR}/tasks/", headers=superuser_token_headers, json=data
+        )
+    assert response.status_code == 200
+    assert response.json()["job_id"] == data["job_id"]
+
+
+def test_update_task(
+    client: TestClient, superuser_token_headers: dict[str, str], db: Session
+) -> None:
+    task = create_random_cv(db, jobs=1, tasks=1).jobs[0].tasks[0]
+    url = f"{settings.API_V1_STR}/tasks/{task.id}"
+    with query_budget("tasks-update_task"):
+        response = client.put(
+            url, headers=superuser_token_headers, json={"duration": 5}
+        )
+    assert response.status_code == 200
+    assert response.json()["duration"] == 5
+
+
+def test_delete_task(
+    client: TestClient, superuser_token_headers: dict[str, str], db: Session
+) -> None:
+    task = create_random_cv(db, jobs=1, tasks=1).jobs[0].tasks[0]
+    url = f"{settings.API_V1_STR}/tasks/{task.id}"
+    with query_budget("tasks-delete_task"):
+        response = client.delete(url, headers=superuser_token_headers)
+    assert response.status_code == 200
+    assert response.json()["message"] == "Task deleted successfully"
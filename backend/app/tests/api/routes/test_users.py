@@ -1,20 +1,27 @@
+import threading
 import uuid
+from concurrent.futures import ThreadPoolExecutor
 from unittest.mock import patch
 
 from fastapi.testclient import TestClient
-from sqlmodel import Session, select
+from sqlmodel import Session, col, delete, select
 
 from app import crud
 from app.core.config import settings
+from app.core.db import engine
 from app.core.security import verify_password
 from app.models import User, UserCreate
+from app.tests.utils.queries import query_budget
 from app.tests.utils.utils import random_email, random_lower_string
 
 
 def test_get_users_superuser_me(
     client: TestClient, superuser_token_headers: dict[str, str]
 ) -> None:
-    r = client.get(f"{settings.API_V1_STR}/users/me", headers=superuser_token_headers)
+    with query_budget("users-read_user_me"):
+        r = client.get(
+            f"{settings.API_V1_STR}/users/me", headers=superuser_token_headers
+        )
     current_user = r.json()
     assert current_user
     assert current_user["is_active"] is True
@@ -25,7 +32,10 @@ def test_get_users_superuser_me(
 def test_get_users_normal_user_me(
     client: TestClient, normal_user_token_headers: dict[str, str]
 ) -> None:
-    r = client.get(f"{settings.API_V1_STR}/users/me", headers=normal_user_token_headers)
+    with query_budget("users-read_user_me"):
+        r = client.get(
+            f"{settings.API_V1_STR}/users/me", headers=normal_user_token_headers
+        )
     current_user = r.json()
     assert current_user
     assert current_user["is_active"] is True
@@ -33,6 +43,19 @@ def test_get_users_normal_user_me(
     assert current_user["email"] == settings.EMAIL_TEST_USER
 
 
+def test_server_timing_for_superusers_only(
+    client: TestClient,
+    superuser_token_headers: dict[str, str],
+    normal_user_token_headers: dict[str, str],
+) -> None:
+    r = client.get(f"{settings.API_V1_STR}/users/me", headers=superuser_token_headers)
+    phases = [entry.split(";")[0] for entry in r.headers["server-timing"].split(", ")]
+    assert phases == ["auth", "db", "handler", "serialize"]
+    assert ";count=1;" in r.headers["server-timing"]
+    r = client.get(f"{settings.API_V1_STR}/users/me", headers=normal_user_token_headers)
+    assert "server-timing" not in r.headers
+
+
 def test_create_user_new_email(
     client: TestClient, superuser_token_headers: dict[str, str], db: Session
 ) -> None:
@@ -44,11 +67,12 @@ def test_create_user_new_email(
         username = random_email()
         password = random_lower_string()
         data = {"email": username, "password": password}
-        r = client.post(
-            f"{settings.API_V1_STR}/users/",
-            headers=superuser_token_headers,
-            json=data,
-        )
+        with query_budget("users-create_user"):
+            r = client.post(
+                f"{settings.API_V1_STR}/users/",
+                headers=superuser_token_headers,
+                json=data,
+            )
         assert 200 <= r.status_code < 300
         created_user = r.json()
         user = crud.get_user_by_email(session=db, email=username)
@@ -64,10 +88,11 @@ def test_get_existing_user(
     user_in = UserCreate(email=username, password=password)
     user = crud.create_user(session=db, user_create=user_in)
     user_id = user.id
-    r = client.get(
-        f"{settings.API_V1_STR}/users/{user_id}",
-        headers=superuser_token_headers,
-    )
+    with query_budget("users-read_user_by_id"):
+        r = client.get(
+            f"{settings.API_V1_STR}/users/{user_id}",
+            headers=superuser_token_headers,
+        )
     assert 200 <= r.status_code < 300
     api_user = r.json()
     existing_user = crud.get_user_by_email(session=db, email=username)
@@ -91,10 +116,11 @@ def test_get_existing_user_current_user(client: TestClient, db: Session) -> None
     a_token = tokens["access_token"]
     headers = {"Authorization": f"Bearer {a_token}"}
 
-    r = client.get(
-        f"{settings.API_V1_STR}/users/{user_id}",
-        headers=headers,
-    )
+    with query_budget("users-read_user_by_id"):
+        r = client.get(
+            f"{settings.API_V1_STR}/users/{user_id}",
+            headers=headers,
+        )
     assert 200 <= r.status_code < 300
     api_user = r.json()
     existing_user = crud.get_user_by_email(session=db, email=username)
@@ -105,10 +131,11 @@ def test_get_existing_user_current_user(client: TestClient, db: Session) -> None
 def test_get_existing_user_permissions_error(
     client: TestClient, normal_user_token_headers: dict[str, str]
 ) -> None:
-    r = client.get(
-        f"{settings.API_V1_STR}/users/{uuid.uuid4()}",
-        headers=normal_user_token_headers,
-    )
+    with query_budget("users-read_user_by_id"):
+        r = client.get(
+            f"{settings.API_V1_STR}/users/{uuid.uuid4()}",
+            headers=normal_user_token_headers,
+        )
     assert r.status_code == 403
     assert r.json() == {"detail": "The user doesn't have enough privileges"}
 
@@ -122,11 +149,12 @@ def test_create_user_existing_username(
     user_in = UserCreate(email=username, password=password)
     crud.create_user(session=db, user_create=user_in)
     data = {"email": username, "password": password}
-    r = client.post(
-        f"{settings.API_V1_STR}/users/",
-        headers=superuser_token_headers,
-        json=data,
-    )
+    with query_budget("users-create_user"):
+        r = client.post(
+            f"{settings.API_V1_STR}/users/",
+            headers=superuser_token_headers,
+            json=data,
+        )
     created_user = r.json()
     assert r.status_code == 400
     assert "_id" not in created_user
@@ -138,11 +166,12 @@ def test_create_user_by_normal_user(
     username = random_email()
     password = random_lower_string()
     data = {"email": username, "password": password}
-    r = client.post(
-        f"{settings.API_V1_STR}/users/",
-        headers=normal_user_token_headers,
-        json=data,
-    )
+    with query_budget("users-create_user"):
+        r = client.post(
+            f"{settings.API_V1_STR}/users/",
+            headers=normal_user_token_headers,
+            json=data,
+        )
     assert r.status_code == 403
 
 
@@ -159,13 +188,15 @@ def test_retrieve_users(
     user_in2 = UserCreate(email=username2, password=password2)
     crud.create_user(session=db, user_create=user_in2)
 
-    r = client.get(f"{settings.API_V1_STR}/users/", headers=superuser_token_headers)
+    with query_budget("users-read_users"):
+        r = client.get(f"{settings.API_V1_STR}/users/", headers=superuser_token_headers)
     all_users = r.json()
 
     assert len(all_users["data"]) > 1
     assert "count" in all_users
     for item in all_users["data"]:
         assert "email" in item
+        assert "hashed_password" not in item
 
 
 def test_update_user_me(
@@ -174,11 +205,12 @@ def test_update_user_me(
     full_name = "Updated Name"
     email = random_email()
     data = {"full_name": full_name, "email": email}
-    r = client.patch(
-        f"{settings.API_V1_STR}/users/me",
-        headers=normal_user_token_headers,
-        json=data,
-    )
+    with query_budget("users-update_user_me"):
+        r = client.patch(
+            f"{settings.API_V1_STR}/users/me",
+            headers=normal_user_token_headers,
+            json=data,
+        )
     assert r.status_code == 200
     updated_user = r.json()
     assert updated_user["email"] == email
@@ -199,11 +231,12 @@ def test_update_password_me(
         "current_password": settings.FIRST_SUPERUSER_PASSWORD,
         "new_password": new_password,
     }
-    r = client.patch(
-        f"{settings.API_V1_STR}/users/me/password",
-        headers=superuser_token_headers,
-        json=data,
-    )
+    with query_budget("users-update_password_me"):
+        r = client.patch(
+            f"{settings.API_V1_STR}/users/me/password",
+            headers=superuser_token_headers,
+            json=data,
+        )
     assert r.status_code == 200
     updated_user = r.json()
     assert updated_user["message"] == "Password updated successfully"
@@ -219,11 +252,12 @@ def test_update_password_me(
         "current_password": new_password,
         "new_password": settings.FIRST_SUPERUSER_PASSWORD,
     }
-    r = client.patch(
-        f"{settings.API_V1_STR}/users/me/password",
-        headers=superuser_token_headers,
-        json=old_data,
-    )
+    with query_budget("users-update_password_me"):
+        r = client.patch(
+            f"{settings.API_V1_STR}/users/me/password",
+            headers=superuser_token_headers,
+            json=old_data,
+        )
     db.refresh(user_db)
 
     assert r.status_code == 200
@@ -235,11 +269,12 @@ def test_update_password_me_incorrect_password(
 ) -> None:
     new_password = random_lower_string()
     data = {"current_password": new_password, "new_password": new_password}
-    r = client.patch(
-        f"{settings.API_V1_STR}/users/me/password",
-        headers=superuser_token_headers,
-        json=data,
-    )
+    with query_budget("users-update_password_me"):
+        r = client.patch(
+            f"{settings.API_V1_STR}/users/me/password",
+            headers=superuser_token_headers,
+            json=data,
+        )
     assert r.status_code == 400
     updated_user = r.json()
     assert updated_user["detail"] == "Incorrect password"
@@ -254,11 +289,12 @@ def test_update_user_me_email_exists(
     user = crud.create_user(session=db, user_create=user_in)
 
     data = {"email": user.email}
-    r = client.patch(
-        f"{settings.API_V1_STR}/users/me",
-        headers=normal_user_token_headers,
-        json=data,
-    )
+    with query_budget("users-update_user_me"):
+        r = client.patch(
+            f"{settings.API_V1_STR}/users/me",
+            headers=normal_user_token_headers,
+            json=data,
+        )
     assert r.status_code == 409
     assert r.json()["detail"] == "User with this email already exists"
 
@@ -270,11 +306,12 @@ def test_update_password_me_same_password_error(
         "current_password": settings.FIRST_SUPERUSER_PASSWORD,
         "new_password": settings.FIRST_SUPERUSER_PASSWORD,
     }
-    r = client.patch(
-        f"{settings.API_V1_STR}/users/me/password",
-        headers=superuser_token_headers,
-        json=data,
-    )
+    with query_budget("users-update_password_me"):
+        r = client.patch(
+            f"{settings.API_V1_STR}/users/me/password",
+            headers=superuser_token_headers,
+            json=data,
+        )
     assert r.status_code == 400
     updated_user = r.json()
     assert (
@@ -287,10 +324,11 @@ def test_register_user(client: TestClient, db: Session) -> None:
     password = random_lower_string()
     full_name = random_lower_string()
     data = {"email": username, "password": password, "full_name": full_name}
-    r = client.post(
-        f"{settings.API_V1_STR}/users/signup",
-        json=data,
-    )
+    with query_budget("users-register_user"):
+        r = client.post(
+            f"{settings.API_V1_STR}/users/signup",
+            json=data,
+        )
     assert r.status_code == 200
     created_user = r.json()
     assert created_user["email"] == username
@@ -312,14 +350,46 @@ def test_register_user_already_exists_error(client: TestClient) -> None:
         "password": password,
         "full_name": full_name,
     }
-    r = client.post(
-        f"{settings.API_V1_STR}/users/signup",
-        json=data,
-    )
+    with query_budget("users-register_user"):
+        r = client.post(
+            f"{settings.API_V1_STR}/users/signup",
+            json=data,
+        )
     assert r.status_code == 400
     assert r.json()["detail"] == "The user with this email already exists in the system"
 
 
+def test_register_user_concurrent_same_email() -> None:
+    # On connections of their own rather than the tests' one, where the
+    # requests take turns, so that the INSERTs really race each other
+    user_create = UserCreate(email=random_email(), password=random_lower_string())
+    threads = 10
+    barrier = threading.Barrier(threads)
+
+    def signup(_: int) -> bool:
+        with Session(engine) as session:
+            barrier.wait()
+            user = crud.try_create_user(session=session, user_create=user_create)
+            session.commit()
+            return user is not None
+
+    try:
+        # Hashing holds the GIL, it would space out the INSERTs
+        with (
+            patch("app.crud.get_password_hash", return_value="hashed"),
+            ThreadPoolExecutor(max_workers=threads) as executor,
+        ):
+            created = list(executor.map(signup, range(threads)))
+        assert created.count(True) == 1
+        with Session(engine) as session:
+            statement = select(User).where(User.email == user_create.email)
+            assert len(session.exec(statement).all()) == 1
+    finally:
+        with Session(engine) as session:
+            session.execute(delete(User).where(col(User.email) == user_create.email))
+            session.commit()
+
+
 def test_update_user(
     client: TestClient, superuser_token_headers: dict[str, str], db: Session
 ) -> None:
@@ -329,11 +399,12 @@ def test_update_user(
     user = crud.create_user(session=db, user_create=user_in)
 
     data = {"full_name": "Updated_full_name"}
-    r = client.patch(
-        f"{settings.API_V1_STR}/users/{user.id}",
-        headers=superuser_token_headers,
-        json=data,
-    )
+    with query_budget("users-update_user"):
+        r = client.patch(
+            f"{settings.API_V1_STR}/users/{user.id}",
+            headers=superuser_token_headers,
+            json=data,
+        )
     assert r.status_code == 200
     updated_user = r.json()
 
@@ -350,11 +421,12 @@ def test_update_user_not_exists(
     client: TestClient, superuser_token_headers: dict[str, str]
 ) -> None:
     data = {"full_name": "Updated_full_name"}
-    r = client.patch(
-        f"{settings.API_V1_STR}/users/{uuid.uuid4()}",
-        headers=superuser_token_headers,
-        json=data,
-    )
+    with query_budget("users-update_user"):
+        r = client.patch(
+            f"{settings.API_V1_STR}/users/{uuid.uuid4()}",
+            headers=superuser_token_headers,
+            json=data,
+        )
     assert r.status_code == 404
     assert r.json()["detail"] == "The user with this id does not exist in the system"
 
@@ -373,11 +445,12 @@ def test_update_user_email_exists(
     user2 = crud.create_user(session=db, user_create=user_in2)
 
     data = {"email": user2.email}
-    r = client.patch(
-        f"{settings.API_V1_STR}/users/{user.id}",
-        headers=superuser_token_headers,
-        json=data,
-    )
+    with query_budget("users-update_user"):
+        r = client.patch(
+            f"{settings.API_V1_STR}/users/{user.id}",
+            headers=superuser_token_headers,
+            json=data,
+        )
     assert r.status_code == 409
     assert r.json()["detail"] == "User with this email already exists"
 
@@ -398,10 +471,11 @@ def test_delete_user_me(client: TestClient, db: Session) -> None:
     a_token = tokens["access_token"]
     headers = {"Authorization": f"Bearer {a_token}"}
 
-    r = client.delete(
-        f"{settings.API_V1_STR}/users/me",
-        headers=headers,
-    )
+    with query_budget("users-delete_user_me"):
+        r = client.delete(
+            f"{settings.API_V1_STR}/users/me",
+            headers=headers,
+        )
     assert r.status_code == 200
     deleted_user = r.json()
     assert deleted_user["message"] == "User deleted successfully"
@@ -416,10 +490,11 @@ def test_delete_user_me(client: TestClient, db: Session) -> None:
 def test_delete_user_me_as_superuser(
     client: TestClient, superuser_token_headers: dict[str, str]
 ) -> None:
-    r = client.delete(
-        f"{settings.API_V1_STR}/users/me",
-        headers=superuser_token_headers,
-    )
+    with query_budget("users-delete_user_me"):
+        r = client.delete(
+            f"{settings.API_V1_STR}/users/me",
+            headers=superuser_token_headers,
+        )
     assert r.status_code == 403
     response = r.json()
     assert response["detail"] == "Super users are not allowed to delete themselves"
@@ -433,10 +508,11 @@ def test_delete_user_super_user(
     user_in = UserCreate(email=username, password=password)
     user = crud.create_user(session=db, user_create=user_in)
     user_id = user.id
-    r = client.delete(
-        f"{settings.API_V1_STR}/users/{user_id}",
-        headers=superuser_token_headers,
-    )
+    with query_budget("users-delete_user"):
+        r = client.delete(
+            f"{settings.API_V1_STR}/users/{user_id}",
+            headers=superuser_token_headers,
+        )
     assert r.status_code == 200
     deleted_user = r.json()
     assert deleted_user["message"] == "User deleted successfully"
@@ -447,10 +523,11 @@ def test_delete_user_super_user(
 def test_delete_user_not_found(
     client: TestClient, superuser_token_headers: dict[str, str]
 ) -> None:
-    r = client.delete(
-        f"{settings.API_V1_STR}/users/{uuid.uuid4()}",
-        headers=superuser_token_headers,
-    )
+    with query_budget("users-delete_user"):
+        r = client.delete(
+            f"{settings.API_V1_STR}/users/{uuid.uuid4()}",
+            headers=superuser_token_headers,
+        )
     assert r.status_code == 404
     assert r.json()["detail"] == "User not found"
 
@@ -462,10 +539,11 @@ def test_delete_user_current_super_user_error(
     assert super_user
     user_id = super_user.id
 
-    r = client.delete(
-        f"{settings.API_V1_STR}/users/{user_id}",
-        headers=superuser_token_headers,
-    )
+    with query_budget("users-delete_user"):
+        r = client.delete(
+            f"{settings.API_V1_STR}/users/{user_id}",
+            headers=superuser_token_headers,
+        )
     assert r.status_code == 403
     assert r.json()["detail"] == "Super users are not allowed to delete themselves"
 
@@ -478,9 +556,10 @@ def test_delete_user_without_privileges(
     user_in = UserCreate(email=username, password=password)
     user = crud.create_user(session=db, user_create=user_in)
 
-    r = client.delete(
-        f"{settings.API_V1_STR}/users/{user.id}",
-        headers=normal_user_token_headers,
-    )
+    with query_budget("users-delete_user"):
+        r = client.delete(
+            f"{settings.API_V1_STR}/users/{user.id}",
+            headers=normal_user_token_headers,
+        )
     assert r.status_code == 403
     assert r.json()["detail"] == "The user doesn't have enough privileges"
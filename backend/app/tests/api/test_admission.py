@@ -0,0 +1,87 @@
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from app.core.admission import AdmissionMiddleware, route_class
+
+
+def slow_app(queue_seconds: float) -> FastAPI:
+    app = FastAPI()
+    app.add_middleware(
+        AdmissionMiddleware,
+        prefix="/api",
+        limits={"read": 1},
+        queue_seconds=queue_seconds,
+        retry_after_seconds=2,
+    )
+
+    @app.get("/api/slow")
+    def slow() -> str:
+        time.sleep(0.3)
+        return "done"
+
+    @app.post("/api/slow")
+    def slow_write() -> str:
+        time.sleep(0.3)
+        return "done"
+
+    return app
+
+
+def concurrently(client: TestClient, method: str, times: int) -> list[int]:
+    with ThreadPoolExecutor(times) as executor:
+        responses = executor.map(
+            lambda _: client.request(method, "/api/slow"), range(times)
+        )
+        return sorted(response.status_code for response in responses)
+
+
+@pytest.mark.parametrize(
+    "method, path, expected",
+    [
+        ("GET", "/cvs/", "read"),
+        ("HEAD", "/items/", "read"),
+        ("PUT", "/cvs/1", "write"),
+        ("POST", "/login/access-token", "auth"),
+        ("POST", "/reset-password/", "auth"),
+        ("POST", "/users/signup", "auth"),
+        ("POST", "/users/", "auth"),
+        ("PATCH", "/users/me/password", "auth"),
+        ("PATCH", "/users/me", "write"),
+        ("GET", "/users/", "read"),
+    ],
+)
+def test_route_class(method: str, path: str, expected: str) -> None:
+    assert route_class(method, path) == expected
+
+
+def test_shed_after_queue_seconds() -> None:
+    with TestClient(slow_app(queue_seconds=0.05)) as client:
+        assert concurrently(client, "GET", 2) == [200, 503]
+        r = client.get("/api/slow")
+        assert r.status_code == 200
+
+
+def test_retry_after() -> None:
+    with TestClient(slow_app(queue_seconds=0.05)) as client:
+        with ThreadPoolExecutor(1) as executor:
+            first = executor.submit(client.get, "/api/slow")
+            time.sleep(0.1)
+            r = client.get("/api/slow")
+            assert first.result().status_code == 200
+    assert r.status_code == 503
+    assert r.headers["retry-after"] == "2"
+    assert r.json() == {"detail": "The server is overloaded, try again later"}
+
+
+def test_queued_within_queue_seconds() -> None:
+    with TestClient(slow_app(queue_seconds=5)) as client:
+        assert concurrently(client, "GET", 2) == [200, 200]
+
+
+def test_unlimited_class() -> None:
+    with TestClient(slow_app(queue_seconds=0.05)) as client:
+        assert concurrently(client, "POST", 2) == [200, 200]
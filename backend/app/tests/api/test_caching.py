@@ -0,0 +1,160 @@
+import uuid
+
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy.exc import OperationalError
+from sqlmodel import Session
+
+from app.api import caching
+from app.api.caching import Entry
+from app.core import cache
+from app.core.cache import MemoryBackend
+from app.core.config import settings
+from app.tests.utils.cv import create_random_cv
+from app.tests.utils.queries import query_budget
+
+
+@pytest.fixture()
+def memory_cache(monkeypatch: pytest.MonkeyPatch) -> None:
+    # RESPONSE_CACHE is off by default
+    monkeypatch.setattr(
+        cache, "backend", MemoryBackend(settings.RESPONSE_CACHE_MEMORY_BYTES)
+    )
+
+
+def test_memory_backend_evicts_least_recently_used() -> None:
+    backend = MemoryBackend(max_bytes=25)
+    backend.set_many({"a": b"1" * 9, "b": b"2" * 9})
+    assert backend.get_many(["a"]) == [b"1" * 9]
+    backend.set_many({"c": b"3" * 9})
+    assert backend.get_many(["a", "b", "c"]) == [b"1" * 9, None, b"3" * 9]
+    assert backend.size == 20
+
+
+def test_entry_round_trip() -> None:
+    entry = Entry(uuid.uuid4(), "version", 1.5, b'{"name": "CV\\n"}')
+    assert Entry.load(entry.dump()) == entry
+
+
+@pytest.mark.usefixtures("memory_cache")
+def test_read_cv_cached(
+    client: TestClient, superuser_token_headers: dict[str, str], db: Session
+) -> None:
+    cv = create_random_cv(db)
+    url = f"{settings.API_V1_STR}/cvs/{cv.id}"
+    r = client.get(url, headers=superuser_token_headers)
+    assert r.status_code == 200
+    assert r.headers["x-cache"] == "MISS"
+    # Only the current user is read
+    with query_budget("cvs-read_cv") as statements:
+        cached = client.get(url, headers=superuser_token_headers)
+    assert len(statements) == 1
+    assert cached.status_code == 200
+    assert cached.headers["x-cache"] == "HIT"
+    assert cached.json() == r.json()
+    other = client.get(url, headers=superuser_token_headers, params={"include": "jobs"})
+    assert other.status_code == 200
+    assert other.headers["x-cache"] == "MISS"
+
+
+@pytest.mark.usefixtures("memory_cache")
+def test_write_invalidates_document(
+    client: TestClient, superuser_token_headers: dict[str, str], db: Session
+) -> None:
+    cv = create_random_cv(db, jobs=1, tasks=1, skills=1)
+    job = cv.jobs[0]
+    cv_url = f"{settings.API_V1_STR}/cvs/{cv.id}"
+    job_url = f"{settings.API_V1_STR}/jobs/{job.id}"
+    cv_params = {"include": "jobs.tasks.skills"}
+    job_params = {"include": "tasks.skills"}
+    for url, params in ((cv_url, cv_params), (job_url, job_params)):
+        r = client.get(url, headers=superuser_token_headers, params=params)
+        assert r.status_code == 200
+        r = client.get(url, headers=superuser_token_headers, params=params)
+        assert r.headers["x-cache"] == "HIT"
+    r = client.put(
+        job_url, headers=superuser_token_headers, json={"position": "Manager"}
+    )
+    assert r.status_code == 200
+    r = client.get(cv_url, headers=superuser_token_headers, params=cv_params)
+    assert r.status_code == 200
+    assert r.headers["x-cache"] == "MISS"
+    assert r.json()["jobs"][0]["position"] == "Manager"
+    r = client.get(job_url, headers=superuser_token_headers, params=job_params)
+    assert r.status_code == 200
+    assert r.headers["x-cache"] == "MISS"
+
+    # Also when written outside of the routes
+    skill = job.tasks[0].skills[0]
+    skill.name = "Python"
+    db.add(skill)
+    db.commit()
+    r = client.get(cv_url, headers=superuser_token_headers, params=cv_params)
+    assert r.status_code == 200
+    assert r.headers["x-cache"] == "MISS"
+    assert r.json()["jobs"][0]["tasks"][0]["skills"][0]["name"] == "Python"
+
+
+@pytest.mark.usefixtures("memory_cache")
+def test_deleted_not_cached(
+    client: TestClient, superuser_token_headers: dict[str, str], db: Session
+) -> None:
+    cv = create_random_cv(db)
+    url = f"{settings.API_V1_STR}/cvs/{cv.id}"
+    r = client.get(url, headers=superuser_token_headers)
+    assert r.status_code == 200
+    r = client.delete(url, headers=superuser_token_headers)
+    assert r.status_code == 200
+    r = client.get(url, headers=superuser_token_headers)
+    assert r.status_code == 404
+
+
+@pytest.mark.usefixtures("memory_cache")
+def test_stale_if_error(
+    client: TestClient,
+    superuser_token_headers: dict[str, str],
+    db: Session,
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    cv = create_random_cv(db)
+    other = create_random_cv(db)
+    url = f"{settings.API_V1_STR}/cvs/{cv.id}"
+    r = client.get(url, headers=superuser_token_headers)
+    assert r.status_code == 200
+    assert r.headers["x-cache"] == "MISS"
+
+    def fail(*_args: object) -> None:
+        raise OperationalError("SELECT", {}, Exception("canceling statement"))
+
+    # Past its fresh and stale windows, and the database fails
+    monkeypatch.setattr(settings, "RESPONSE_CACHE_TTL_SECONDS", 0)
+    monkeypatch.setattr(settings, "RESPONSE_CACHE_STALE_SECONDS", 0)
+    monkeypatch.setattr(caching, "document_of", fail)
+    r = client.get(url, headers=superuser_token_headers)
+    assert r.status_code == 200
+    assert r.headers["x-cache"] == "STALE"
+    assert r.json()["id"] == str(cv.id)
+
+    # Without a cached response the error is raised
+    with pytest.raises(OperationalError):
+        client.get(
+            f"{settings.API_V1_STR}/cvs/{other.id}", headers=superuser_token_headers
+        )
+
+    monkeypatch.setattr(settings, "RESPONSE_CACHE_STALE_IF_ERROR_SECONDS", 0)
+    with pytest.raises(OperationalError):
+        client.get(url, headers=superuser_token_headers)
+
+
+def test_cache_off(
+    client: TestClient,
+    superuser_token_headers: dict[str, str],
+    db: Session,
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    monkeypatch.setattr(cache, "backend", None)
+    cv = create_random_cv(db)
+    url = f"{settings.API_V1_STR}/cvs/{cv.id}"
+    r = client.get(url, headers=superuser_token_headers)
+    assert r.status_code == 200
+    assert "x-cache" not in r.headers
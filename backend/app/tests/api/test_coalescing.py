@@ -0,0 +1,54 @@
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from app.api.coalescing import SingleFlight
+
+
+def test_concurrent_calls_share_one() -> None:
+    flights = SingleFlight()
+    calls = 0
+    started = threading.Event()
+
+    def fetch() -> str:
+        nonlocal calls
+        calls += 1
+        started.set()
+        time.sleep(0.2)
+        return "result"
+
+    with ThreadPoolExecutor(5) as executor:
+        leader = executor.submit(flights.do, "key", fetch)
+        started.wait()
+        followers = [executor.submit(flights.do, "key", fetch) for _ in range(4)]
+        assert leader.result() == ("result", False)
+        assert [f.result() for f in followers] == [("result", True)] * 4
+    assert calls == 1
+    assert flights.calls == {}
+
+
+def test_sequential_calls_are_not_shared() -> None:
+    flights = SingleFlight()
+    assert flights.do("key", lambda: 1) == (1, False)
+    assert flights.do("key", lambda: 2) == (2, False)
+
+
+def test_error_is_shared() -> None:
+    flights = SingleFlight()
+    started = threading.Event()
+    waited = threading.Event()
+
+    def fail() -> None:
+        started.set()
+        waited.wait(1)
+        raise ValueError("failed")
+
+    with ThreadPoolExecutor(2) as executor:
+        leader = executor.submit(flights.do, "key", fail)
+        started.wait()
+        follower = executor.submit(flights.do, "key", fail, before_wait=waited.set)
+        for future in (leader, follower):
+            with pytest.raises(ValueError, match="failed"):
+                future.result()
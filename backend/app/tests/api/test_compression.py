@@ -0,0 +1,104 @@
+import gzip
+from collections.abc import Callable
+
+import brotli  # type: ignore[import-untyped]
+import pytest
+import zstandard
+from fastapi import Depends, FastAPI
+from fastapi.responses import PlainTextResponse, StreamingResponse
+from fastapi.testclient import TestClient
+
+from app.api.deps import compression_levels
+from app.core.compression import CompressionMiddleware, negotiate_encoding
+
+body = "compressible " * 1000
+
+app = FastAPI()
+app.add_middleware(CompressionMiddleware, minimum_size=500, offload_size=4096)
+
+
+@app.get("/text", response_class=PlainTextResponse)
+def text() -> str:
+    return body
+
+
+@app.get("/small", response_class=PlainTextResponse)
+def small() -> str:
+    return "small"
+
+
+@app.get("/stream")
+def stream() -> StreamingResponse:
+    return StreamingResponse(iter([body, body]), media_type="text/plain")
+
+
+@app.get(
+    "/fast",
+    response_class=PlainTextResponse,
+    dependencies=[Depends(compression_levels(gzip=1))],
+)
+def fast() -> str:
+    return body
+
+
+client = TestClient(app)
+
+
+@pytest.mark.parametrize(
+    "accept_encoding, expected",
+    [
+        ("", None),
+        ("identity", None),
+        ("gzip", "gzip"),
+        ("gzip, deflate, br", "br"),
+        ("gzip, deflate, br, zstd", "zstd"),
+        ("br;q=0.5, gzip", "gzip"),
+        ("*", "zstd"),
+        ("*, zstd;q=0", "br"),
+        ("gzip;q=0", None),
+    ],
+)
+def test_negotiate_encoding(accept_encoding: str, expected: str | None) -> None:
+    assert negotiate_encoding(accept_encoding) == expected
+
+
+@pytest.mark.parametrize(
+    "encoding, decompress",
+    [
+        ("gzip", gzip.decompress),
+        ("br", brotli.decompress),
+        ("zstd", zstandard.ZstdDecompressor().decompress),
+    ],
+)
+def test_compress_response(encoding: str, decompress: Callable[[bytes], bytes]) -> None:
+    # Decode by hand, httpx would transparently decode gzip and br
+    with client.stream("GET", "/text", headers={"Accept-Encoding": encoding}) as r:
+        raw = b"".join(r.iter_raw())
+    assert r.headers["content-encoding"] == encoding
+    assert r.headers["vary"] == "Accept-Encoding"
+    assert int(r.headers["content-length"]) == len(raw) < len(body)
+    assert decompress(raw) == body.encode()
+
+
+def test_skip_small_and_streaming_responses() -> None:
+    r = client.get("/small", headers={"Accept-Encoding": "gzip"})
+    assert "content-encoding" not in r.headers
+    r = client.get("/stream", headers={"Accept-Encoding": "gzip"})
+    assert "content-encoding" not in r.headers
+    assert r.text == body * 2
+
+
+def test_identity_response_varies() -> None:
+    r = client.get("/text", headers={"Accept-Encoding": "identity"})
+    assert "content-encoding" not in r.headers
+    assert r.headers["vary"] == "Accept-Encoding"
+    assert r.text == body
+
+
+def test_route_compression_levels() -> None:
+    with client.stream("GET", "/text", headers={"Accept-Encoding": "gzip"}) as r:
+        default = b"".join(r.iter_raw())
+    with client.stream("GET", "/fast", headers={"Accept-Encoding": "gzip"}) as r:
+        fast = b"".join(r.iter_raw())
+    assert fast == gzip.compress(body.encode(), compresslevel=1, mtime=0)
+    assert fast != default
@@ -0,0 +1,74 @@
+import sys
+import time
+
+from fastapi.testclient import TestClient
+
+from app.core.config import settings
+from app.core.profiling import Sampler, stack_of
+
+
+def busy() -> None:
+    end = time.perf_counter() + 0.05
+    while time.perf_counter() < end:
+        pass
+
+
+def test_stack_of() -> None:
+    stack = stack_of(sys._getframe())
+    name, filename, _line = stack[-1]
+    assert name == "test_stack_of"
+    assert filename == __file__
+    assert len(stack) > 1
+
+
+def test_sampler_speedscope() -> None:
+    with Sampler() as sampler:
+        busy()
+    profile = sampler.speedscope("busy")
+    assert profile["name"] == "busy"
+    names = [frame["name"] for frame in profile["shared"]["frames"]]
+    assert "busy" in names
+    for thread in profile["profiles"]:
+        assert len(thread["samples"]) == len(thread["weights"])
+
+
+def test_profile_request(
+    client: TestClient, superuser_token_headers: dict[str, str]
+) -> None:
+    r = client.get(
+        f"{settings.API_V1_STR}/users/me",
+        headers=superuser_token_headers,
+        params={"__profile": "1"},
+    )
+    assert r.status_code == 200
+    profile = r.json()
+    assert profile["name"] == f"GET {settings.API_V1_STR}/users/me 200"
+    assert "profiles" in profile
+    assert "attachment" in r.headers["content-disposition"]
+
+
+def test_profile_request_normal_user(
+    client: TestClient, normal_user_token_headers: dict[str, str]
+) -> None:
+    r = client.get(
+        f"{settings.API_V1_STR}/users/me",
+        headers={**normal_user_token_headers, "X-Profile": "1"},
+    )
+    assert r.status_code == 403
+    assert r.json()["detail"] == "The user doesn't have enough privileges"
+
+
+def test_profile_request_normal_user_cors(
+    client: TestClient, normal_user_token_headers: dict[str, str]
+) -> None:
+    # Answered by the profiling middleware, still readable by the frontend
+    r = client.get(
+        f"{settings.API_V1_STR}/users/me",
+        headers={
+            **normal_user_token_headers,
+            "X-Profile": "1",
+            "Origin": settings.FRONTEND_HOST,
+        },
+    )
+    assert r.status_code == 403
+    assert r.headers["access-control-allow-origin"] == settings.FRONTEND_HOST
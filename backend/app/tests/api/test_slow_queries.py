@@ -0,0 +1,51 @@
+import logging
+from typing import Any
+
+import pytest
+
+from app.core.db import engine
+from app.core.slow_queries import SlowQueryLog, normalize, redact
+from app.main import custom_generate_unique_id
+
+
+def test_normalize() -> None:
+    statement = """SELECT job.id FROM job
+        WHERE job.cv_id = %(cv_id_1)s AND job.title IN (%(title_1_1)s, %(title_1_2)s)
+        AND job.start > '2020-01-01' LIMIT 10"""
+    assert normalize(statement) == (
+        "SELECT job.id FROM job WHERE job.cv_id = ? AND job.title IN (...) "
+        "AND job.start > ? LIMIT ?"
+    )
+
+
+def test_redact() -> None:
+    assert redact({"email_1": "a@example.com", "id_1": 1}) == {
+        "email_1": "str",
+        "id_1": "int",
+    }
+    assert redact([{"id": None}]) == [{"id": "NoneType"}]
+
+
+def test_slow_query_logged_once_per_interval(
+    monkeypatch: pytest.MonkeyPatch, caplog: pytest.LogCaptureFixture
+) -> None:
+    explained: list[Any] = []
+    slow_query_log = SlowQueryLog(
+        engine, threshold=0.1, interval=60, route_id=custom_generate_unique_id
+    )
+    monkeypatch.setattr(slow_query_log, "explain", lambda *args: explained.append(args))
+    monkeypatch.setattr(
+        "app.core.slow_queries.explain_executor.submit",
+        lambda fn, *args: fn(*args),
+    )
+    statement = "SELECT * FROM job WHERE job.cv_id = %(cv_id_1)s"
+    with caplog.at_level(logging.WARNING, logger="app.core.slow_queries"):
+        slow_query_log.log(statement, {"cv_id_1": "secret"}, 0.5, False)
+        slow_query_log.log(statement, {"cv_id_1": "other"}, 0.5, False)
+    assert len(caplog.records) == 1
+    message = caplog.records[0].getMessage()
+    assert "SELECT * FROM job WHERE job.cv_id = ?" in message
+    assert "{'cv_id_1': 'str'}" in message
+    assert "secret" not in message
+    assert len(explained) == 1
+    assert explained[0][2] == {"cv_id_1": "secret"}
@@ -0,0 +1,121 @@
+from collections.abc import Generator
+
+import pytest
+from fastapi.testclient import TestClient
+from opentelemetry import trace
+from opentelemetry.sdk.trace import TracerProvider
+from opentelemetry.sdk.trace.export import SimpleSpanProcessor
+from opentelemetry.sdk.trace.export.in_memory_span_exporter import (
+    InMemorySpanExporter,
+)
+from opentelemetry.sdk.trace.sampling import Decision
+from opentelemetry.trace import SpanKind, StatusCode
+from opentelemetry.util._once import Once
+
+from app.core import tracing
+from app.core.config import settings
+from app.core.tracing import (
+    PathRatioSampler,
+    TailSamplingProcessor,
+    ratio_for,
+    setup_tracing,
+)
+
+
+@pytest.fixture(scope="module")
+def exporter() -> Generator[InMemorySpanExporter, None, None]:
+    exporter = InMemorySpanExporter()
+    previous = trace._TRACER_PROVIDER
+    provider = setup_tracing(
+        SimpleSpanProcessor(exporter), service_name="test", ratio=1
+    )
+    yield exporter
+    provider.shutdown()
+    # The global tracer provider can only be set once, so it's put back by
+    # hand, as OpenTelemetry's own tests do, along with the tracer of the app
+    # that holds on to the provider's
+    trace._TRACER_PROVIDER_SET_ONCE = Once()
+    trace._TRACER_PROVIDER = previous
+    tracing.tracer._real_tracer = None  # type: ignore[attr-defined]
+
+
+def test_ratio_for() -> None:
+    ratios = {"/api/v1/login": 1, "/api/v1/login/test-token": 0.5}
+    assert ratio_for("/api/v1/items/", 0.01, ratios) == 0.01
+    assert ratio_for("/api/v1/login/access-token", 0.01, ratios) == 1
+    assert ratio_for("/api/v1/login/test-token", 0.01, ratios) == 0.5
+
+
+def test_path_ratio_sampler() -> None:
+    sampler = PathRatioSampler(0, {"/api/v1/login": 1})
+    trace_id = 0x1234
+    login = sampler.should_sample(
+        None, trace_id, "POST", attributes={"url.path": "/api/v1/login/access-token"}
+    )
+    items = sampler.should_sample(
+        None, trace_id, "GET", attributes={"url.path": "/api/v1/items/"}
+    )
+    assert login.decision is Decision.RECORD_AND_SAMPLE
+    assert items.decision is Decision.DROP
+
+
+def test_tail_sampling_keeps_failed_traces() -> None:
+    tail_exporter = InMemorySpanExporter()
+    provider = TracerProvider()
+    provider.add_span_processor(
+        TailSamplingProcessor(
+            SimpleSpanProcessor(tail_exporter), latency=60, ratio=0, ratios={}
+        )
+    )
+    tracer = provider.get_tracer("test")
+    with tracer.start_as_current_span("ok"):
+        with tracer.start_as_current_span("ok child"):
+            pass
+    with tracer.start_as_current_span("failed") as span:
+        with tracer.start_as_current_span("failed child"):
+            pass
+        span.set_status(StatusCode.ERROR)
+    assert [span.name for span in tail_exporter.get_finished_spans()] == [
+        "failed child",
+        "failed",
+    ]
+
+
+def test_request_spans(
+    client: TestClient,
+    superuser_token_headers: dict[str, str],
+    exporter: InMemorySpanExporter,
+) -> None:
+    exporter.clear()
+    r = client.get(f"{settings.API_V1_STR}/users/me", headers=superuser_token_headers)
+    assert r.status_code == 200
+    spans = exporter.get_finished_spans()
+    server = next(span for span in spans if span.kind is SpanKind.SERVER)
+    assert server.attributes is not None
+    assert server.attributes["http.response.status_code"] == 200
+    assert server.context is not None
+    names = set()
+    for span in spans:
+        assert span.context is not None
+        assert span.context.trace_id == server.context.trace_id
+        names.add(span.name)
+    assert {"auth", "SELECT"} <= names
+    query = next(span for span in spans if span.name == "SELECT")
+    assert query.attributes is not None
+    assert "%(" not in str(query.attributes["db.query.text"])
+
+
+def test_request_not_sampled(
+    client: TestClient,
+    superuser_token_headers: dict[str, str],
+    exporter: InMemorySpanExporter,
+) -> None:
+    exporter.clear()
+    # Continues a trace its client didn't sample
+    traceparent = "00-0af7651916cd43dd8448eb211c80319c-b7ad6b7169203331-00"
+    r = client.get(
+        f"{settings.API_V1_STR}/users/me",
+        headers={**superuser_token_headers, "traceparent": traceparent},
+    )
+    assert r.status_code == 200
+    assert exporter.get_finished_spans() == ()
@@ -1,31 +1,118 @@
-from collections.abc import Generator
+import os
+import threading
+from collections.abc import Callable, Generator
+from typing import Any
 
 import pytest
 from fastapi.testclient import TestClient
-from sqlmodel import Session, delete
+from sqlalchemy import Connection, event
+from sqlalchemy.orm import SessionTransaction
+from sqlmodel import Session, SQLModel
 
+from app.api.deps import get_db
 from app.core.config import settings
 from app.core.db import engine, init_db
 from app.main import app
-from app.models import Item, User
 from app.tests.utils.user import authentication_token_from_email
 from app.tests.utils.utils import get_superuser_token_headers
 
 
-@pytest.fixture(scope="session", autouse=True)
-def db() -> Generator[Session, None, None]:
-    with Session(engine) as session:
-        init_db(session)
+def session_on(connection: Connection) -> Session:
+    # Commits and rollbacks of the session only release or roll back a
+    # SAVEPOINT, the transaction of the connection is never committed
+    return Session(bind=connection, join_transaction_mode="create_savepoint")
+
+
+def use_schema(schema: str) -> Callable[..., None]:
+    """
+    Set the search_path of every new connection of engine to schema, so
+    that code using engine rather than the tests' connection, like the
+    EXPLAIN of slow queries, sees the worker's tables too.
+    """
+
+    def set_search_path(dbapi_connection: Any, *_args: Any) -> None:
+        with dbapi_connection.cursor() as cursor:
+            cursor.execute(f"SET search_path TO {schema}")
+        dbapi_connection.commit()
+
+    # Connections already in the pool were made without it
+    engine.dispose()
+    event.listen(engine, "connect", set_search_path)
+    return set_search_path
+
+
+@pytest.fixture(scope="session")
+def connection() -> Generator[Connection, None, None]:
+    """
+    One connection for the whole run, in a transaction that is rolled back at
+    the end, shared by the tests and the app through get_db.
+
+    A Connection can't be used by two threads at once, so the requests, which
+    TestClient runs in threads of its own, take turns using it, one
+    transaction at a time.
+
+    With pytest-xdist (pytest -n auto) each worker creates the tables in a
+    schema of its own, so that the workers don't wait on each other's locks.
+    """
+    worker = os.environ.get("PYTEST_XDIST_WORKER")
+    schema = f"test_{worker}" if worker else None
+    set_search_path = use_schema(schema) if schema else None
+    with engine.connect() as connection:
+        if schema:
+            connection.exec_driver_sql(f"DROP SCHEMA IF EXISTS {schema} CASCADE")
+            connection.exec_driver_sql(f"CREATE SCHEMA {schema}")
+            SQLModel.metadata.create_all(connection)
+            connection.commit()
+        transaction = connection.begin()
+        with session_on(connection) as session:
+            init_db(session)
+        # Held by a request from the start to the end of each transaction of
+        # its session. Acquired and released in different threads, hence not
+        # an RLock
+        lock = threading.Lock()
+
+        def begin(_session: Session, transaction: SessionTransaction) -> None:
+            if transaction.parent is None:
+                lock.acquire()
+
+        def end(_session: Session, transaction: SessionTransaction) -> None:
+            if transaction.parent is None:
+                lock.release()
+
+        def get_test_db() -> Generator[Session, None, None]:
+            with session_on(connection) as session:
+                event.listen(session, "after_transaction_create", begin)
+                event.listen(session, "after_transaction_end", end)
+                yield session
+
+        app.dependency_overrides[get_db] = get_test_db
+        yield connection
+        app.dependency_overrides.pop(get_db)
+        transaction.rollback()
+        if schema:
+            connection.exec_driver_sql(f"DROP SCHEMA {schema} CASCADE")
+            connection.commit()
+    if set_search_path:
+        event.remove(engine, "connect", set_search_path)
+        engine.dispose()
+
+
+@pytest.fixture(autouse=True)
+def db(connection: Connection) -> Generator[Session, None, None]:
+    """
+    A session in a SAVEPOINT rolled back after each test, so that no test
+    sees the rows of another.
+    """
+    savepoint = connection.begin_nested()
+    with session_on(connection) as session:
         yield session
-        statement = delete(Item)
-        session.execute(statement)
-        statement = delete(User)
-        session.execute(statement)
-        session.commit()
+    savepoint.rollback()
 
 
 @pytest.fixture(scope="module")
-def client() -> Generator[TestClient, None, None]:
+def client(
+    connection: Connection,  # noqa: ARG001 (get_db is overridden)
+) -> Generator[TestClient, None, None]:
     with TestClient(app) as c:
         yield c
 
@@ -36,7 +123,11 @@ def superuser_token_headers(client: TestClient) -> dict[str, str]:
 
 
 @pytest.fixture(scope="module")
-def normal_user_token_headers(client: TestClient, db: Session) -> dict[str, str]:
-    return authentication_token_from_email(
-        client=client, email=settings.EMAIL_TEST_USER, db=db
-    )
+def normal_user_token_headers(
+    client: TestClient, connection: Connection
+) -> dict[str, str]:
+    # Set up before the SAVEPOINT of the test, so the user outlives it
+    with session_on(connection) as session:
+        return authentication_token_from_email(
+            client=client, email=settings.EMAIL_TEST_USER, db=session
+        )
@@ -1,7 +1,12 @@
+import json
+from typing import Any
+
 from fastapi.encoders import jsonable_encoder
+from sqlalchemy import event
 from sqlmodel import Session
 
 from app import crud
+from app.core.db import engine
 from app.core.security import verify_password
 from app.models import User, UserCreate, UserUpdate
 from app.tests.utils.utils import random_email, random_lower_string
@@ -89,3 +94,44 @@ def test_update_user(db: Session) -> None:
     assert user_2
     assert user.email == user_2.email
     assert verify_password(new_password, user_2.hashed_password)
+
+
+def test_get_user_by_email_case_insensitive(db: Session) -> None:
+    email = random_email()
+    password = random_lower_string()
+    user_in = UserCreate(email=email.upper(), password=password)
+    user = crud.create_user(session=db, user_create=user_in)
+    assert user.email == email
+    user_2 = crud.get_user_by_email(session=db, email=email.title())
+    assert user_2
+    assert user_2.id == user.id
+    assert crud.try_create_user(session=db, user_create=user_in) is None
+
+
+def test_get_user_by_email_uses_index(db: Session) -> None:
+    statements: list[tuple[str, Any]] = []
+
+    def capture(
+        _conn: Any, _cursor: Any, statement: str, parameters: Any, *_args: Any
+    ) -> None:
+        statements.append((statement, parameters))
+
+    event.listen(engine, "before_cursor_execute", capture)
+    try:
+        crud.get_user_by_email(session=db, email=random_email())
+    finally:
+        event.remove(engine, "before_cursor_execute", capture)
+    statement, parameters = statements[-1]
+
+    # The test table is tiny, so force the planner to show whether the
+    # index can serve the lookup instead of letting it pick a seq scan
+    connection = db.connection()
+    connection.exec_driver_sql("SET enable_seqscan = off")
+    try:
+        plan = connection.exec_driver_sql(
+            f"EXPLAIN (FORMAT JSON) {statement}", parameters
+        ).scalar()
+    finally:
+        connection.exec_driver_sql("RESET enable_seqscan")
+        db.rollback()
+    assert "ix_user_email_lower" in json.dumps(plan)
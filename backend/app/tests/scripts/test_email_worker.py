@@ -0,0 +1,174 @@
+import socket
+from collections.abc import Generator
+from datetime import datetime
+from typing import Any
+from unittest.mock import patch
+
+import pytest
+from aiosmtpd.controller import Controller
+from sqlmodel import Session
+
+from app import crud
+from app.core.config import settings
+from app.email_worker import process_batch
+from app.tests.utils.utils import random_email, random_lower_string
+from app.utils import get_smtp_backend, send_email
+
+
+class RecordingHandler:
+    def __init__(self) -> None:
+        self.recipients: list[str] = []
+
+    async def handle_DATA(self, _server: Any, _session: Any, envelope: Any) -> str:
+        self.recipients.extend(envelope.rcpt_tos)
+        return "250 Message accepted for delivery"
+
+
+def get_free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        port: int = s.getsockname()[1]
+        return port
+
+
+@pytest.fixture()
+def smtp_handler() -> Generator[RecordingHandler, None, None]:
+    handler = RecordingHandler()
+    controller = Controller(handler, hostname="127.0.0.1", port=get_free_port())
+    controller.start()
+    with (
+        patch("app.core.config.settings.SMTP_HOST", "127.0.0.1"),
+        patch("app.core.config.settings.SMTP_PORT", controller.port),
+        patch("app.core.config.settings.SMTP_TLS", False),
+        patch("app.core.config.settings.SMTP_USER", None),
+        patch("app.core.config.settings.SMTP_PASSWORD", None),
+        patch("app.core.config.settings.EMAILS_FROM_EMAIL", "noreply@example.com"),
+    ):
+        yield handler
+    controller.stop()
+
+
+@pytest.fixture()
+def emails_enabled() -> Generator[None, None, None]:
+    with (
+        patch("app.core.config.settings.SMTP_HOST", "smtp.example.com"),
+        patch("app.core.config.settings.EMAILS_FROM_EMAIL", "noreply@example.com"),
+    ):
+        yield
+
+
+def test_process_batch_sends_pending_email(
+    db: Session, smtp_handler: RecordingHandler
+) -> None:
+    email_to = random_email()
+    email = crud.enqueue_email(
+        session=db, email_to=email_to, subject="Subject", html_content="<p>Hi</p>"
+    )
+    db.commit()
+
+    assert process_batch(db) >= 1
+
+    db.refresh(email)
+    assert email.status == "sent"
+    assert email.attempts == 1
+    assert email.sent_at
+    assert email_to in smtp_handler.recipients
+
+
+@pytest.mark.usefixtures("emails_enabled")
+def test_process_batch_retries_with_backoff(db: Session) -> None:
+    email = crud.enqueue_email(
+        session=db, email_to=random_email(), subject="Subject", html_content="Hi"
+    )
+    db.commit()
+
+    with (
+        patch("app.core.config.settings.SMTP_HOST", "127.0.0.1"),
+        patch("app.core.config.settings.SMTP_PORT", get_free_port()),
+        patch("app.core.config.settings.SMTP_TLS", False),
+        patch("app.core.config.settings.EMAILS_FROM_EMAIL", "noreply@example.com"),
+    ):
+        process_batch(db)
+
+    db.refresh(email)
+    assert email.status == "pending"
+    assert email.attempts == 1
+    assert email.last_error
+    assert email.next_attempt_at > datetime.utcnow()
+
+
+@pytest.mark.usefixtures("emails_enabled")
+def test_process_batch_keeps_sent_emails_when_interrupted(db: Session) -> None:
+    emails = [
+        crud.enqueue_email(
+            session=db, email_to=random_email(), subject="Subject", html_content="Hi"
+        )
+        for _ in range(2)
+    ]
+    db.commit()
+
+    interrupted = emails[1].email_to
+
+    def send(*, email_to: str, **_kwargs: Any) -> None:
+        if email_to == interrupted:
+            raise KeyboardInterrupt
+
+    with (
+        patch("app.email_worker.send_email", side_effect=send),
+        pytest.raises(KeyboardInterrupt),
+    ):
+        process_batch(db)
+
+    sent, leased = emails
+    db.refresh(sent)
+    db.refresh(leased)
+    assert sent.status == "sent"
+    # The one being sent stays claimed, and is only retried once the lease
+    # expires
+    assert leased.status == "pending"
+    assert leased.attempts == 1
+    assert leased.next_attempt_at > datetime.utcnow()
+
+
+@pytest.mark.usefixtures("emails_enabled")
+def test_process_batch_clears_failed_email(db: Session) -> None:
+    email = crud.enqueue_email(
+        session=db, email_to=random_email(), subject="Subject", html_content="Hi"
+    )
+    email.attempts = settings.EMAIL_OUTBOX_MAX_ATTEMPTS - 1
+    db.commit()
+
+    with patch("app.email_worker.send_email", side_effect=OSError("refused")):
+        process_batch(db)
+
+    db.refresh(email)
+    assert email.status == "failed"
+    assert email.html_content == ""
+
+
+def test_send_email_reuses_smtp_connection(smtp_handler: RecordingHandler) -> None:
+    for _ in range(3):
+        send_email(email_to=random_email(), subject="Subject", html_content="Hi")
+
+    stats = get_smtp_backend().stats
+    assert stats.connections == 1
+    assert stats.messages == 3
+    assert len(smtp_handler.recipients) == 3
+
+
+@pytest.mark.usefixtures("emails_enabled")
+def test_enqueue_email_throttles_per_recipient(db: Session) -> None:
+    email_to = random_email()
+    statuses = []
+    for _ in range(settings.EMAILS_PER_RECIPIENT_PER_HOUR + 1):
+        email = crud.enqueue_email(
+            session=db,
+            email_to=email_to,
+            subject="Subject",
+            html_content=random_lower_string(),
+        )
+        db.commit()
+        statuses.append(email.status)
+    assert statuses[:-1] == ["pending"] * settings.EMAILS_PER_RECIPIENT_PER_HOUR
+    assert statuses[-1] == "throttled"
+    assert email.html_content == ""
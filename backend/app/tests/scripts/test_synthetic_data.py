@@ -0,0 +1,39 @@
+from collections import Counter
+
+from app.models import CV, Skill
+from app.synthetic_data import CHUNK, Options, cv_rows, reference_rows
+
+options = Options(
+    users=10,
+    items_per_user=5,
+    cvs=CHUNK + 10,
+    languages=20,
+    knowledges=50,
+    certificates=50,
+    seed=1,
+)
+
+
+def test_cv_rows_are_deterministic() -> None:
+    assert cv_rows(options, 0) == cv_rows(options, 0)
+    assert cv_rows(options, 0)[CV] != cv_rows(options, 1)[CV]
+
+
+def test_cv_rows_cover_the_range_of_the_chunk() -> None:
+    assert len(cv_rows(options, 0)[CV]) == CHUNK
+    assert [cv["name"] for cv in cv_rows(options, 1)[CV]][0] == f"CV {CHUNK}"
+    assert len(cv_rows(options, 1)[CV]) == 10
+
+
+def test_skills_are_skewed() -> None:
+    rows = cv_rows(options, 0)
+    per_task = Counter(skill["task_id"] for skill in rows[Skill])
+    assert max(per_task.values()) > 5
+    names = Counter(skill["name"] for skill in rows[Skill]).most_common()
+    assert names[0][1] > 5 * names[-1][1]
+
+
+def test_reference_names_are_unique() -> None:
+    for rows in reference_rows(options).values():
+        names = [row.get("name", row.get("language")) for row in rows]
+        assert len(set(names)) == len(names)
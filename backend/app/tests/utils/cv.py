@@ -0,0 +1,66 @@
+from datetime import datetime
+
+from sqlmodel import Session
+
+from app.models import CV, Contact, Job, School, Skill, Task
+from app.tests.utils.utils import random_email, random_lower_string
+
+
+def create_random_cv(
+    db: Session, *, jobs: int = 0, tasks: int = 0, skills: int = 0
+) -> CV:
+    """
+    Create a CV with jobs, tasks per job and skills per task.
+    """
+    cv = CV(name=random_lower_string(), recipient=random_lower_string())
+    db.add(cv)
+    for _ in range(jobs):
+        job = Job(
+            position=random_lower_string(),
+            company=random_lower_string(),
+            location=random_lower_string(),
+            start=datetime(2020, 1, 1),
+            cv_id=cv.id,
+        )
+        db.add(job)
+        for _ in range(tasks):
+            task = Task(name=random_lower_string(), duration=1, job_id=job.id)
+            db.add(task)
+            for _ in range(skills):
+                db.add(Skill(name=random_lower_string(), rating=3, task_id=task.id))
+    db.commit()
+    db.refresh(cv)
+    return cv
+
+
+def create_random_school(db: Session, cv: CV) -> School:
+    school = School(
+        school=random_lower_string(),
+        subject=random_lower_string(),
+        degree=random_lower_string(),
+        location=random_lower_string(),
+        start=datetime(2015, 9, 1),
+        cv_id=cv.id,
+    )
+    db.add(school)
+    db.commit()
+    db.refresh(school)
+    return school
+
+
+def create_random_contact(db: Session, cv: CV) -> Contact:
+    contact = Contact(
+        first_name=random_lower_string(),
+        last_name=random_lower_string(),
+        address=random_lower_string(),
+        zip_code="12345",
+        location=random_lower_string(),
+        phone="+4912345678",
+        email=random_email(),
+        birthdate=datetime(1990, 1, 1),
+        cv_id=cv.id,
+    )
+    db.add(contact)
+    db.commit()
+    db.refresh(contact)
+    return contact
@@ -0,0 +1,135 @@
+from collections import defaultdict
+from collections.abc import Iterator
+from contextlib import contextmanager
+from typing import Any
+
+from sqlalchemy import event
+
+from app.core.db import engine
+from app.core.metrics import savepoint_statements
+
+# Most SQL statements each route may run, by route id (the OpenAPI operation
+# id, "<tag>-<function name>"), including the lookup of the current user.
+# Raise a budget only when a route really needs a new query, the point is to
+# notice lazy loads and per-row queries added by accident
+budgets = {
+    "login-login_access_token": 1,
+    "login-recover_password": 3,
+    "login-reset_password": 2,
+    "login-test_token": 1,
+    "users-read_users": 3,
+    "users-create_user": 5,
+    "users-read_user_me": 1,
+    "users-update_user_me": 3,
+    "users-update_password_me": 2,
+    "users-delete_user_me": 4,
+    "users-register_user": 2,
+    "users-read_user_by_id": 2,
+    "users-update_user": 4,
+    "users-delete_user": 5,
+    "items-read_items": 3,
+    "items-read_item": 2,
+    "items-create_item": 3,
+    "items-update_item": 4,
+    "items-delete_item": 3,
+    "languages-create_language": 3,
+    "languages-upsert_language": 3,
+    # One more query per included relationship
+    "cvs-read_cv": 2,
+    "cvs-read_cvs": 3,
+    "cvs-create_cv": 3,
+    "cvs-update_cv": 4,
+    "cvs-delete_cv": 6,
+    "jobs-read_jobs": 2,
+    "jobs-read_job": 2,
+    "jobs-create_job": 3,
+    "jobs-update_job": 4,
+    "jobs-delete_job": 4,
+    "tasks-read_tasks": 2,
+    "tasks-read_task": 2,
+    "tasks-create_task": 3,
+    "tasks-update_task": 4,
+    "tasks-delete_task": 4,
+    "skills-read_skills": 2,
+    "skills-read_skill": 2,
+    "skills-create_skill": 3,
+    "skills-update_skill": 4,
+    "skills-delete_skill": 3,
+    "schools-read_schools": 2,
+    "schools-read_school": 2,
+    "schools-create_school": 3,
+    "schools-update_school": 4,
+    "schools-delete_school": 3,
+    "contacts-read_contacts": 2,
+    "contacts-read_contact": 2,
+    "contacts-update_contact": 4,
+    "contacts-delete_contact": 3,
+    "knowledges-read_knowledges": 2,
+    "knowledges-read_knowledge": 2,
+    "knowledges-create_knowledge": 3,
+    "knowledges-update_knowledge": 4,
+    "knowledges-delete_knowledge": 3,
+    "knowledges-upsert_knowledge": 3,
+    "certificates-read_certificates": 2,
+    "certificates-read_certificate": 2,
+    "certificates-create_certificate": 3,
+    "certificates-update_certificate": 4,
+    "certificates-delete_certificate": 3,
+    "certificates-upsert_certificate": 3,
+    "languages-read_languages": 2,
+    "languages-read_language": 2,
+    "languages-update_language": 4,
+    "languages-delete_language": 3,
+    # One more query per requested type
+    "batch-batch_get": 1,
+}
+
+
+class QueryBudgetExceeded(AssertionError):
+    pass
+
+
+@contextmanager
+def query_budget(
+    route: str, *, extra: int = 0, max_repeats: int = 2
+) -> Iterator[list[tuple[str, Any]]]:
+    """
+    Fail if the block runs more SQL statements than the budget of route, plus
+    extra, or runs the same statement with more than max_repeats different
+    parameters, the sign of a query per row (N+1).
+
+    The default max_repeats allows the lookup of the current user and of
+    another user by id, which are the same statement.
+
+    Yields the (statement, parameters) executed, for further checks.
+    """
+    budget = budgets[route] + extra
+    statements: list[tuple[str, Any]] = []
+
+    def record(
+        _conn: Any, _cursor: Any, statement: str, parameters: Any, *_args: Any
+    ) -> None:
+        # The SAVEPOINTs of the test sessions, see conftest.py
+        if not statement.startswith(savepoint_statements):
+            statements.append((statement, parameters))
+
+    event.listen(engine, "before_cursor_execute", record)
+    try:
+        yield statements
+    finally:
+        event.remove(engine, "before_cursor_execute", record)
+
+    if len(statements) > budget:
+        executed = "\n".join(statement for statement, _ in statements)
+        raise QueryBudgetExceeded(
+            f"{route} ran {len(statements)} statements, budget is {budget}:\n{executed}"
+        )
+    parameters_by_statement: defaultdict[str, set[str]] = defaultdict(set)
+    for statement, parameters in statements:
+        parameters_by_statement[statement].add(repr(parameters))
+    for statement, parameters in parameters_by_statement.items():
+        if len(parameters) > max_repeats:
+            raise QueryBudgetExceeded(
+                f"{route} ran the same statement with {len(parameters)} "
+                f"different parameters, load the rows with one query:\n{statement}"
+            )
@@ -1,4 +1,6 @@
 import logging
+import threading
+import time
 from dataclasses import dataclass
 from datetime import datetime, timedelta, timezone
 from pathlib import Path
@@ -6,30 +8,121 @@ from typing import Any
 
 import emails  # type: ignore
 import jwt
-from jinja2 import Template
+from emails.backend.smtp import SMTPBackend  # type: ignore
+from jinja2 import Environment, FileSystemBytecodeCache, FileSystemLoader
 from jwt.exceptions import InvalidTokenError
 
 from app.core import security
 from app.core.config import settings
+from app.core.metrics import email_send_duration
+from app.core.tracing import child_span, tracer
 
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
 
+class EmailSendError(Exception):
+    pass
+
+
 @dataclass
 class EmailData:
     html_content: str
     subject: str
 
 
+# Templates are compiled once and kept in the environment cache, the bytecode
+# cache lets other worker processes skip compiling them again. Only reload
+# them from disk when developing locally.
+email_templates = Environment(
+    loader=FileSystemLoader(Path(__file__).parent / "email-templates" / "build"),
+    bytecode_cache=FileSystemBytecodeCache(),
+    auto_reload=settings.ENVIRONMENT == "local",
+)
+
+
+def load_email_templates() -> None:
+    for template_name in email_templates.list_templates(extensions=["html"]):
+        email_templates.get_template(template_name)
+
+
 def render_email_template(*, template_name: str, context: dict[str, Any]) -> str:
-    template_str = (
-        Path(__file__).parent / "email-templates" / "build" / template_name
-    ).read_text()
-    html_content = Template(template_str).render(context)
+    with child_span("email.render", **{"email.template": template_name}):
+        html_content = email_templates.get_template(template_name).render(context)
     return html_content
 
 
+@dataclass
+class SMTPConnectionStats:
+    connections: int = 0
+    messages: int = 0
+    failures: int = 0
+    send_seconds: float = 0.0
+
+    @property
+    def messages_per_second(self) -> float:
+        return self.messages / self.send_seconds if self.send_seconds else 0.0
+
+
+class PooledSMTPBackend(SMTPBackend):  # type: ignore[misc, unused-ignore]
+    """
+    SMTP backend whose authenticated connection is kept open between messages.
+
+    The underlying backend reconnects once when the server has dropped the
+    connection, a failed send closes it so the next one starts clean.
+    """
+
+    def __init__(self, **kwargs: Any) -> None:
+        super().__init__(**kwargs)
+        self.lock = threading.Lock()
+        self.stats = SMTPConnectionStats()
+        self.last_used = 0.0
+
+    def get_client(self) -> Any:
+        if self._client is None:
+            self.stats.connections += 1
+        return super().get_client()
+
+
+smtp_pool: dict[tuple[Any, ...], PooledSMTPBackend] = {}
+smtp_pool_lock = threading.Lock()
+
+
+def get_smtp_backend() -> PooledSMTPBackend:
+    smtp_options: dict[str, Any] = {
+        "host": settings.SMTP_HOST,
+        "port": settings.SMTP_PORT,
+    }
+    if settings.SMTP_TLS:
+        smtp_options["tls"] = True
+    elif settings.SMTP_SSL:
+        smtp_options["ssl"] = True
+    if settings.SMTP_USER:
+        smtp_options["user"] = settings.SMTP_USER
+    if settings.SMTP_PASSWORD:
+        smtp_options["password"] = settings.SMTP_PASSWORD
+    key = tuple(sorted(smtp_options.items()))
+    with smtp_pool_lock:
+        if key not in smtp_pool:
+            smtp_pool[key] = PooledSMTPBackend(**smtp_options)
+        return smtp_pool[key]
+
+
+def get_smtp_pool_stats() -> dict[str, SMTPConnectionStats]:
+    with smtp_pool_lock:
+        return {
+            f"{backend.host}:{backend.port}": backend.stats
+            for backend in smtp_pool.values()
+        }
+
+
+def close_smtp_connections() -> None:
+    with smtp_pool_lock:
+        for backend in smtp_pool.values():
+            with backend.lock:
+                backend.close()
+
+
 def send_email(
     *,
     email_to: str,
@@ -42,17 +135,28 @@ def send_email(
         html=html_content,
         mail_from=(settings.EMAILS_FROM_NAME, settings.EMAILS_FROM_EMAIL),
     )
-    smtp_options = {"host": settings.SMTP_HOST, "port": settings.SMTP_PORT}
-    if settings.SMTP_TLS:
-        smtp_options["tls"] = True
-    elif settings.SMTP_SSL:
-        smtp_options["ssl"] = True
-    if settings.SMTP_USER:
-        smtp_options["user"] = settings.SMTP_USER
-    if settings.SMTP_PASSWORD:
-        smtp_options["password"] = settings.SMTP_PASSWORD
-    response = message.send(to=email_to, smtp=smtp_options)
+    backend = get_smtp_backend()
+    # One message at a time per connection, consecutive messages share it
+    with tracer.start_as_current_span("email.send") as span, backend.lock:
+        if time.monotonic() - backend.last_used > settings.SMTP_MAX_IDLE_SECONDS:
+            backend.close()
+        start = time.perf_counter()
+        response = message.send(to=email_to, smtp=backend)
+        elapsed = time.perf_counter() - start
+        backend.stats.send_seconds += elapsed
+        email_send_duration.labels(
+            "success" if response.success else "failure"
+        ).observe(elapsed)
+        backend.last_used = time.monotonic()
+        span.set_attribute("email.success", bool(response.success))
+        if response.success:
+            backend.stats.messages += 1
+        else:
+            backend.stats.failures += 1
+            backend.close()
     logger.info(f"send email result: {response}")
+    if not response.success:
+        raise EmailSendError(str(response.error or response))
 
 
 def generate_test_email(email_to: str) -> EmailData:
@@ -0,0 +1,60 @@
+"""
+Bytes saved and CPU added by CompressionMiddleware for list pages of
+different sizes, per encoding and level.
+
+Run from the backend directory:
+
+    python -m benchmarks.compression
+"""
+
+import timeit
+import uuid
+from datetime import datetime
+
+from app.api.responses import as_dicts, page_response
+from app.core.compression import Compressor, compressors, default_levels
+from app.models import Job, JobPublic
+
+NUMBER = 200
+LEVELS = {"gzip": (1, 6, 9), "br": (1, 4, 9), "zstd": (1, 3, 10)}
+
+
+def page(rows: int) -> bytes:
+    fields = tuple(JobPublic.model_fields)
+    cv_id = uuid.uuid4()
+    jobs = [
+        Job(
+            position=f"Engineer {i}",
+            company="ACME",
+            location="Berlin",
+            start=datetime(2020, 1, 1),
+            cv_id=cv_id,
+        )
+        for i in range(rows)
+    ]
+    page_rows = [tuple(getattr(job, name) for name in fields) for job in jobs]
+    return bytes(page_response(as_dicts(fields, page_rows), rows).body)
+
+
+def measure(compress: Compressor, body: bytes, level: int) -> float:
+    return timeit.timeit(lambda: compress(body, level), number=NUMBER) / NUMBER
+
+
+def main() -> None:
+    for rows in (10, 100, 1000):
+        body = page(rows)
+        print(f"{rows} jobs, {len(body)} bytes")
+        for encoding, compress in compressors.items():
+            for level in LEVELS[encoding]:
+                size = len(compress(body, level))
+                seconds = measure(compress, body, level)
+                default = " (default)" if level == default_levels[encoding] else ""
+                print(
+                    f"  {encoding + ' ' + str(level) + default:<16}"
+                    f" {size:>8} bytes {1 - size / len(body):>6.1%} saved"
+                    f" {seconds * 1_000_000:>10.1f} us"
+                )
+
+
+if __name__ == "__main__":
+    main()
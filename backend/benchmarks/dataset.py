@@ -0,0 +1,196 @@
+"""
+A reproducible dataset for the benchmarks: users with items, and CVs with
+jobs, each with tasks, each with skills, inserted in bulk.
+
+The same size and seed give the same rows, ids included, so runs against
+different commits read the same data. All users share one password, hashed
+once, as bcrypt at the configured cost would dominate the seeding.
+"""
+
+import random
+import uuid
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta
+from typing import Any
+
+from sqlalchemy import delete, insert
+from sqlmodel import Session, SQLModel, col, select
+
+from app.core.security import get_password_hash
+from app.models import CV, Item, Job, Skill, Task, User
+
+# Rows inserted per statement
+CHUNK = 1_000
+
+EMAIL_DOMAIN = "bench.example.com"
+PASSWORD = "benchmark-password"
+RECIPIENT = "Benchmark"
+
+COMPANIES = ["ACME", "Globex", "Initech", "Umbrella", "Hooli", "Stark"]
+LOCATIONS = ["Berlin", "Paris", "Madrid", "Lisbon", "Vienna", "Zurich"]
+POSITIONS = ["Engineer", "Designer", "Manager", "Analyst", "Consultant"]
+SKILLS = ["Python", "SQL", "Docker", "Kubernetes", "React", "Rust", "Go"]
+
+
+@dataclass
+class Size:
+    users: int = 100
+    items_per_user: int = 20
+    cvs: int = 200
+    jobs_per_cv: int = 5
+    tasks_per_job: int = 3
+    skills_per_task: int = 3
+
+
+@dataclass
+class Dataset:
+    size: Size
+    seed: int
+    user_ids: list[uuid.UUID] = field(default_factory=list)
+    item_ids: list[uuid.UUID] = field(default_factory=list)
+    cv_ids: list[uuid.UUID] = field(default_factory=list)
+
+
+def email(index: int) -> str:
+    return f"user{index}@{EMAIL_DOMAIN}"
+
+
+def new_id(rng: random.Random) -> uuid.UUID:
+    return uuid.UUID(int=rng.getrandbits(128), version=4)
+
+
+def insert_rows(
+    session: Session, model: type[SQLModel], rows: list[dict[str, Any]]
+) -> None:
+    for start in range(0, len(rows), CHUNK):
+        session.execute(insert(model), rows[start : start + CHUNK])
+
+
+def clear(session: Session) -> None:
+    """
+    Delete the rows of a previous seed(), found by the email domain of the
+    users and the recipient of the CVs.
+    """
+    cv_ids = select(col(CV.id)).where(col(CV.recipient) == RECIPIENT)
+    job_ids = select(col(Job.id)).where(col(Job.cv_id).in_(cv_ids))
+    task_ids = select(col(Task.id)).where(col(Task.job_id).in_(job_ids))
+    user_ids = select(col(User.id)).where(col(User.email).endswith(f"@{EMAIL_DOMAIN}"))
+    session.execute(delete(Skill).where(col(Skill.task_id).in_(task_ids)))
+    session.execute(delete(Task).where(col(Task.id).in_(task_ids)))
+    session.execute(delete(Job).where(col(Job.id).in_(job_ids)))
+    session.execute(delete(CV).where(col(CV.id).in_(cv_ids)))
+    session.execute(delete(Item).where(col(Item.owner_id).in_(user_ids)))
+    session.execute(delete(User).where(col(User.id).in_(user_ids)))
+    session.commit()
+
+
+def generate(
+    size: Size, *, seed: int = 0, hashed_password: str = ""
+) -> tuple[Dataset, dict[type[SQLModel], list[dict[str, Any]]]]:
+    """
+    The dataset of size generated from seed, and its rows by model. The ids
+    alone are enough to send requests to an already seeded database.
+    """
+    rng = random.Random(seed)
+    dataset = Dataset(size=size, seed=seed)
+    epoch = datetime(2015, 1, 1)
+
+    users, items = [], []
+    for i in range(size.users):
+        user_id = new_id(rng)
+        dataset.user_ids.append(user_id)
+        users.append(
+            {
+                "id": user_id,
+                "email": email(i),
+                "full_name": f"User {i}",
+                "hashed_password": hashed_password,
+                "is_active": True,
+                "is_superuser": False,
+            }
+        )
+        for j in range(size.items_per_user):
+            item_id = new_id(rng)
+            dataset.item_ids.append(item_id)
+            items.append(
+                {
+                    "id": item_id,
+                    "title": f"Item {j} of user {i}",
+                    "description": rng.choice(POSITIONS),
+                    "owner_id": user_id,
+                }
+            )
+
+    cvs, jobs, tasks, skills = [], [], [], []
+    for i in range(size.cvs):
+        cv_id = new_id(rng)
+        dataset.cv_ids.append(cv_id)
+        created_at = epoch + timedelta(days=rng.randrange(3_000))
+        cvs.append(
+            {
+                "id": cv_id,
+                "name": f"CV {i}",
+                "recipient": RECIPIENT,
+                "created_at": created_at,
+                "edited_at": created_at,
+            }
+        )
+        for _ in range(size.jobs_per_cv):
+            job_id = new_id(rng)
+            start = epoch + timedelta(days=rng.randrange(3_000))
+            jobs.append(
+                {
+                    "id": job_id,
+                    "position": rng.choice(POSITIONS),
+                    "company": rng.choice(COMPANIES),
+                    "location": rng.choice(LOCATIONS),
+                    "start": start,
+                    "end": start + timedelta(days=rng.randrange(30, 1_500)),
+                    "cv_id": cv_id,
+                }
+            )
+            for k in range(size.tasks_per_job):
+                task_id = new_id(rng)
+                tasks.append(
+                    {
+                        "id": task_id,
+                        "name": f"Task {k}",
+                        "description": None,
+                        "duration": rng.randint(1, 40),
+                        "job_id": job_id,
+                    }
+                )
+                for _ in range(size.skills_per_task):
+                    skills.append(
+                        {
+                            "id": new_id(rng),
+                            "name": rng.choice(SKILLS),
+                            "rating": rng.randint(1, 5),
+                            "task_id": task_id,
+                        }
+                    )
+
+    rows: dict[type[SQLModel], list[dict[str, Any]]] = {
+        User: users,
+        Item: items,
+        CV: cvs,
+        Job: jobs,
+        Task: tasks,
+        Skill: skills,
+    }
+    return dataset, rows
+
+
+def seed(session: Session, size: Size, *, seed: int = 0) -> Dataset:
+    """
+    Replace the benchmark rows with a new dataset of size, generated from
+    seed.
+    """
+    clear(session)
+    dataset, rows = generate(
+        size, seed=seed, hashed_password=get_password_hash(PASSWORD)
+    )
+    for model, model_rows in rows.items():
+        insert_rows(session, model, model_rows)
+    session.commit()
+    return dataset
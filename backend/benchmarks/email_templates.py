@@ -0,0 +1,89 @@
+"""
+Per-email render time, compiling the template on every call (as it used to be
+done) versus rendering from the pre-compiled template environment.
+
+Run from the backend directory:
+
+    python -m benchmarks.email_templates
+"""
+
+import timeit
+from pathlib import Path
+from typing import Any
+
+from jinja2 import Template
+
+from app.core.config import settings
+from app.utils import (
+    email_templates,
+    generate_new_account_email,
+    generate_reset_password_email,
+    generate_test_email,
+    load_email_templates,
+)
+
+NUMBER = 1_000
+
+CONTEXT: dict[str, Any] = {
+    "project_name": settings.PROJECT_NAME,
+    "username": "user@example.com",
+    "email": "user@example.com",
+    "password": "password",
+    "valid_hours": settings.EMAIL_RESET_TOKEN_EXPIRE_HOURS,
+    "link": settings.FRONTEND_HOST,
+}
+
+
+def render_uncached(template_name: str) -> str:
+    template_str = (
+        Path(__file__).parent.parent
+        / "app"
+        / "email-templates"
+        / "build"
+        / template_name
+    ).read_text()
+    return Template(template_str).render(CONTEXT)
+
+
+def report(name: str, seconds: float) -> None:
+    print(f"{name:<40} {seconds / NUMBER * 1_000_000:>10.1f} us/email")
+
+
+def main() -> None:
+    load_email_templates()
+    for template_name in email_templates.list_templates(extensions=["html"]):
+        report(
+            f"{template_name} (compile per call)",
+            timeit.timeit(lambda n=template_name: render_uncached(n), number=NUMBER),
+        )
+        template = email_templates.get_template(template_name)
+        report(
+            f"{template_name} (pre-compiled)",
+            timeit.timeit(lambda t=template: t.render(CONTEXT), number=NUMBER),
+        )
+    report(
+        "generate_test_email",
+        timeit.timeit(lambda: generate_test_email("user@example.com"), number=NUMBER),
+    )
+    report(
+        "generate_reset_password_email",
+        timeit.timeit(
+            lambda: generate_reset_password_email(
+                "user@example.com", "user@example.com", "token"
+            ),
+            number=NUMBER,
+        ),
+    )
+    report(
+        "generate_new_account_email",
+        timeit.timeit(
+            lambda: generate_new_account_email(
+                "user@example.com", "user@example.com", "password"
+            ),
+            number=NUMBER,
+        ),
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,352 @@
+"""
+Latency and throughput of the hot API endpoints against a seeded dataset,
+in process through httpx.ASGITransport and over HTTP to a uvicorn server.
+
+The dataset (see benchmarks/dataset.py) is inserted into the database of
+the settings, replacing the rows of a previous run, so point it at a
+development database, not production. The results are written as JSON, one
+summary per route id and transport, to compare runs of different commits.
+
+Run from the backend directory, with the database up:
+
+    python -m benchmarks.endpoints --output benchmark-results/endpoints.json
+"""
+
+import argparse
+import asyncio
+import json
+import logging
+import os
+import socket
+import subprocess
+import sys
+import time
+from collections.abc import Callable
+from dataclasses import asdict, dataclass, field
+from datetime import timedelta
+from pathlib import Path
+from typing import Any
+
+import httpx
+from sqlmodel import Session
+
+from app.core.config import settings
+from app.core.db import engine
+from app.core.security import create_access_token
+from app.main import app
+from benchmarks import results
+from benchmarks.dataset import PASSWORD, RECIPIENT, Dataset, Size, email, seed
+
+API = settings.API_V1_STR
+TRANSPORTS = ("asgi", "uvicorn")
+WARMUP = 20
+
+
+@dataclass
+class Request:
+    method: str
+    url: str
+    user: int
+    json: dict[str, Any] | None = None
+    data: dict[str, str] | None = None
+
+
+@dataclass
+class Scenario:
+    # The route id, as in the OpenAPI operation ids and the metrics, and the
+    # query string of variants of the same route
+    name: str
+    request: Callable[["Run", int], Request]
+    # Share of --requests, for the routes much slower than the rest
+    share: float = 1.0
+    # Kind of the ids, in the responses of a create or the url of an update
+    # or delete of the ids that the create returned
+    creates: str | None = None
+    uses: str | None = None
+
+
+@dataclass
+class Run:
+    dataset: Dataset
+    tokens: list[str]
+    created: dict[str, list[tuple[int, str]]] = field(default_factory=dict)
+
+    def user(self, i: int) -> int:
+        return i % len(self.tokens)
+
+    def cv(self, i: int) -> str:
+        return str(self.dataset.cv_ids[i % len(self.dataset.cv_ids)])
+
+    def item(self, user: int, i: int) -> str:
+        # The items of each user follow each other in item_ids
+        per_user = self.dataset.size.items_per_user
+        return str(self.dataset.item_ids[user * per_user + i % per_user])
+
+
+def login(run: Run, i: int) -> Request:
+    user = run.user(i)
+    return Request(
+        "POST",
+        f"{API}/login/access-token",
+        user,
+        data={"username": email(user), "password": PASSWORD},
+    )
+
+
+def created(
+    kind: str, method: str, body: dict[str, Any] | None = None
+) -> Callable[[Run, int], Request]:
+    def request(run: Run, i: int) -> Request:
+        # With the token of the user that created it, the owner of items
+        user, id = run.created[kind][i]
+        return Request(method, f"{API}/{kind}/{id}", user, json=body)
+
+    return request
+
+
+SCENARIOS = [
+    Scenario("login-login_access_token", login, share=0.1),
+    Scenario(
+        "users-read_user_me",
+        lambda run, i: Request("GET", f"{API}/users/me", run.user(i)),
+    ),
+    Scenario(
+        "items-read_items",
+        lambda run, i: Request("GET", f"{API}/items/", run.user(i)),
+    ),
+    Scenario(
+        "cvs-read_cvs",
+        lambda run, i: Request("GET", f"{API}/cvs/", run.user(i)),
+    ),
+    Scenario(
+        "cvs-read_cv",
+        lambda run, i: Request("GET", f"{API}/cvs/{run.cv(i)}", run.user(i)),
+    ),
+    Scenario(
+        "cvs-read_cv?include=jobs.tasks.skills",
+        lambda run, i: Request(
+            "GET", f"{API}/cvs/{run.cv(i)}?include=jobs.tasks.skills", run.user(i)
+        ),
+    ),
+    Scenario(
+        "items-create_item",
+        lambda run, i: Request(
+            "POST",
+            f"{API}/items/",
+            run.user(i),
+            json={"title": f"Benchmark item {i}", "description": "Created"},
+        ),
+        creates="items",
+    ),
+    Scenario(
+        "cvs-create_cv",
+        lambda run, i: Request(
+            "POST",
+            f"{API}/cvs/",
+            run.user(i),
+            json={"name": f"Benchmark CV {i}", "recipient": RECIPIENT},
+        ),
+        creates="cvs",
+    ),
+    Scenario(
+        "items-update_item",
+        created("items", "PUT", {"title": "Updated"}),
+        uses="items",
+    ),
+    Scenario("cvs-update_cv", created("cvs", "PUT", {"name": "Updated"}), uses="cvs"),
+    Scenario("items-delete_item", created("items", "DELETE"), uses="items"),
+    Scenario("cvs-delete_cv", created("cvs", "DELETE"), uses="cvs"),
+]
+
+
+async def send(client: httpx.AsyncClient, run: Run, request: Request) -> httpx.Response:
+    headers = {}
+    if request.data is None:
+        headers["Authorization"] = f"Bearer {run.tokens[request.user]}"
+    return await client.request(
+        request.method,
+        request.url,
+        headers=headers,
+        json=request.json,
+        data=request.data,
+    )
+
+
+async def measure(
+    client: httpx.AsyncClient,
+    run: Run,
+    scenario: Scenario,
+    *,
+    requests: int,
+    concurrency: int,
+) -> dict[str, Any]:
+    """
+    Send requests of scenario from concurrency tasks, each one after the
+    previous response, and summarize their latencies.
+    """
+    requests = max(int(requests * scenario.share), 1)
+    if scenario.uses:
+        requests = min(requests, len(run.created.get(scenario.uses, [])))
+    ids: list[tuple[int, str]] = []
+    latencies: list[float] = []
+    errors = 0
+    counter = iter(range(requests))
+
+    async def worker() -> None:
+        nonlocal errors
+        for i in counter:
+            request = scenario.request(run, i)
+            start = time.perf_counter()
+            response = await send(client, run, request)
+            latencies.append(time.perf_counter() - start)
+            if response.is_error:
+                errors += 1
+            elif scenario.creates:
+                ids.append((request.user, response.json()["id"]))
+
+    start = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    seconds = time.perf_counter() - start
+    if scenario.creates:
+        run.created[scenario.creates] = ids
+    return results.summarize(latencies, seconds, errors)
+
+
+async def benchmark(
+    client: httpx.AsyncClient, run: Run, *, requests: int, concurrency: int
+) -> dict[str, Any]:
+    for i in range(WARMUP):
+        await send(client, run, SCENARIOS[1].request(run, i))
+    summaries = {}
+    for scenario in SCENARIOS:
+        if scenario.uses and not run.created.get(scenario.uses):
+            print(f"{scenario.name:<40} skipped, nothing created", file=sys.stderr)
+            continue
+        summary = await measure(
+            client, run, scenario, requests=requests, concurrency=concurrency
+        )
+        summaries[scenario.name] = summary
+        print(
+            f"{scenario.name:<40} p50 {summary['p50_ms']:>8.2f} ms"
+            f"  p99 {summary['p99_ms']:>8.2f} ms"
+            f"  {summary['throughput']:>8.1f} req/s"
+            f"  {summary['errors']} errors",
+            file=sys.stderr,
+        )
+    return summaries
+
+
+def free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        port: int = sock.getsockname()[1]
+        return port
+
+
+def start_uvicorn(port: int, workers: int) -> subprocess.Popen[bytes]:
+    server = subprocess.Popen(
+        [
+            sys.executable,
+            "-m",
+            "uvicorn",
+            "app.main:app",
+            "--host",
+            "127.0.0.1",
+            "--port",
+            str(port),
+            "--workers",
+            str(workers),
+            "--log-level",
+            "warning",
+        ],
+        env={**os.environ, "PYTHONUNBUFFERED": "1"},
+    )
+    deadline = time.monotonic() + 30
+    while time.monotonic() < deadline:
+        try:
+            httpx.get(f"http://127.0.0.1:{port}{API}/utils/health-check/")
+            return server
+        except httpx.TransportError:
+            time.sleep(0.2)
+    server.terminate()
+    raise RuntimeError("uvicorn didn't start in 30 seconds")
+
+
+async def run_transport(
+    transport: str, run: Run, args: argparse.Namespace
+) -> dict[str, Any]:
+    options = {"requests": args.requests, "concurrency": args.concurrency}
+    if transport == "asgi":
+        # ASGITransport doesn't run the lifespan of the app
+        async with (
+            app.router.lifespan_context(app),
+            httpx.AsyncClient(
+                transport=httpx.ASGITransport(app=app, raise_app_exceptions=False),
+                base_url="http://test",
+            ) as client,
+        ):
+            return await benchmark(client, run, **options)
+    port = free_port()
+    server = start_uvicorn(port, args.workers)
+    try:
+        limits = httpx.Limits(max_connections=args.concurrency)
+        async with httpx.AsyncClient(
+            base_url=f"http://127.0.0.1:{port}", limits=limits
+        ) as client:
+            return await benchmark(client, run, **options)
+    finally:
+        server.terminate()
+        server.wait()
+
+
+def parse_args(argv: list[str] | None = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    size = Size()
+    for name, default in asdict(size).items():
+        parser.add_argument(f"--{name.replace('_', '-')}", type=int, default=default)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--requests", type=int, default=500)
+    parser.add_argument("--concurrency", type=int, default=10)
+    parser.add_argument("--workers", type=int, default=1)
+    parser.add_argument("--transport", choices=(*TRANSPORTS, "all"), default="all")
+    parser.add_argument("--output", type=Path)
+    return parser.parse_args(argv)
+
+
+async def main_async(args: argparse.Namespace) -> dict[str, Any]:
+    size = Size(**{name: getattr(args, name) for name in asdict(Size())})
+    with Session(engine) as session:
+        dataset = seed(session, size, seed=args.seed)
+    tokens = [
+        create_access_token(user_id, timedelta(hours=1)) for user_id in dataset.user_ids
+    ]
+    run = Run(dataset=dataset, tokens=tokens)
+    transports = TRANSPORTS if args.transport == "all" else (args.transport,)
+    data = results.metadata(
+        benchmark="endpoints",
+        size=asdict(size),
+        seed=args.seed,
+        requests=args.requests,
+        concurrency=args.concurrency,
+        workers=args.workers,
+    )
+    data["results"] = {}
+    for transport in transports:
+        print(f"{transport}:", file=sys.stderr)
+        data["results"][transport] = await run_transport(transport, run, args)
+    return data
+
+
+def main(argv: list[str] | None = None) -> None:
+    args = parse_args(argv)
+    # Not a log line per request
+    logging.getLogger("httpx").setLevel(logging.WARNING)
+    data = asyncio.run(main_async(args))
+    if args.output:
+        results.write(args.output, data)
+    else:
+        print(json.dumps(data, indent=2))
+
+
+if __name__ == "__main__":
+    main()
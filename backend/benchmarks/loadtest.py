@@ -0,0 +1,341 @@
+"""
+A load test that replays a mix of requests to the routes of the API, in
+stages of increasing load, and reports the latency percentiles and the
+error rate of each route in each stage.
+
+The load is either:
+
+* closed: each stage runs that many virtual users, each sending a request
+  after the response to the previous one.
+* open: each stage sends that many requests per second, at random
+  intervals, whether or not the previous ones were answered. The latency is
+  measured from when each request was due, so a server that falls behind
+  isn't hidden by the load generator waiting for it.
+
+The requests read and edit the dataset of benchmarks/dataset.py, seeded
+first unless --no-seed. With --baseline, the test fails when a route of a
+stage is slower than in the baseline by more than --threshold, or fails more
+often than --max-error-rate.
+
+Run from the backend directory, against the Docker Compose stack:
+
+    python -m benchmarks.loadtest --url http://localhost:8000 --stages 10,20,40
+
+or against a uvicorn server started for the run:
+
+    python -m benchmarks.loadtest --uvicorn --workers 4
+"""
+
+import argparse
+import asyncio
+import json
+import logging
+import random
+import sys
+import time
+from collections import defaultdict
+from collections.abc import Callable
+from dataclasses import asdict
+from datetime import timedelta
+from pathlib import Path
+from typing import Any
+
+import httpx
+from sqlmodel import Session
+
+from app.core.db import engine
+from app.core.security import create_access_token
+from app.main import app
+from benchmarks import results
+from benchmarks.dataset import Size, generate, seed
+from benchmarks.endpoints import (
+    API,
+    Request,
+    Run,
+    free_port,
+    login,
+    send,
+    start_uvicorn,
+)
+
+# Share of the requests to each route id, in percent
+MIX = {
+    "cvs-read_cv": 50,
+    "cvs-read_cvs": 20,
+    "cvs-update_cv": 5,
+    "items-update_item": 5,
+    "login-login_access_token": 5,
+    "users-read_user_me": 10,
+    "items-read_items": 5,
+}
+
+# Percentiles compared with the baseline
+GATED = ("p50_ms", "p95_ms", "p99_ms")
+
+REQUESTS: dict[str, Callable[[Run, int], Request]] = {
+    "cvs-read_cv": lambda run, i: Request("GET", f"{API}/cvs/{run.cv(i)}", run.user(i)),
+    "cvs-read_cvs": lambda run, i: Request("GET", f"{API}/cvs/", run.user(i)),
+    "cvs-update_cv": lambda run, i: Request(
+        "PUT", f"{API}/cvs/{run.cv(i)}", run.user(i), json={"name": f"CV {i}"}
+    ),
+    "items-read_items": lambda run, i: Request("GET", f"{API}/items/", run.user(i)),
+    "items-update_item": lambda run, i: Request(
+        "PUT",
+        f"{API}/items/{run.item(run.user(i), i)}",
+        run.user(i),
+        json={"title": f"Item {i}"},
+    ),
+    "login-login_access_token": login,
+    "users-read_user_me": lambda run, i: Request("GET", f"{API}/users/me", run.user(i)),
+}
+
+
+def route_ids() -> set[str]:
+    """
+    The ids of the routes of the API, the same as its OpenAPI operation ids.
+    """
+    return {
+        operation["operationId"]
+        for path in app.openapi()["paths"].values()
+        for operation in path.values()
+    }
+
+
+def check_mix(mix: dict[str, float]) -> None:
+    unknown = set(mix) - route_ids()
+    if unknown:
+        raise SystemExit(f"Not routes of the API: {', '.join(sorted(unknown))}")
+    missing = set(mix) - set(REQUESTS)
+    if missing:
+        raise SystemExit(
+            f"No requests defined for the routes: {', '.join(sorted(missing))}"
+        )
+
+
+class Stage:
+    def __init__(self, run: Run, mix: dict[str, float], seed: int) -> None:
+        self.run = run
+        self.routes = list(mix)
+        self.weights = list(mix.values())
+        self.rng = random.Random(seed)
+        self.latencies: dict[str, list[float]] = defaultdict(list)
+        self.errors: dict[str, int] = defaultdict(int)
+        self.sent = 0
+
+    async def request(
+        self, client: httpx.AsyncClient, due: float | None = None
+    ) -> None:
+        route = self.rng.choices(self.routes, self.weights)[0]
+        self.sent += 1
+        i = self.sent
+        start = time.perf_counter() if due is None else due
+        try:
+            response = await send(client, self.run, REQUESTS[route](self.run, i))
+            failed = response.is_error
+        except httpx.HTTPError:
+            failed = True
+        self.latencies[route].append(time.perf_counter() - start)
+        if failed:
+            self.errors[route] += 1
+
+    def summary(self, seconds: float) -> dict[str, Any]:
+        routes = {}
+        for route, latencies in sorted(self.latencies.items()):
+            summary = results.summarize(latencies, seconds, self.errors[route])
+            summary["error_rate"] = self.errors[route] / len(latencies)
+            routes[route] = summary
+        return routes
+
+
+async def closed_stage(
+    client: httpx.AsyncClient, stage: Stage, users: int, seconds: float
+) -> None:
+    deadline = time.perf_counter() + seconds
+
+    async def user() -> None:
+        while time.perf_counter() < deadline:
+            await stage.request(client)
+
+    await asyncio.gather(*(user() for _ in range(users)))
+
+
+async def open_stage(
+    client: httpx.AsyncClient, stage: Stage, rate: float, seconds: float
+) -> None:
+    start = time.perf_counter()
+    due = start
+    tasks = set()
+    while due < start + seconds:
+        delay = due - time.perf_counter()
+        if delay > 0:
+            await asyncio.sleep(delay)
+        task = asyncio.create_task(stage.request(client, due))
+        tasks.add(task)
+        task.add_done_callback(tasks.discard)
+        # Poisson arrivals, at rate requests per second on average
+        due += stage.rng.expovariate(rate)
+    await asyncio.gather(*tasks)
+
+
+async def load(
+    client: httpx.AsyncClient, run: Run, args: argparse.Namespace
+) -> list[dict[str, Any]]:
+    stages = []
+    for index, target in enumerate(args.stages):
+        stage = Stage(run, args.mix, seed=args.seed + index)
+        start = time.perf_counter()
+        if args.mode == "closed":
+            await closed_stage(client, stage, int(target), args.stage_seconds)
+        else:
+            await open_stage(client, stage, target, args.stage_seconds)
+        routes = stage.summary(time.perf_counter() - start)
+        stages.append({"target": target, "routes": routes})
+        report(args.mode, target, routes)
+    return stages
+
+
+def report(mode: str, target: float, routes: dict[str, Any]) -> None:
+    unit = "users" if mode == "closed" else "req/s"
+    print(f"{target:g} {unit}:", file=sys.stderr)
+    for route, summary in routes.items():
+        print(
+            f"  {route:<28}"
+            f" p50 {summary['p50_ms']:>8.2f}"
+            f" p95 {summary['p95_ms']:>8.2f}"
+            f" p99 {summary['p99_ms']:>8.2f}"
+            f" max {summary['max_ms']:>8.2f} ms"
+            f" {summary['error_rate']:>7.2%} errors",
+            file=sys.stderr,
+        )
+
+
+def regressions(
+    stages: list[dict[str, Any]],
+    baseline: list[dict[str, Any]],
+    *,
+    threshold: float,
+    max_error_rate: float,
+) -> list[str]:
+    """
+    The routes of each stage that are slower than in the baseline stage
+    with the same target by more than threshold, as a fraction, or that
+    fail more often than max_error_rate and than in the baseline.
+    """
+    found = []
+    baseline_stages = {stage["target"]: stage["routes"] for stage in baseline}
+    for stage in stages:
+        before = baseline_stages.get(stage["target"], {})
+        for route, summary in stage["routes"].items():
+            if route not in before:
+                continue
+            for key in GATED:
+                if summary[key] > before[route][key] * (1 + threshold):
+                    found.append(
+                        f"{stage['target']:g} {route} {key}:"
+                        f" {before[route][key]:.2f} -> {summary[key]:.2f}"
+                    )
+            allowed = max(max_error_rate, before[route]["error_rate"])
+            if summary["error_rate"] > allowed:
+                found.append(
+                    f"{stage['target']:g} {route} error rate:"
+                    f" {before[route]['error_rate']:.2%}"
+                    f" -> {summary['error_rate']:.2%}"
+                )
+    return found
+
+
+def parse_args(argv: list[str] | None = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    target = parser.add_mutually_exclusive_group()
+    target.add_argument("--url", default="http://localhost:8000")
+    target.add_argument("--uvicorn", action="store_true")
+    parser.add_argument("--workers", type=int, default=1)
+    parser.add_argument("--mode", choices=("closed", "open"), default="closed")
+    parser.add_argument(
+        "--stages",
+        type=lambda value: [float(target) for target in value.split(",")],
+        default=[5.0, 10.0, 20.0],
+        help="Virtual users, or requests per second with --mode open",
+    )
+    parser.add_argument("--stage-seconds", type=float, default=30)
+    parser.add_argument("--timeout", type=float, default=30)
+    parser.add_argument(
+        "--mix",
+        type=lambda path: json.loads(Path(path).read_text()),
+        default=MIX,
+        help="JSON file of the share of the requests to each route id",
+    )
+    for name, default in asdict(Size()).items():
+        parser.add_argument(f"--{name.replace('_', '-')}", type=int, default=default)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--no-seed", action="store_true")
+    parser.add_argument("--output", type=Path)
+    parser.add_argument("--baseline", type=Path)
+    parser.add_argument("--threshold", type=float, default=0.2)
+    parser.add_argument("--max-error-rate", type=float, default=0.01)
+    return parser.parse_args(argv)
+
+
+async def main_async(args: argparse.Namespace) -> dict[str, Any]:
+    size = Size(**{name: getattr(args, name) for name in asdict(Size())})
+    if args.no_seed:
+        dataset, _rows = generate(size, seed=args.seed)
+    else:
+        with Session(engine) as session:
+            dataset = seed(session, size, seed=args.seed)
+    tokens = [
+        create_access_token(user_id, timedelta(hours=1)) for user_id in dataset.user_ids
+    ]
+    run = Run(dataset=dataset, tokens=tokens)
+    data = results.metadata(
+        benchmark="loadtest",
+        mode=args.mode,
+        stage_seconds=args.stage_seconds,
+        mix=args.mix,
+        size=asdict(size),
+        seed=args.seed,
+    )
+    server = None
+    url = args.url
+    if args.uvicorn:
+        port = free_port()
+        server = start_uvicorn(port, args.workers)
+        url = f"http://127.0.0.1:{port}"
+        data["workers"] = args.workers
+    limits = httpx.Limits(max_connections=None, max_keepalive_connections=100)
+    try:
+        async with httpx.AsyncClient(
+            base_url=url, limits=limits, timeout=args.timeout
+        ) as client:
+            data["stages"] = await load(client, run, args)
+    finally:
+        if server:
+            server.terminate()
+            server.wait()
+    return data
+
+
+def main(argv: list[str] | None = None) -> None:
+    args = parse_args(argv)
+    # Not a log line per request
+    logging.getLogger("httpx").setLevel(logging.WARNING)
+    check_mix(args.mix)
+    data = asyncio.run(main_async(args))
+    if args.output:
+        results.write(args.output, data)
+    if not args.baseline:
+        return
+    found = regressions(
+        data["stages"],
+        results.read(args.baseline)["stages"],
+        threshold=args.threshold,
+        max_error_rate=args.max_error_rate,
+    )
+    for regression in found:
+        print(f"Regression: {regression}", file=sys.stderr)
+    if found:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
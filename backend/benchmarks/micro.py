@@ -0,0 +1,233 @@
+"""
+Micro-benchmarks of the functions on the hot paths of the API, stored per
+commit and compared between two runs.
+
+Each benchmark is timed in SAMPLES batches of calls, and the time per call
+of every batch is stored, so that compare tells a slowdown from the noise
+with a Mann-Whitney U test of the two runs' samples.
+
+Run from the backend directory:
+
+    python -m benchmarks.micro run
+    python -m benchmarks.micro compare benchmark-results/micro/<a>.json benchmark-results/micro/<b>.json
+"""
+
+import argparse
+import math
+import statistics
+import sys
+import timeit
+import uuid
+from collections.abc import Callable
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+from typing import Any
+
+import jwt
+from pydantic import TypeAdapter
+
+from app.core import security
+from app.core.config import Settings, settings
+from app.models import CVPublic, Item, TokenPayload, UserPublic, UsersPublic
+from app.utils import load_email_templates, render_email_template
+from benchmarks import results
+
+SAMPLES = 20
+# Seconds that each batch of calls takes at least, the number of calls in a
+# batch is found by timeit.Timer.autorange
+BATCH_SECONDS = 0.05
+ROWS = 100
+DIRECTORY = Path("benchmark-results/micro")
+
+PASSWORD = "benchmark-password"
+
+
+def setup() -> dict[str, Callable[[], Any]]:
+    load_email_templates()
+    token = security.create_access_token(uuid.uuid4(), timedelta(minutes=5))
+    hashed_password = security.get_password_hash(PASSWORD)
+    item = {
+        "id": uuid.uuid4(),
+        "title": "Item",
+        "description": "Description",
+        "owner_id": uuid.uuid4(),
+    }
+    now = datetime.now(timezone.utc)
+    cvs = [
+        CVPublic(
+            id=uuid.uuid4(),
+            name=f"CV {i}",
+            recipient="ACME",
+            created_at=now,
+            edited_at=now,
+        )
+        for i in range(ROWS)
+    ]
+    cvs_adapter = TypeAdapter(list[CVPublic])
+    users = UsersPublic(
+        data=[
+            UserPublic(id=uuid.uuid4(), email=f"user{i}@example.com")
+            for i in range(ROWS)
+        ],
+        count=ROWS,
+    )
+    context = {
+        "project_name": settings.PROJECT_NAME,
+        "username": "user@example.com",
+        "email": "user@example.com",
+        "valid_hours": settings.EMAIL_RESET_TOKEN_EXPIRE_HOURS,
+        "link": settings.FRONTEND_HOST,
+    }
+    return {
+        "create_access_token": lambda: security.create_access_token(
+            uuid.uuid4(), timedelta(minutes=5)
+        ),
+        # As in deps.get_current_user
+        "jwt.decode": lambda: TokenPayload(
+            **jwt.decode(token, settings.SECRET_KEY, algorithms=[security.ALGORITHM])
+        ),
+        "verify_password": lambda: security.verify_password(PASSWORD, hashed_password),
+        "get_password_hash": lambda: security.get_password_hash(PASSWORD),
+        "Item.model_validate": lambda: Item.model_validate(item),
+        f"list[CVPublic] x {ROWS} dump_json": lambda: cvs_adapter.dump_json(cvs),
+        f"UsersPublic x {ROWS} model_dump_json": users.model_dump_json,
+        "render_email_template": lambda: render_email_template(
+            template_name="reset_password.html", context=context
+        ),
+        "Settings()": lambda: Settings(),  # type: ignore[call-arg]
+    }
+
+
+def sample(function: Callable[[], Any], samples: int) -> list[float]:
+    """
+    Seconds per call of function, in samples batches.
+    """
+    timer = timeit.Timer(function)
+    number, seconds = timer.autorange()
+    number = max(math.ceil(number * BATCH_SECONDS / max(seconds, 1e-9)), 1)
+    return [seconds / number for seconds in timer.repeat(samples, number)]
+
+
+def run(args: argparse.Namespace) -> None:
+    benchmarks = setup()
+    selected = {
+        name: function
+        for name, function in benchmarks.items()
+        if not args.only or any(part in name for part in args.only)
+    }
+    data = results.metadata(
+        benchmark="micro",
+        samples=args.samples,
+        bcrypt_rounds=security.pwd_context.handler("bcrypt").default_rounds,
+    )
+    data["results"] = {}
+    for name, function in selected.items():
+        samples = sample(function, args.samples)
+        data["results"][name] = samples
+        print(
+            f"{name:<36} {statistics.median(samples) * 1_000_000:>12.2f} us",
+            file=sys.stderr,
+        )
+    output = args.output or DIRECTORY / f"{(data['commit'] or 'local')[:12]}.json"
+    results.write(output, data)
+    print(f"Written to {output}", file=sys.stderr)
+
+
+def mann_whitney(a: list[float], b: list[float]) -> float:
+    """
+    The two-sided p-value of a Mann-Whitney U test that a and b come from
+    the same distribution, by the normal approximation with ties.
+    """
+    values = sorted([(value, 0) for value in a] + [(value, 1) for value in b])
+    n = len(values)
+    ranks = [0.0] * n
+    ties = 0.0
+    i = 0
+    while i < n:
+        j = i
+        while j + 1 < n and values[j + 1][0] == values[i][0]:
+            j += 1
+        for k in range(i, j + 1):
+            ranks[k] = (i + j) / 2 + 1
+        ties += (j - i + 1) ** 3 - (j - i + 1)
+        i = j + 1
+    n_a, n_b = len(a), len(b)
+    rank_sum = sum(
+        rank for rank, (_, group) in zip(ranks, values, strict=True) if group == 0
+    )
+    u = rank_sum - n_a * (n_a + 1) / 2
+    mean = n_a * n_b / 2
+    variance = n_a * n_b / 12 * ((n + 1) - ties / (n * (n - 1)))
+    if variance <= 0:
+        return 1.0
+    z = (abs(u - mean) - 0.5) / math.sqrt(variance)
+    return math.erfc(max(z, 0) / math.sqrt(2))
+
+
+def compare(args: argparse.Namespace) -> None:
+    before = results.read(args.before)
+    after = results.read(args.after)
+    print(
+        f"{before['commit'] or args.before} -> {after['commit'] or args.after}",
+        file=sys.stderr,
+    )
+    slower = []
+    for name, samples in after["results"].items():
+        if name not in before["results"]:
+            continue
+        old = statistics.median(before["results"][name])
+        new = statistics.median(samples)
+        change = new / old - 1
+        p_value = mann_whitney(before["results"][name], samples)
+        significant = p_value < args.alpha and abs(change) >= args.min_change
+        flag = ""
+        if significant:
+            flag = "SLOWER" if change > 0 else "faster"
+        if significant and change > 0:
+            slower.append(name)
+        print(
+            f"{name:<36} {old * 1_000_000:>12.2f} -> {new * 1_000_000:>12.2f} us"
+            f" {change:>+8.1%}  p={p_value:.4f}  {flag}",
+            file=sys.stderr,
+        )
+    if slower:
+        sys.exit(1)
+
+
+def parse_args(argv: list[str] | None = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    commands = parser.add_subparsers(dest="command", required=True)
+    run_parser = commands.add_parser("run", help="Run the benchmarks")
+    run_parser.add_argument("--samples", type=int, default=SAMPLES)
+    run_parser.add_argument(
+        "--only", nargs="*", help="Run the benchmarks with these in their names"
+    )
+    run_parser.add_argument(
+        "--output", type=Path, help=f"By default {DIRECTORY}/<commit>.json"
+    )
+    run_parser.set_defaults(handler=run)
+    compare_parser = commands.add_parser(
+        "compare", help="Compare two runs, exit with an error if one is slower"
+    )
+    compare_parser.add_argument("before", type=Path)
+    compare_parser.add_argument("after", type=Path)
+    compare_parser.add_argument(
+        "--alpha", type=float, default=0.01, help="Significance level"
+    )
+    compare_parser.add_argument(
+        "--min-change",
+        type=float,
+        default=0.1,
+        help="Smallest change of the median to report, as a fraction",
+    )
+    compare_parser.set_defaults(handler=compare)
+    return parser.parse_args(argv)
+
+
+def main(argv: list[str] | None = None) -> None:
+    args = parse_args(argv)
+    args.handler(args)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,73 @@
+"""
+Latency summaries and the JSON files the benchmarks write, so that runs of
+different commits can be compared.
+"""
+
+import json
+import math
+import platform
+import subprocess
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any
+
+PERCENTILES = (50, 90, 95, 99)
+
+
+def percentile(ordered: list[float], q: float) -> float:
+    """
+    The q-th percentile of ordered values, by the nearest rank.
+    """
+    if not ordered:
+        return math.nan
+    rank = max(math.ceil(q / 100 * len(ordered)), 1)
+    return ordered[rank - 1]
+
+
+def summarize(
+    latencies: list[float], seconds: float, errors: int = 0
+) -> dict[str, Any]:
+    """
+    Latencies in milliseconds and the throughput of requests that took
+    seconds in total.
+    """
+    ordered = sorted(latencies)
+    summary: dict[str, Any] = {
+        "requests": len(ordered),
+        "errors": errors,
+        "throughput": len(ordered) / seconds if seconds else 0.0,
+        "mean_ms": sum(ordered) / len(ordered) * 1_000 if ordered else math.nan,
+    }
+    for q in PERCENTILES:
+        summary[f"p{q}_ms"] = percentile(ordered, q) * 1_000
+    summary["max_ms"] = ordered[-1] * 1_000 if ordered else math.nan
+    return summary
+
+
+def commit() -> str | None:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "HEAD"], capture_output=True, check=True, text=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def metadata(**extra: Any) -> dict[str, Any]:
+    return {
+        "commit": commit(),
+        "date": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        "python": platform.python_version(),
+        "machine": platform.machine(),
+        **extra,
+    }
+
+
+def write(path: Path, data: dict[str, Any]) -> None:
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text(json.dumps(data, indent=2) + "\n")
+
+
+def read(path: Path) -> dict[str, Any]:
+    data: dict[str, Any] = json.loads(path.read_text())
+    return data
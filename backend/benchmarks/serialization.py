@@ -0,0 +1,84 @@
+"""
+Serialization cost of a 100-row list page, the way FastAPI does it for a
+response_model (validate, dump, validate again, encode with json) versus
+dumping the selected columns to bytes with a TypeAdapter.
+
+Run from the backend directory:
+
+    python -m benchmarks.serialization
+"""
+
+import json
+import timeit
+from datetime import datetime
+from typing import Any
+
+from pydantic import TypeAdapter
+
+from app.api.responses import as_dicts, list_response, page_response
+from app.models import CV, CVPublic, CVsPublic, Job, JobPublic
+
+NUMBER = 1_000
+ROWS = 100
+
+
+def response_model_path(adapter: TypeAdapter[Any], content: Any) -> bytes:
+    # What FastAPI does with the return value of a route with a response_model
+    value = adapter.validate_python(content, from_attributes=True)
+    data = adapter.dump_python(value, mode="json")
+    return json.dumps(data, ensure_ascii=False, separators=(",", ":")).encode()
+
+
+def report(name: str, seconds: float) -> None:
+    print(f"{name:<40} {seconds / NUMBER * 1_000_000:>10.1f} us/page")
+
+
+def main() -> None:
+    cvs = [CV(name=f"CV {i}", recipient="ACME") for i in range(ROWS)]
+    jobs = [
+        Job(
+            position="Engineer",
+            company="ACME",
+            location="Berlin",
+            start=datetime(2020, 1, 1),
+            cv_id=cvs[0].id,
+        )
+        for _ in range(ROWS)
+    ]
+
+    cv_fields = tuple(CVPublic.model_fields)
+    cv_rows = [tuple(getattr(cv, name) for name in cv_fields) for cv in cvs]
+    job_fields = tuple(JobPublic.model_fields)
+    job_rows = [tuple(getattr(job, name) for name in job_fields) for job in jobs]
+    cvs_adapter = TypeAdapter(CVsPublic)
+    jobs_adapter = TypeAdapter(list[JobPublic])
+
+    report(
+        "CVsPublic, response_model",
+        timeit.timeit(
+            lambda: response_model_path(
+                cvs_adapter, CVsPublic(data=cvs, count=ROWS).model_dump()
+            ),
+            number=NUMBER,
+        ),
+    )
+    report(
+        "CVsPublic, TypeAdapter",
+        timeit.timeit(
+            lambda: page_response(as_dicts(cv_fields, cv_rows), ROWS), number=NUMBER
+        ),
+    )
+    report(
+        "list[JobPublic], response_model",
+        timeit.timeit(lambda: response_model_path(jobs_adapter, jobs), number=NUMBER),
+    )
+    report(
+        "list[JobPublic], TypeAdapter",
+        timeit.timeit(
+            lambda: list_response(as_dicts(job_fields, job_rows)), number=NUMBER
+        ),
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,85 @@
+"""
+Messages per second sent to a local SMTP sink, opening a new connection for
+every message versus reusing a pooled connection.
+
+Run from the backend directory (needs the aiosmtpd dev dependency):
+
+    python -m benchmarks.smtp_pool
+"""
+
+import socket
+import time
+from typing import Any
+from unittest.mock import patch
+
+import emails  # type: ignore
+from aiosmtpd.controller import Controller
+
+from app.core.config import settings
+from app.utils import close_smtp_connections, get_smtp_backend, send_email
+
+NUMBER = 200
+
+
+class SinkHandler:
+    async def handle_DATA(self, _server: Any, _session: Any, _envelope: Any) -> str:
+        return "250 OK"
+
+
+def get_free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        port: int = s.getsockname()[1]
+        return port
+
+
+def send_unpooled(email_to: str) -> None:
+    message = emails.Message(
+        subject="Benchmark",
+        html="<p>Benchmark</p>",
+        mail_from=(settings.EMAILS_FROM_NAME, settings.EMAILS_FROM_EMAIL),
+    )
+    response = message.send(
+        to=email_to, smtp={"host": settings.SMTP_HOST, "port": settings.SMTP_PORT}
+    )
+    assert response.success
+    response.backend.close()
+
+
+def send_pooled(email_to: str) -> None:
+    send_email(email_to=email_to, subject="Benchmark", html_content="<p>Benchmark</p>")
+
+
+def main() -> None:
+    controller = Controller(SinkHandler(), hostname="127.0.0.1", port=get_free_port())
+    controller.start()
+    try:
+        with (
+            patch.object(settings, "SMTP_HOST", "127.0.0.1"),
+            patch.object(settings, "SMTP_PORT", controller.port),
+            patch.object(settings, "SMTP_TLS", False),
+            patch.object(settings, "SMTP_USER", None),
+            patch.object(settings, "SMTP_PASSWORD", None),
+            patch.object(settings, "EMAILS_FROM_EMAIL", "noreply@example.com"),
+        ):
+            for name, send in [
+                ("new connection", send_unpooled),
+                ("pooled", send_pooled),
+            ]:
+                start = time.perf_counter()
+                for i in range(NUMBER):
+                    send(f"user{i}@example.com")
+                elapsed = time.perf_counter() - start
+                print(f"{name:<20} {NUMBER / elapsed:>10.1f} messages/s")
+            stats = get_smtp_backend().stats
+            print(
+                f"pooled connections opened: {stats.connections}, "
+                f"messages: {stats.messages}"
+            )
+            close_smtp_connections()
+    finally:
+        controller.stop()
+
+
+if __name__ == "__main__":
+    main()
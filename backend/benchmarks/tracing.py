@@ -0,0 +1,123 @@
+"""
+Latency added by tracing a request with 1% head sampling, against the same
+route without any tracing instrumentation.
+
+The route authenticates in an "auth" span and runs a few SQL statements
+against SQLite in memory, so the request is faster than any of the API, with
+the network round trips to Postgres. The overhead in microseconds is what
+each request of the API pays, its share is smaller the longer the request.
+
+Run from the backend directory:
+
+    python -m benchmarks.tracing
+"""
+
+import statistics
+import time
+from contextlib import nullcontext
+from typing import Any
+
+import anyio
+from fastapi import FastAPI
+from opentelemetry.sdk.trace.export import BatchSpanProcessor
+from opentelemetry.sdk.trace.export.in_memory_span_exporter import (
+    InMemorySpanExporter,
+)
+from sqlalchemy import create_engine, text
+from sqlalchemy.pool import QueuePool
+from starlette.types import Message
+
+from app.core.metrics import instrument_engine
+from app.core.tracing import (
+    TracingMiddleware,
+    child_span,
+    fastapi_telemetry_options,
+    instrument_engine_tracing,
+    setup_tracing,
+)
+from app.main import custom_generate_unique_id
+
+REQUESTS = 20_000
+QUERIES = 3
+RATIO = 0.01
+
+
+def build_app(*, traced: bool) -> FastAPI:
+    engine = create_engine(
+        "sqlite://", connect_args={"check_same_thread": False}, poolclass=QueuePool
+    )
+    # Counted for the metrics in both, as in app.main
+    instrument_engine(engine)
+    app = FastAPI(**fastapi_telemetry_options)
+    if traced:
+        instrument_engine_tracing(engine)
+        app.add_middleware(TracingMiddleware, route_id=custom_generate_unique_id)
+
+    @app.get("/items/", tags=["items"])
+    def read_items() -> Any:
+        with child_span("auth") if traced else nullcontext():
+            pass
+        with engine.connect() as conn:
+            rows = [conn.execute(text("SELECT 1")).scalar() for _ in range(QUERIES)]
+        return {"data": rows}
+
+    return app
+
+
+async def request(app: FastAPI) -> None:
+    scope = {
+        "type": "http",
+        "asgi": {"version": "3.0"},
+        "http_version": "1.1",
+        "method": "GET",
+        "scheme": "http",
+        "path": "/items/",
+        "raw_path": b"/items/",
+        "root_path": "",
+        "query_string": b"",
+        "headers": [(b"host", b"localhost")],
+        "server": ("localhost", 80),
+        "client": ("127.0.0.1", 1234),
+    }
+
+    async def receive() -> Message:
+        return {"type": "http.request", "body": b"", "more_body": False}
+
+    async def send(_message: Message) -> None:
+        pass
+
+    await app(scope, receive, send)
+
+
+async def timed_request(app: FastAPI) -> float:
+    start = time.perf_counter()
+    await request(app)
+    return time.perf_counter() - start
+
+
+async def compare() -> None:
+    exporter = InMemorySpanExporter()
+    setup_tracing(BatchSpanProcessor(exporter), service_name="bench", ratio=RATIO)
+    plain = build_app(traced=False)
+    traced = build_app(traced=True)
+    # One request to each in turn, so that the noise of the machine falls
+    # equally on both. The app is called directly, without an HTTP client
+    plain_timings, traced_timings = [], []
+    for _ in range(REQUESTS):
+        plain_timings.append(await timed_request(plain))
+        traced_timings.append(await timed_request(traced))
+    untraced = statistics.median(plain_timings)
+    sampled = statistics.median(traced_timings)
+    print(f"{'no tracing':<24} {untraced * 1_000_000:>10.1f} us/request")
+    print(f"{f'{RATIO:.0%} head sampling':<24} {sampled * 1_000_000:>10.1f} us/request")
+    print(f"{'overhead':<24} {(sampled - untraced) * 1_000_000:>10.1f} us/request")
+    print(f"{'':<24} {sampled / untraced - 1:>10.1%}")
+    print(f"{'spans exported':<24} {len(exporter.get_finished_spans()):>10}")
+
+
+def main() -> None:
+    anyio.run(compare)
+
+
+if __name__ == "__main__":
+    main()
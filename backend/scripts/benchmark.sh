@@ -0,0 +1,6 @@
+#!/usr/bin/env bash
+
+set -e
+set -x
+
+python -m benchmarks.endpoints --output "benchmark-results/endpoints-$(git rev-parse --short HEAD).json" "$@"